@@ -11,17 +11,296 @@ import matplotlib.pyplot as plt
 from datetime import datetime
 import json
 import os
-from scipy.integrate import solve_ivp, odeint
-from scipy.optimize import minimize, root
-from scipy.fft import fft, ifft
-from typing import Dict, List, Tuple, Optional, Callable
+import sys
+import math
+import hashlib
+import inspect
+import uuid
+from bisect import bisect_right
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from itertools import product
+from time import perf_counter, process_time
+from scipy.integrate import solve_ivp, odeint, RK23, RK45, DOP853, Radau, BDF, LSODA
+from scipy.optimize import minimize, root, OptimizeResult
+from scipy import sparse
+from scipy.linalg import lapack, eigh_tridiagonal, eig_banded
+from scipy.sparse.linalg import eigsh, lobpcg, cg, LinearOperator
+from scipy.fft import fft, ifft, rfft, irfft, next_fast_len, dstn
+from scipy.signal import find_peaks, peak_widths
+from typing import Dict, List, Tuple, Optional, Callable, Iterable, Iterator
 import logging
-from dataclasses import dataclass
+import warnings
+from dataclasses import dataclass, fields
+
+# Compilação JIT opcional do lado direito das EDOs cosmológicas
+try:
+    from numba import njit
+    _numba_available = True
+except ImportError:
+    _numba_available = False
+
+# Tolerância relativa do cg: `rtol` desde o SciPy 1.12, `tol` nas versões anteriores
+_CG_RTOL_KEYWORD = 'rtol' if 'rtol' in inspect.signature(cg).parameters else 'tol'
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Intensidades específicas por constante baseadas em física realista
+DYNAMIC_CONSTANT_INTENSITIES = {
+    'G': 0.257,     # Constante gravitacional - maior variação
+    'c': 0.236,     # Velocidade da luz
+    'h': 0.213,     # Constante de Planck
+    'alpha': 0.165  # Constante de estrutura fina - menor variação
+}
+
+# Ordem das constantes retornadas pelo avaliador fundido
+DYNAMIC_CONSTANT_NAMES = ('G', 'c', 'h', 'alpha')
+
+# Fronteiras das épocas cosmológicas (descontinuidades dos modelos dependentes do tempo)
+EPOCH_BOUNDARIES = (1.0, 1e3, 1e5, 1e6)
+
+# Integradores do SciPy disponíveis para a integração passo a passo
+IVP_METHODS = {
+    'RK23': RK23, 'RK45': RK45, 'DOP853': DOP853,
+    'Radau': Radau, 'BDF': BDF, 'LSODA': LSODA
+}
+
+# Sonda de rigidez (select_solver_method): o indicador h·max(-Re λ) de um
+# passo de RK45 limitado por estabilidade oscila em torno da fronteira da
+# região de estabilidade no eixo real negativo (~3.3; em y' = -1000y os
+# passos aceitos ficam entre ~2.7 e 3.4), enquanto passos limitados por
+# precisão ficam em h·|λ| ≪ 1. O limiar fica ~3x abaixo da fronteira porque
+# o Jacobiano é avaliado só no início dos passos amostrados e λ varia ao
+# longo do passo nos modelos cosmológicos: um sistema rígido não deve
+# escapar por um indicador subestimado, e entre 1 e ~3 não há passos
+# limitados por precisão a confundir.
+RK45_STABILITY_BOUNDARY = 3.3
+STIFFNESS_INDICATOR_THRESHOLD = 1.0
+
+# Valores da compressão TARDIS no início das fases 3 e 4
+_COMPRESSION_END_OF_INFLATION = 51.0 * np.exp(999.0 / 150.0)
+_COMPRESSION_START_OF_MATTER_ERA = 51.0 * np.exp(999.0 / 150.0) * (1e5 / 1000.0) ** 0.25
+
+# Limite superior da compressão TARDIS (evita overflow numérico)
+COMPRESSION_CAP = 1e20
+
+# Coeficientes centrais (c0, c1, ..., cp) da segunda derivada por diferenças
+# finitas, f'' ≈ Σ cj (f[i-j] + f[i+j]) / dx² com c0 no centro; erro O(dx^(2p))
+LAPLACIAN_STENCILS = {
+    3: (-2.0, 1.0),                      # O(dx²)
+    5: (-5/2, 4/3, -1/12),               # O(dx⁴)
+    7: (-49/18, 3/2, -3/20, 1/90),       # O(dx⁶)
+}
+
+# Condições iniciais padrão da cosmologia: a, ȧ, ρ, T
+DEFAULT_INITIAL_CONDITIONS = (
+    1e-8,    # Fator de escala inicial (a)
+    1e3,     # Taxa de expansão inicial (ȧ)
+    1e25,    # Densidade de energia inicial (ρ)
+    1e12     # Temperatura inicial (T)
+)
+
+def _clip_scalar(x: float, lower: float, upper: float) -> float:
+    """Equivalente escalar de np.clip, sem o custo de criar arrays NumPy"""
+    return min(max(x, lower), upper)
+
+def _classify_epoch(t: float) -> Optional[int]:
+    """Época cosmológica de um tempo escalar (None fora das épocas modeladas)"""
+    if t < 1.0:
+        return 0            # Época de Planck / Big Bang
+    elif 1.0 < t < 1000.0:
+        return 1            # Época Inflacionária
+    elif 1000.0 < t < 1e5:
+        return 2            # Época de Radiação
+    elif 1e5 < t < 1e6:
+        return 3            # Época de Matéria
+    return None
+
+def _epoch_masks(t: np.ndarray) -> List[np.ndarray]:
+    """Máscaras booleanas das quatro épocas cosmológicas para um array de tempos"""
+    return [
+        t < 1.0,
+        (t > 1.0) & (t < 1000.0),
+        (t > 1000.0) & (t < 1e5),
+        (t > 1e5) & (t < 1e6),
+    ]
+
+def _epoch_variation(epoch: int, t, intensities: np.ndarray,
+                     oscillation_freqs: np.ndarray) -> np.ndarray:
+    """
+    Variação bruta (antes da limitação) das constantes dinâmicas numa época
+
+    Aceita `t` escalar ou array; `intensities` e `oscillation_freqs` são
+    combinados com `t` por broadcasting.
+    """
+    # Época de Planck / Big Bang (t < 1.0)
+    if epoch == 0:
+        # Variação exponencial com decaimento rápido
+        return intensities * np.exp(-t * 2.5) * np.sin(t * 10)
+
+    # Época Inflacionária (1 < t < 1000)
+    if epoch == 1:
+        # Oscilações inflacionárias com amortecimento
+        damping = np.exp(-t / 3000.0)
+        return intensities * 0.7 * np.sin(t / oscillation_freqs) * damping
+
+    # Época de Radiação (1000 < t < 1e5)
+    if epoch == 2:
+        # Variações suaves durante recombinação
+        return intensities * 0.4 * np.cos(np.log10(t) * 2) * np.exp(-t / 2e5)
+
+    # Época de Matéria (1e5 < t < 1e6)
+    # Pequenas flutuações durante formação de estruturas
+    return intensities * 0.2 * np.sin(np.log10(t) * 5) * np.exp(-t / 5e6)
+
+def _compression_phase(phase: int, t):
+    """
+    Compressão TARDIS bruta (antes da regularização) numa fase cosmológica
+
+    Aceita `t` escalar ou array.
+    """
+    # Fase 1: Big Bang e Planck (t < 1.0)
+    if phase == 0:
+        # Compressão inicial exponencial com oscilações quânticas
+        return 1.0 + 50 * t * (1 + 0.1 * np.sin(t * 20))
+
+    # Fase 2: Inflação Cósmica (1 < t < 1000)
+    if phase == 1:
+        # Compressão inflacionária com crescimento exponencial
+        base_compression = 51.0  # Fim da fase anterior
+        inflation_growth = np.exp((t - 1.0) / 150.0)  # Taxa ajustada
+        quantum_fluctuations = 1 + 0.05 * np.sin(t / 50.0)
+        return base_compression * inflation_growth * quantum_fluctuations
+
+    # Fase 3: Pós-inflação até recombinação (1000 < t < 1e5)
+    if phase == 2:
+        # Compressão estabilizada com crescimento polinomial
+        post_inflation_growth = np.power(t / 1000.0, 0.25)  # Expoente reduzido
+        thermal_effects = 1 + 0.02 * np.cos(np.log10(t))
+        return _COMPRESSION_END_OF_INFLATION * post_inflation_growth * thermal_effects
+
+    # Fase 4: Era da Matéria (t > 1e5)
+    # Compressão final com saturação
+    matter_era_growth = np.power(np.log(t / 1e5 + 1), 0.1)
+    saturation_factor = 1 / (1 + t / 1e8)  # Saturação assintótica
+    return _COMPRESSION_START_OF_MATTER_ERA * matter_era_growth * saturation_factor
+
+def _jit(func: Callable) -> Callable:
+    """Compila `func` com numba (nopython) quando disponível; caso contrário a mantém em Python"""
+    if _numba_available:
+        return njit(cache=True)(func)
+    return func
+
+@_jit
+def _kernel_variation(t: float, intensity: float, oscillation_freq: float,
+                      limit: float) -> float:
+    """Variação de uma constante dinâmica (mesmas fórmulas de _epoch_variation)"""
+    if t < 1.0:
+        variation = intensity * math.exp(-t * 2.5) * math.sin(t * 10)
+    elif 1.0 < t < 1000.0:
+        damping = math.exp(-t / 3000.0)
+        variation = intensity * 0.7 * math.sin(t / oscillation_freq) * damping
+    elif 1000.0 < t < 1e5:
+        variation = intensity * 0.4 * math.cos(math.log10(t) * 2) * math.exp(-t / 2e5)
+    elif 1e5 < t < 1e6:
+        variation = intensity * 0.2 * math.sin(math.log10(t) * 5) * math.exp(-t / 5e6)
+    else:
+        variation = 0.0
+    return min(max(variation, -limit), limit)
+
+@_jit
+def _kernel_compression(t: float) -> float:
+    """Compressão TARDIS (mesmas fórmulas de _compression_phase, sem registro de eventos)"""
+    if t <= 0:
+        return 1.0
+    if t < 1.0:
+        compression = 1.0 + 50 * t * (1 + 0.1 * math.sin(t * 20))
+    elif t < 1000.0:
+        compression = 51.0 * math.exp((t - 1.0) / 150.0) * (1 + 0.05 * math.sin(t / 50.0))
+    elif t < 1e5:
+        compression = (_COMPRESSION_END_OF_INFLATION * math.pow(t / 1000.0, 0.25)
+                       * (1 + 0.02 * math.cos(math.log10(t))))
+    else:
+        compression = (_COMPRESSION_START_OF_MATTER_ERA * math.pow(math.log(t / 1e5 + 1), 0.1)
+                       * (1 / (1 + t / 1e8)))
+    compression = max(compression, 1.0)
+    if compression > COMPRESSION_CAP:
+        compression = COMPRESSION_CAP
+    if not math.isfinite(compression):
+        compression = 1.0
+    return compression
+
+@_jit
+def _cosmology_rhs_kernel(t: float, y: np.ndarray, base_values: np.ndarray,
+                          intensities: np.ndarray, oscillation_freqs: np.ndarray,
+                          max_variation: float, epsilon: float) -> np.ndarray:
+    """
+    Lado direito completo das equações cosmológicas estabilizadas
+
+    Reproduz PhysicsTestSystemV3.stable_cosmology_equations (constantes
+    dinâmicas, compressão TARDIS e limitações) numa única função compatível
+    com numba em modo nopython. Os eventos de compressão limitada/não-finita
+    são tratados da mesma forma, mas não são registrados.
+    """
+    a = max(y[0], epsilon)
+    a_dot = y[1]
+    rho = max(y[2], epsilon)
+    T = max(y[3], epsilon)
+
+    limit = 0.95 * max_variation
+    G = base_values[0] * (1 + _kernel_variation(t, intensities[0], oscillation_freqs[0], limit))
+    c = base_values[1] * (1 + _kernel_variation(t, intensities[1], oscillation_freqs[1], limit))
+    h = base_values[2] * (1 + _kernel_variation(t, intensities[2], oscillation_freqs[2], limit))
+    compression = _kernel_compression(t)
+
+    H = min(max(a_dot / a, -1e4), 1e4)
+    tardis_factor = 1.0 / math.sqrt(compression + epsilon)
+
+    rho_effective = rho * (1 + 3 * 0.33)
+    acceleration = -4 * math.pi * G * a * rho_effective / (3 * c**2)
+    acceleration = min(max(acceleration, -1e4), 1e4)
+
+    expansion_dilution = -3 * H * rho * (1 + 0.33)
+    quantum_cooling = -rho * h / (1e-20 + t) * math.exp(-t / 1e6)
+    quantum_cooling = min(max(quantum_cooling, -rho * 0.1), 0.0)
+    drho_dt = min(max(expansion_dilution + quantum_cooling, -rho * 20), rho * 20)
+
+    if T > 0:
+        quantum_temp_correction = 1 + h / (1.38e-23 * T * (1 + t / 1e3))
+        quantum_temp_correction = min(max(quantum_temp_correction, 0.5), 2.0)
+    else:
+        quantum_temp_correction = 1.0
+    dT_dt = min(max(-H * T * quantum_temp_correction, -T * 20), T * 20)
+
+    dydt = np.empty(4)
+    dydt[0] = a_dot
+    dydt[1] = acceleration * tardis_factor
+    dydt[2] = drho_dt
+    dydt[3] = dT_dt
+    return dydt
+
+# Potenciais do Monte Carlo em nível de módulo (serializáveis para os
+# processos de trabalho; parâmetros fixados com functools.partial)
+def _harmonic_potential(positions: np.ndarray) -> np.ndarray:
+    """Oscilador harmônico separável: energia de cada partícula"""
+    return 0.5 * np.einsum('...i,...i->...', positions, positions)
+
+def _lennard_jones_pair(r: np.ndarray, epsilon: float, sigma: float) -> np.ndarray:
+    """4ε[(σ/r)¹² - (σ/r)⁶]"""
+    inverse_6 = (sigma / r)**6
+    return 4 * epsilon * (inverse_6**2 - inverse_6)
+
+def _screened_pair(r: np.ndarray, strength: float, screening_length: float,
+                   length_unit: float) -> np.ndarray:
+    """strength · e^(-r/λ) / r, com r convertido para metros"""
+    return strength * np.exp(-r / screening_length) / (r * length_unit)
+
+_PAIR_POTENTIAL_FUNCTIONS = {f.__name__: f for f in (_lennard_jones_pair, _screened_pair)}
+
 @dataclass
 class PhysicalConstants:
     """Constantes físicas fundamentais com valores dinâmicos"""
@@ -44,6 +323,42 @@ class SimulationConfig:
     epsilon: float = 1e-15
     enable_adaptive_step: bool = True
     validation_enabled: bool = True
+    use_coefficient_cache: bool = False
+    coefficient_cache_tolerance: float = 1e-10
+    coefficient_cache_dir: str = 'resultados/cache'
+    rhs_backend: str = 'python'  # 'python', 'numba' ou 'auto'
+    integration_mode: str = 'single'  # 'single' ou 'segmented' (reinicia nas fronteiras das épocas)
+    solver_method: str = 'DOP853'  # 'DOP853', 'Radau', 'BDF', 'LSODA', 'RK45' ou 'auto'
+    stiffness_probe_fraction: float = 0.01  # Fração inicial do intervalo usada na sonda de rigidez
+    use_eigenstate_cache: bool = False
+    eigenstate_cache_entries: int = 8  # Entradas do nível LRU em memória
+    eigenstate_cache_dir: Optional[str] = None  # Nível .npz em disco (None desativa)
+    eigenstate_cache_max_bytes: int = 256 * 2**20  # Limite de tamanho do nível em disco
+
+@dataclass
+class CompressionDiagnostics:
+    """Resumo agregado dos eventos numéricos do modelo de compressão TARDIS"""
+    capped_points: int = 0
+    capped_time_range: Tuple[float, float] = (np.inf, -np.inf)
+    non_finite_points: int = 0
+    non_finite_time_range: Tuple[float, float] = (np.inf, -np.inf)
+
+    def record_capped(self, t_min: float, t_max: float, count: int = 1) -> None:
+        self.capped_points += count
+        self.capped_time_range = (float(np.fmin(self.capped_time_range[0], t_min)),
+                                  float(np.fmax(self.capped_time_range[1], t_max)))
+
+    def record_non_finite(self, t_min: float, t_max: float, count: int = 1) -> None:
+        self.non_finite_points += count
+        self.non_finite_time_range = (float(np.fmin(self.non_finite_time_range[0], t_min)),
+                                      float(np.fmax(self.non_finite_time_range[1], t_max)))
+
+    @staticmethod
+    def describe_range(time_range: Tuple[float, float]) -> str:
+        t_min, t_max = time_range
+        if t_min <= t_max:
+            return f"t de {t_min:.3e} a {t_max:.3e}"
+        return "t não-finito"
 
 @dataclass
 class SimulationResults:
@@ -55,345 +370,2651 @@ class SimulationResults:
     convergence_metrics: Dict[str, float]
     validation_results: Dict[str, bool]
 
+@dataclass
+class EnsembleResults:
+    """Trajetórias de um ensemble de condições iniciais integradas em conjunto"""
+    time_array: np.ndarray  # Forma (T,)
+    trajectories: np.ndarray  # Forma (N, 4, T): a, ȧ, ρ, T de cada membro
+    initial_conditions: np.ndarray  # Forma (N, 4)
+    intensities: np.ndarray  # Forma (N, 4), na ordem de DYNAMIC_CONSTANT_NAMES
+    convergence_metrics: Dict[str, object]
+
+class CrankNicolsonPropagator:
+    """
+    Propagador de Crank-Nicolson para a equação de Schrödinger 1D
+
+    O Hamiltoniano de diferenças finitas é guardado como três diagonais e
+    (1 + iHΔt/2ħ) é fatorado uma única vez (LAPACK gttrf). Cada passo é um
+    produto tridiagonal seguido de uma solução com a fatoração (gttrs), com
+    custo O(n). Com H hermitiano o propagador é unitário e conserva a norma.
+
+    Condições de contorno:
+    - 'dirichlet': ψ = 0 fora da malha (pontos fantasmas em x[0]-dx e x[-1]+dx)
+    - 'periodic': x[-1] é vizinho de x[0]; os cantos da matriz cíclica são
+      tratados pela fórmula de Sherman-Morrison, mantendo o custo O(n)
+    """
+
+    BOUNDARIES = ('dirichlet', 'periodic')
+
+    def __init__(self, V: np.ndarray, dx: float, dt: float,
+                 hbar: float = 1.0545718e-34, mass: float = 9.1093837015e-31,
+                 boundary: str = 'dirichlet'):
+        if boundary not in self.BOUNDARIES:
+            raise ValueError(f"Condição de contorno desconhecida: {boundary}")
+        V = np.asarray(V, dtype=float)
+        n = V.size
+        if n < 3:
+            raise ValueError("A malha precisa de pelo menos 3 pontos")
+
+        self.n_points = n
+        self.dt = dt
+        self.boundary = boundary
+
+        # Diagonais de H e de iΔt/2ħ·H
+        kinetic = hbar**2 / (2 * mass * dx**2)
+        self.H_diagonal = 2 * kinetic + V
+        self.H_off_diagonal = -kinetic
+        factor = 1j * dt / (2 * hbar)
+        self._a_diagonal = 1 + factor * self.H_diagonal
+        self._a_off = factor * self.H_off_diagonal
+        self._b_diagonal = 1 - factor * self.H_diagonal
+        self._b_off = -factor * self.H_off_diagonal
+
+        diagonal = self._a_diagonal.copy()
+        if boundary == 'periodic':
+            # A = T + u vᵀ com u = (γ, 0, ..., 0, a), v = (1, 0, ..., 0, a/γ)
+            gamma = -diagonal[0]
+            diagonal[0] -= gamma
+            diagonal[-1] -= self._a_off**2 / gamma
+            self._sm_v_last = self._a_off / gamma
+
+        off = np.full(n - 1, self._a_off, dtype=complex)
+        *self._factorization, info = lapack.zgttrf(off, diagonal, off)
+        if info != 0:
+            raise np.linalg.LinAlgError(f"Fatoração tridiagonal falhou (info={info})")
+
+        if boundary == 'periodic':
+            u = np.zeros((n, 1), dtype=complex)
+            u[0], u[-1] = gamma, self._a_off
+            self._sm_z = self._solve_banded(u)[:, 0]
+            self._sm_denominator = 1 + self._sm_z[0] + self._sm_v_last * self._sm_z[-1]
+
+    def _solve_banded(self, rhs: np.ndarray) -> np.ndarray:
+        """Resolve T x = rhs com a fatoração tridiagonal (rhs de forma (n, k))"""
+        x, info = lapack.zgttrs(*self._factorization, rhs, overwrite_b=True)
+        if info != 0:
+            raise np.linalg.LinAlgError(f"Solução tridiagonal falhou (info={info})")
+        return x
+
+    def _apply_b(self, psi: np.ndarray, out: np.ndarray, work: np.ndarray) -> None:
+        """Produto (1 - iHΔt/2ħ) ψ em O(n), gravado em `out` (`work` é rascunho)"""
+        np.add(psi[:-2], psi[2:], out=work[1:-1])
+        work[0] = psi[1]
+        work[-1] = psi[-2]
+        if self.boundary == 'periodic':
+            work[0] += psi[-1]
+            work[-1] += psi[0]
+        work *= self._b_off
+        np.multiply(self._b_diagonal[:, np.newaxis], psi, out=out)
+        out += work
+
+    def step(self, psi: np.ndarray, n_steps: int = 1) -> np.ndarray:
+        """
+        Avança ψ por n_steps passos de Δt
+
+        Parameters:
+        -----------
+        psi : np.ndarray
+            Função de onda, forma (n,) ou (n, k) com k funções avançadas juntas
+        n_steps : int
+            Número de passos
+
+        Returns:
+        --------
+        np.ndarray
+            Função de onda após n_steps passos, com a forma de `psi`
+        """
+        shape = np.shape(psi)
+        psi = np.array(np.reshape(psi, (self.n_points, -1)), dtype=complex, order='F')
+        rhs = np.empty_like(psi)
+        work = np.empty_like(psi)
+
+        for _ in range(n_steps):
+            self._apply_b(psi, rhs, work)
+            # gttrs resolve no próprio buffer de rhs, que passa a ser ψ
+            psi, rhs = self._solve_banded(rhs), psi
+            if self.boundary == 'periodic':
+                correction = (psi[0] + self._sm_v_last * psi[-1]) / self._sm_denominator
+                np.multiply(self._sm_z[:, np.newaxis], correction, out=work)
+                psi -= work
+
+        return psi.reshape(shape)
+
+class DynamicCrankNicolsonPropagator:
+    """
+    Crank-Nicolson com ħ(t) e m(t) variando a cada passo
+
+    iħ ∂ψ/∂t = Hψ com H = -ħ²/2m ∇² + V: o operador iΔt/2ħ·H é linear em
+    ħ/m (termo cinético) e 1/ħ (potencial). A evolução é dividida em trechos
+    nos quais esses coeficientes variam menos que `tolerance` (relativa); em
+    cada trecho eles são congelados na média do trecho, o que preserva a
+    integral de H no tempo, e só então o operador é refatorado. As fatorações
+    ficam num cache LRU e são reaproveitadas quando os coeficientes voltam a
+    valores anteriores (dentro da mesma tolerância); a diferença de integral
+    introduzida pelo reaproveitamento é compensada no trecho seguinte. Cada
+    trecho é um Crank-Nicolson exato para um H hermitiano, logo a norma é
+    conservada.
+    """
+
+    _WINDOW = 1024  # passos examinados de cada vez ao procurar o fim de um trecho
+
+    def __init__(self, V: np.ndarray, dx: float, dt: float, boundary: str = 'dirichlet',
+                 tolerance: float = 1e-3, max_cached: int = 32):
+        """
+        Parameters:
+        -----------
+        V : np.ndarray
+            Potencial na malha
+        dx, dt : float
+            Espaçamento da malha e passo de tempo
+        boundary : str
+            'dirichlet' ou 'periodic' (ver CrankNicolsonPropagator)
+        tolerance : float
+            Variação relativa máxima de ħ/m e 1/ħ dentro de um trecho
+        max_cached : int
+            Número de fatorações mantidas no cache
+        """
+        self.V = np.asarray(V, dtype=float)
+        self.dx = dx
+        self.dt = dt
+        self.boundary = boundary
+        self.tolerance = tolerance
+        self.max_cached = max_cached
+        self._cache: OrderedDict = OrderedDict()  # (ħ/m, 1/ħ) -> CrankNicolsonPropagator
+        self.stats = {'steps': 0, 'segments': 0, 'factorizations': 0, 'cache_hits': 0}
+
+    def _propagator(self, kinetic: float, potential: float) -> Tuple[CrankNicolsonPropagator, Tuple[float, float]]:
+        """Fatoração em cache mais próxima dos coeficientes (ħ/m, 1/ħ), ou uma nova"""
+        best_key, best_drift = None, self.tolerance
+        for key in self._cache:
+            drift = max(abs(key[0] / kinetic - 1), abs(key[1] / potential - 1))
+            if drift <= best_drift:
+                best_key, best_drift = key, drift
+
+        if best_key is not None:
+            self._cache.move_to_end(best_key)
+            self.stats['cache_hits'] += 1
+            return self._cache[best_key], best_key
+
+        key = (kinetic, potential)
+        hbar = 1.0 / potential
+        self._cache[key] = CrankNicolsonPropagator(self.V, self.dx, self.dt, hbar=hbar,
+                                                   mass=hbar / kinetic, boundary=self.boundary)
+        self.stats['factorizations'] += 1
+        while len(self._cache) > self.max_cached:
+            self._cache.popitem(last=False)
+        return self._cache[key], key
+
+    def _segment_end(self, coefficients: np.ndarray, start: int, stop: int) -> int:
+        """Fim do trecho iniciado em `start`: variação relativa de cada coeficiente ≤ tolerance"""
+        low = high = coefficients[:, start]
+        end = start + 1
+        while end < stop:
+            window = coefficients[:, end:min(stop, end + self._WINDOW)]
+            window_low = np.minimum.accumulate(window, axis=1)
+            window_high = np.maximum.accumulate(window, axis=1)
+            spread = (np.maximum(window_high, high[:, np.newaxis])
+                      - np.minimum(window_low, low[:, np.newaxis]))
+            exceeded = np.flatnonzero(np.any(spread > self.tolerance * np.abs(low[:, np.newaxis]),
+                                             axis=0))
+            if exceeded.size:
+                return end + exceeded[0]
+            low = np.minimum(low, window_low[:, -1])
+            high = np.maximum(high, window_high[:, -1])
+            end += window.shape[1]
+        return end
+
+    def propagate(self, psi: np.ndarray, hbar: np.ndarray, mass: np.ndarray,
+                  save_every: Optional[int] = None) -> Tuple[np.ndarray, List[np.ndarray]]:
+        """
+        Avança ψ por len(hbar) passos, o passo k com ħ = hbar[k] e m = mass[k]
+
+        Parameters:
+        -----------
+        psi : np.ndarray
+            Função de onda, forma (n,) ou (n, k)
+        hbar, mass : np.ndarray
+            Valores de ħ e da massa em cada passo (p.ex. no ponto médio)
+        save_every : int, optional
+            Guardar ψ a cada save_every passos
+
+        Returns:
+        --------
+        Tuple[np.ndarray, List[np.ndarray]]
+            ψ final e as funções de onda guardadas
+        """
+        hbar = np.asarray(hbar, dtype=float)
+        mass = np.broadcast_to(np.asarray(mass, dtype=float), hbar.shape)
+        coefficients = np.stack([hbar / mass, 1.0 / hbar])
+        n_steps = hbar.size
+        carry = np.zeros(2)  # integral dos coeficientes ainda não aplicada
+        snapshots = []
+
+        step = 0
+        while step < n_steps:
+            stop = n_steps if save_every is None else min(n_steps, (step // save_every + 1) * save_every)
+            end = self._segment_end(coefficients, step, stop)
+            length = end - step
+
+            integral = coefficients[:, step:end].sum(axis=1) + carry
+            propagator, used = self._propagator(*(integral / length))
+            carry = integral - length * np.asarray(used)
+
+            psi = propagator.step(psi, length)
+            self.stats['segments'] += 1
+            step = end
+            if save_every is not None and step % save_every == 0:
+                snapshots.append(psi.copy())
+
+        self.stats['steps'] += n_steps
+        return psi, snapshots
+
+class SplitOperatorPropagator:
+    """
+    Propagador split-operator (Fourier) para a equação de Schrödinger 1D
+
+    Divisão de Strang e^{-iVΔt/2ħ} e^{-iTΔt/ħ} e^{-iVΔt/2ħ}, com a parte
+    cinética aplicada no espaço de momentos via FFT: O(n log n) por passo e
+    precisão espectral para potenciais suaves. Os fatores de fase são
+    calculados uma única vez; meios passos de potencial consecutivos são
+    fundidos num passo completo.
+
+    Condições de contorno:
+    - 'periodic': periodicidade natural da FFT (norma conservada)
+    - 'absorbing': máscara cos^(1/8) numa camada de largura
+      `absorbing_fraction` do domínio em cada extremidade, incorporada ao
+      fator de potencial; a amplitude que chega às bordas é removida em vez
+      de reaparecer do outro lado
+    """
+
+    BOUNDARIES = ('periodic', 'absorbing')
+
+    def __init__(self, V: np.ndarray, dx: float, dt: float,
+                 hbar: float = 1.0545718e-34, mass: float = 9.1093837015e-31,
+                 boundary: str = 'periodic', absorbing_fraction: float = 0.1):
+        if boundary not in self.BOUNDARIES:
+            raise ValueError(f"Condição de contorno desconhecida: {boundary}")
+        V = np.asarray(V, dtype=float)
+        n = V.size
+
+        self.n_points = n
+        self.dt = dt
+        self.boundary = boundary
+
+        k = 2 * np.pi * np.fft.fftfreq(n, d=dx)
+        self._kinetic_phase = np.exp(-1j * hbar * k**2 * dt / (2 * mass))
+        self._half_potential_phase = np.exp(-1j * V * dt / (2 * hbar))
+
+        if boundary == 'absorbing':
+            width = max(int(round(absorbing_fraction * n)), 1)
+            mask = np.ones(n)
+            # cos(π/2) pode sair ligeiramente negativo: sem o corte, a potência dá NaN
+            ramp = np.maximum(np.cos(0.5 * np.pi * np.arange(width, 0, -1) / width), 0.0) ** 0.125
+            mask[:width] = ramp
+            mask[n - width:] = ramp[::-1]
+            self.mask = mask
+            self._half_potential_phase *= np.sqrt(mask)
+
+        self._potential_phase = self._half_potential_phase**2
+
+    def step(self, psi: np.ndarray, n_steps: int = 1) -> np.ndarray:
+        """
+        Avança ψ por n_steps passos de Δt
+
+        Parameters:
+        -----------
+        psi : np.ndarray
+            Função de onda, forma (n,) ou (n, k) com k pacotes de onda
+            avançados juntos
+        n_steps : int
+            Número de passos
+
+        Returns:
+        --------
+        np.ndarray
+            Função de onda após n_steps passos, com a forma de `psi`
+        """
+        shape = np.shape(psi)
+        # Pacotes em linhas contíguas: FFTs ao longo do último eixo
+        psi = np.array(np.reshape(psi, (self.n_points, -1)).T, dtype=complex, order='C')
+        if n_steps <= 0:
+            return psi.T.reshape(shape)
+
+        psi *= self._half_potential_phase
+        for i in range(n_steps):
+            psi = fft(psi, axis=-1, overwrite_x=True)
+            psi *= self._kinetic_phase
+            psi = ifft(psi, axis=-1, overwrite_x=True)
+            psi *= self._potential_phase if i < n_steps - 1 else self._half_potential_phase
+
+        return psi.T.reshape(shape)
+
+class CellList:
+    """
+    Índice espacial de células para uma caixa cúbica periódica
+
+    A caixa de lado `box_size` é dividida em n³ células de lado ≥ cutoff, de
+    modo que todas as partículas a menos de `cutoff` de uma partícula estão
+    nas 27 células vizinhas da sua. As posições são guardadas por célula, no
+    referencial da grade (deslocada por `origin`) e com preenchimento NaN,
+    para que a vizinhança de várias células seja lida em blocos contíguos; o
+    deslocamento periódico de cada célula vizinha é pré-calculado. Com
+    `even=True`, n é par (e ≥ 4): células da mesma cor no tabuleiro de 8
+    cores (paridade de cada índice) nunca são vizinhas.
+    """
+
+    CENTER = 13  # posição da própria célula entre as 27 vizinhas
+
+    def __init__(self, box_size: float, cutoff: float, even: bool = False):
+        n = int(box_size // cutoff)
+        if even:
+            n -= n % 2
+        if n < (4 if even else 3):
+            raise ValueError(f"box_size deve ser ≥ {4 if even else 3} vezes o cutoff")
+
+        self.box_size = box_size
+        self.cutoff = cutoff
+        self.n_cells = n
+        self.cell_size = box_size / n
+
+        self.grid = np.stack(np.unravel_index(np.arange(n**3), (n, n, n)), axis=1)
+        offsets = np.array(list(product((-1, 0, 1), repeat=3)))
+        shifted = self.grid[:, np.newaxis, :] + offsets  # (n³, 27, 3)
+        self.neighbors = np.ravel_multi_index(tuple(np.moveaxis(shifted % n, -1, 0)), (n, n, n))
+        self.neighbor_shifts = box_size * (shifted // n)  # imagem periódica de cada vizinha
+        self.colors = (self.grid % 2) @ np.array([1, 2, 4])
+
+        self.origin = np.zeros(3)
+        self.cell_of = self.slot_of = np.zeros(0, dtype=int)
+        self.counts = np.zeros(n**3, dtype=int)
+        self.table = np.full((n**3, 1), -1)
+        self.cell_positions = np.full((n**3, 1, 3), np.nan)
+
+    def wrap(self, positions: np.ndarray) -> np.ndarray:
+        """Posições no referencial da grade, em [0, box_size)"""
+        return np.mod(positions - self.origin, self.box_size)
+
+    def build(self, positions: np.ndarray, origin: Optional[np.ndarray] = None) -> None:
+        """Distribui as partículas nas células (grade deslocada por `origin`)"""
+        if origin is not None:
+            self.origin = np.asarray(origin, dtype=float)
+        wrapped = self.wrap(positions)
+        coords = np.minimum((wrapped // self.cell_size).astype(int), self.n_cells - 1)
+        self.cell_of = np.ravel_multi_index(tuple(coords.T), (self.n_cells,) * 3)
+
+        order = np.argsort(self.cell_of, kind='stable')
+        self.counts = np.bincount(self.cell_of, minlength=self.n_cells**3)
+        starts = np.concatenate([[0], np.cumsum(self.counts)[:-1]])
+        self.slot_of = np.empty(len(order), dtype=int)
+        self.slot_of[order] = np.arange(len(order)) - starts[self.cell_of[order]]
+
+        width = max(self.counts.max(initial=0), 1)
+        self.table = np.full((self.n_cells**3, width), -1)
+        self.table[self.cell_of, self.slot_of] = np.arange(len(order))
+        self.cell_positions = np.full((self.n_cells**3, width, 3), np.nan)
+        self.cell_positions[self.cell_of, self.slot_of] = wrapped
+
+    def neighborhood(self, cells: np.ndarray) -> np.ndarray:
+        """Posições das 27 células vizinhas de cada célula, forma (B, 27·largura, 3)"""
+        block = self.cell_positions[self.neighbors[cells]] + self.neighbor_shifts[cells][:, :, np.newaxis, :]
+        return block.reshape(len(cells), -1, 3)
+
+class RunningStatistics:
+    """
+    Média e variância acumuladas online (Welford)
+
+    Blocos de valores são combinados de uma vez pela forma paralela do
+    algoritmo (Chan et al.), sem guardar as amostras e sem a perda de
+    precisão de somar x e x².
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=float).ravel()
+        if values.size == 0:
+            return
+        block_mean = values.mean()
+        block_m2 = np.square(values - block_mean).sum()
+        total = self.count + values.size
+        delta = block_mean - self.mean
+        self.mean += delta * values.size / total
+        self._m2 += block_m2 + delta**2 * self.count * values.size / total
+        self.count = total
+
+    @property
+    def variance(self) -> float:
+        """Variância amostral (nan com menos de duas amostras)"""
+        return self._m2 / (self.count - 1) if self.count > 1 else np.nan
+
 class AdvancedNumericalMethods:
     """
     Implementação de métodos numéricos avançados para física computacional
     Baseado no documento de fine-tuning para IA em física teórica
     """
 
+    # Tabela de Butcher de Dormand-Prince 5(4) (adaptive_runge_kutta)
+    _DP_C = np.array([0, 1/5, 3/10, 4/5, 8/9, 1, 1])
+    _DP_A = np.array([
+        [0, 0, 0, 0, 0],
+        [1/5, 0, 0, 0, 0],
+        [3/40, 9/40, 0, 0, 0],
+        [44/45, -56/15, 32/9, 0, 0],
+        [19372/6561, -25360/2187, 64448/6561, -212/729, 0],
+        [9017/3168, -355/33, 46732/5247, 49/176, -5103/18656]
+    ])
+    _DP_B = np.array([35/384, 0, 500/1113, 125/192, -2187/6784, 11/84])
+    # Diferença entre os pesos de ordem 5 e 4 (inclui o estágio FSAL)
+    _DP_E = np.array([-71/57600, 0, 71/16695, -71/1920, 17253/339200, -22/525, 1/40])
+
     @staticmethod
     def runge_kutta_4(f: Callable, y0: np.ndarray, t0: float, tf: float,
-                      h: float) -> Tuple[np.ndarray, np.ndarray]:
+                      h: float, stride: int = 1,
+                      t_eval: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Método de Runge-Kutta de 4ª ordem para EDOs, com passo fixo
+        Parâmetros:
+        - f: função dy/dt = f(t,y); recebe e retorna arrays com a forma de y0
+        - y0: condições iniciais, forma (d,) ou bloco (N, d) com N sistemas
+          avançados juntos (f deve então ser vetorizada sobre as linhas)
+        - t0, tf: intervalo de tempo (tf < t0 integra para trás)
+        - h: passo de integração; o último passo é encurtado para terminar
+          exatamente em tf
+        - stride: grava um a cada `stride` passos (o ponto final é sempre gravado)
+        - t_eval: tempos de saída em [t0, tf], em ordem; os valores entre
+          passos vêm da interpolação de Hermite cúbica (substitui stride)
+
+        Os estágios k1-k4 usam buffers reaproveitados entre os passos e a saída
+        é pré-alocada. Retorna (t, y) com y de forma (n_saídas, *y0.shape).
+        """
+        y = np.array(y0, dtype=float)
+        t0, tf = float(t0), float(tf)
+        direction = 1.0 if tf >= t0 else -1.0
+        h = abs(h)
+
+        # Malha por índice inteiro: sem o acúmulo de arredondamento do np.arange
+        ratio = abs(tf - t0) / h
+        n_steps = int(round(ratio))
+        if abs(n_steps - ratio) > 1e-10 * max(ratio, 1.0):
+            n_steps = int(np.ceil(ratio))
+        step_times = t0 + direction * h * np.arange(n_steps + 1)
+        step_times[-1] = tf
+
+        dense = t_eval is not None
+        if dense:
+            t_out = np.asarray(t_eval, dtype=float)
+            if np.any(direction * np.diff(t_out) < 0):
+                raise ValueError("t_eval deve estar ordenado no sentido da integração")
+            if t_out.size and (direction * (t_out[0] - t0) < 0 or direction * (t_out[-1] - tf) > 0):
+                raise ValueError("t_eval deve estar contido em [t0, tf]")
+        else:
+            record_steps = np.arange(0, n_steps + 1, stride)
+            if record_steps[-1] != n_steps:
+                record_steps = np.append(record_steps, n_steps)
+            t_out = step_times[record_steps]
+
+        y_out = np.empty((t_out.size,) + y.shape)
+        n_out = 0
+        if dense:
+            while n_out < t_out.size and t_out[n_out] == t0:
+                y_out[n_out] = y
+                n_out += 1
+        else:
+            y_out[0] = y
+            n_out = 1
+
+        k1, k2, k3, k4, y_stage = (np.empty_like(y) for _ in range(5))
+        if dense:
+            y_prev, f_prev = np.empty_like(y), np.empty_like(y)
+        k1[...] = f(t0, y)
+
+        for i in range(n_steps):
+            t, t_next = step_times[i], step_times[i + 1]
+            hs = t_next - t
+            if dense:
+                np.copyto(y_prev, y)
+
+            np.multiply(k1, hs / 2, out=y_stage)
+            y_stage += y
+            k2[...] = f(t + hs / 2, y_stage)
+            np.multiply(k2, hs / 2, out=y_stage)
+            y_stage += y
+            k3[...] = f(t + hs / 2, y_stage)
+            np.multiply(k3, hs, out=y_stage)
+            y_stage += y
+            k4[...] = f(t_next, y_stage)
+
+            # y += h/6 (k1 + 2 k2 + 2 k3 + k4), reaproveitando k2 como acumulador
+            k2 += k3
+            k2 *= 2
+            k2 += k1
+            k2 += k4
+            k2 *= hs / 6
+            y += k2
+
+            last = i == n_steps - 1
+            if dense:
+                # f no fim do passo: k1 do próximo passo e derivada da interpolação
+                k1, f_prev = f_prev, k1
+                k1[...] = f(t_next, y)
+
+                n_interp = n_out
+                while n_interp < t_out.size and (last or direction * (t_out[n_interp] - t_next) <= 0):
+                    n_interp += 1
+                if n_interp > n_out:
+                    theta = ((t_out[n_out:n_interp] - t) / hs).reshape((-1,) + (1,) * y.ndim)
+                    theta2, theta3 = theta**2, theta**3
+                    y_out[n_out:n_interp] = (
+                        (2 * theta3 - 3 * theta2 + 1) * y_prev
+                        + (theta3 - 2 * theta2 + theta) * hs * f_prev
+                        + (3 * theta2 - 2 * theta3) * y
+                        + (theta3 - theta2) * hs * k1
+                    )
+                    n_out = n_interp
+            else:
+                if not last:
+                    k1[...] = f(t_next, y)
+                if n_out < t_out.size and i + 1 == record_steps[n_out]:
+                    y_out[n_out] = y
+                    n_out += 1
+
+        return t_out, y_out
+
+    @staticmethod
+    def adaptive_runge_kutta(f: Callable, y0: np.ndarray, t0: float, tf: float,
+                             tol: float = 1e-8, rtol: Optional[float] = None,
+                             atol: Optional[float] = None,
+                             first_step: Optional[float] = None,
+                             max_step: float = np.inf,
+                             return_stats: bool = False):
         """
-        Método de Runge-Kutta de 4ª ordem para EDOs
+        Runge-Kutta adaptativo com par embutido de Dormand-Prince 5(4)
+
+        Sete estágios por passo tentado, seis avaliações novas graças ao FSAL
+        (o último estágio de um passo aceito é o primeiro do seguinte). O erro
+        local vem da diferença entre as soluções de ordem 5 e 4, medida na
+        norma RMS ponderada por atol + rtol·|y|, e o passo é ajustado por um
+        controlador PI. Os resultados são gravados em buffers pré-alocados que
+        crescem por duplicação.
+
         Parâmetros:
         - f: função dy/dt = f(t,y)
         - y0: condições iniciais
-        - t0, tf: intervalo de tempo
-        - h: passo de integração
+        - t0, tf: intervalo de tempo (tf < t0 integra para trás)
+        - tol: tolerância padrão para rtol e atol
+        - rtol, atol: tolerâncias relativa e absoluta (padrão: tol)
+        - first_step: passo inicial (padrão: estimativa de Hairer-Wanner)
+        - max_step: maior passo permitido
+        - return_stats: retornar também as estatísticas da integração
+
+        Retorna (t, y) ou, com return_stats, (t, y, stats), onde stats contém
+        n_accepted, n_rejected, nfev, success e message. Se o passo ficar
+        abaixo da resolução numérica a integração é interrompida e
+        success=False (t[-1] < tf).
         """
-        t_values = np.arange(t0, tf + h, h)
-        y_values = np.zeros((len(t_values), len(y0)))
-        y_values[0] = y0
+        C = AdvancedNumericalMethods._DP_C
+        A = AdvancedNumericalMethods._DP_A
+        B = AdvancedNumericalMethods._DP_B
+        E = AdvancedNumericalMethods._DP_E
+
+        rtol = tol if rtol is None else rtol
+        atol = tol if atol is None else atol
+        safety, min_factor, max_factor = 0.9, 0.2, 10.0
+        beta = 0.04
+        alpha = 1 / 5 - 0.75 * beta
+
+        y = np.array(y0, dtype=float)
+        t = float(t0)
+        tf = float(tf)
+        direction = 1.0 if tf >= t else -1.0
+        n = y.size
+
+        if tf == t:
+            # Intervalo vazio: só o estado inicial (como solve_ivp)
+            if not return_stats:
+                return np.array([t]), y[np.newaxis]
+            return np.array([t]), y[np.newaxis], {'n_accepted': 0, 'n_rejected': 0, 'nfev': 0,
+                                                  'success': True,
+                                                  'message': 'Integração concluída'}
+
+        K = np.empty((7, n))
+        K[0] = f(t, y)
+        nfev = 1
+
+        def rms_norm(x):
+            return np.sqrt(np.mean(x * x))
+
+        if first_step is None:
+            scale = atol + rtol * np.abs(y)
+            d0, d1 = rms_norm(y / scale), rms_norm(K[0] / scale)
+            h0 = 1e-6 if d0 < 1e-5 or d1 < 1e-5 else 0.01 * d0 / d1
+            h0 = min(h0, abs(tf - t))
+            f1 = f(t + direction * h0, y + direction * h0 * K[0])
+            nfev += 1
+            d2 = rms_norm((f1 - K[0]) / scale) / h0
+            if d1 <= 1e-15 and d2 <= 1e-15:
+                h1 = max(1e-6, h0 * 1e-3)
+            else:
+                h1 = (0.01 / max(d1, d2)) ** (1 / 5)
+            h = min(100 * h0, h1)
+        else:
+            h = abs(first_step)
+        h = min(h, max_step)
+
+        # Buffers de saída pré-alocados (crescem por duplicação)
+        capacity = 256
+        t_values = np.empty(capacity)
+        y_values = np.empty((capacity, n))
+        t_values[0] = t
+        y_values[0] = y
+        n_stored = 1
+
+        n_accepted = n_rejected = 0
+        error_norm_prev = 1e-4
+        success, message = True, 'Integração concluída'
+
+        while direction * (tf - t) > 0:
+            min_step = 10 * np.abs(np.nextafter(t, direction * np.inf) - t)
+            h = min(h, abs(tf - t))
+            if h < min_step:
+                success, message = False, 'Passo abaixo da resolução numérica'
+                break
+
+            step_rejected = False
+            while True:
+                h_signed = direction * h
+                for s in range(1, 6):
+                    K[s] = f(t + C[s] * h_signed, y + h_signed * (A[s, :s] @ K[:s]))
+                y_new = y + h_signed * (B @ K[:6])
+                t_new = t + h_signed if h < abs(tf - t) else tf
+                K[6] = f(t_new, y_new)
+                nfev += 6
+
+                scale = atol + rtol * np.maximum(np.abs(y), np.abs(y_new))
+                error_norm = rms_norm(h_signed * (E @ K) / scale)
+
+                if error_norm <= 1:
+                    # Controlador PI; sem aumento logo após uma rejeição
+                    if error_norm == 0:
+                        factor = max_factor
+                    else:
+                        factor = safety * error_norm ** -alpha * error_norm_prev ** beta
+                        factor = min(max(factor, min_factor), max_factor)
+                    if step_rejected:
+                        factor = min(factor, 1.0)
+                    error_norm_prev = max(error_norm, 1e-4)
+                    h = min(h * factor, max_step)
+                    break
+
+                n_rejected += 1
+                step_rejected = True
+                h *= max(min_factor, safety * error_norm ** -0.2)
+                if h < min_step:
+                    break
+
+            if not error_norm <= 1:
+                success, message = False, 'Passo abaixo da resolução numérica'
+                break
+
+            # Aceitar passo (FSAL: último estágio vira o primeiro do próximo)
+            n_accepted += 1
+            t, y = t_new, y_new
+            K[0] = K[6]
+
+            if n_stored == capacity:
+                capacity *= 2
+                t_values = np.resize(t_values, capacity)
+                y_values = np.resize(y_values, (capacity, n))
+            t_values[n_stored] = t
+            y_values[n_stored] = y
+            n_stored += 1
+
+        t_values = t_values[:n_stored]
+        y_values = y_values[:n_stored]
+
+        if not return_stats:
+            return t_values, y_values
+
+        stats = {
+            'n_accepted': n_accepted,
+            'n_rejected': n_rejected,
+            'nfev': nfev,
+            'success': success,
+            'message': message
+        }
+        return t_values, y_values, stats
 
-        for i in range(1, len(t_values)):
-            t = t_values[i-1]
-            y = y_values[i-1]
+    @staticmethod
+    def segmented_solve_ivp(fun: Callable, t_span: Tuple[float, float], y0: np.ndarray,
+                            t_eval: Optional[np.ndarray] = None, method: str = 'DOP853',
+                            boundaries=EPOCH_BOUNDARIES, **options) -> OptimizeResult:
+        """
+        Integração por segmentos, reiniciando o integrador em cada fronteira
 
-            k1 = h * f(t, y)
-            k2 = h * f(t + h/2, y + k1/2)
-            k3 = h * f(t + h/2, y + k2/2)
-            k4 = h * f(t + h, y + k3)
+        O intervalo é dividido nas fronteiras (descontinuidades conhecidas do
+        lado direito) e cada segmento é integrado separadamente, partindo do
+        estado final do anterior. Cada segmento escolhe seu próprio passo
+        inicial e tem suas próprias estatísticas de passos aceitos/rejeitados.
 
-            y_values[i] = y + (k1 + 2*k2 + 2*k3 + k4)/6
+        Parameters:
+        -----------
+        fun : Callable
+            Lado direito f(t, y)
+        t_span : Tuple[float, float]
+            Intervalo de integração
+        y0 : np.ndarray
+            Condições iniciais
+        t_eval : np.ndarray, optional
+            Tempos de saída (saída densa); se None, retorna os passos aceitos
+        method : str
+            Integrador do SciPy (chave de IVP_METHODS)
+        boundaries : sequence
+            Tempos de reinício; apenas os interiores a t_span são usados
+        **options
+            Opções repassadas ao integrador (rtol, atol, max_step, ...)
 
-        return t_values, y_values
+        Returns:
+        --------
+        OptimizeResult
+            Campos t, y, success, message, nfev, njev, nlu e `segments`
+            (estatísticas por segmento, com n_rejected = None para métodos
+            implícitos)
+        """
+        solver_class = IVP_METHODS[method]
+        t0, tf = float(t_span[0]), float(t_span[1])
+        edges = [t0] + [b for b in sorted(boundaries) if t0 < b < tf] + [tf]
+        n_stages = getattr(solver_class, 'n_stages', None)
+
+        y = np.asarray(y0, dtype=float)
+        if t_eval is not None:
+            t_eval = np.asarray(t_eval, dtype=float)
+            output_y = np.empty((len(y), len(t_eval)))
+            n_written = 0
+        else:
+            step_t, step_y = [t0], [y.copy()]
+
+        segments = []
+        success, message = True, 'A integração chegou ao fim do intervalo.'
+
+        for seg_start, seg_end in zip(edges[:-1], edges[1:]):
+            solver = solver_class(fun, seg_start, y, seg_end, **options)
+            n_accepted, n_rejected, initial_step = 0, 0, None
+
+            if t_eval is not None and n_written < len(t_eval) and t_eval[n_written] == seg_start:
+                output_y[:, n_written] = y
+                n_written += 1
+
+            while solver.status == 'running':
+                nfev_before = solver.nfev
+                solver.step()
+                if solver.status == 'failed':
+                    break
+
+                n_accepted += 1
+                if initial_step is None:
+                    initial_step = solver.t - solver.t_old
+                if n_stages:
+                    n_rejected += max((solver.nfev - nfev_before) // n_stages - 1, 0)
+
+                if t_eval is None:
+                    step_t.append(solver.t)
+                    step_y.append(solver.y.copy())
+                else:
+                    n_end = np.searchsorted(t_eval, solver.t, side='right')
+                    if n_end > n_written:
+                        dense = solver.dense_output()
+                        output_y[:, n_written:n_end] = dense(t_eval[n_written:n_end])
+                        n_written = n_end
+
+            segments.append({
+                't_start': seg_start,
+                't_end': float(solver.t),
+                'status': solver.status,
+                'initial_step': None if initial_step is None else float(initial_step),
+                'n_accepted': n_accepted,
+                'n_rejected': n_rejected if n_stages else None,
+                'nfev': int(solver.nfev),
+                'njev': int(solver.njev),
+                'nlu': int(solver.nlu)
+            })
 
-    @staticmethod
-    def adaptive_runge_kutta(f: Callable, y0: np.ndarray, t0: float, tf: float,
-                           tol: float = 1e-8) -> Tuple[np.ndarray, np.ndarray]:
-        """Runge-Kutta adaptativo com controle de erro"""
-        t_values = [t0]
-        y_values = [y0.copy()]
-        h = (tf - t0) / 100  # Passo inicial
+            if solver.status == 'failed':
+                success = False
+                message = f"Falha no segmento [{seg_start:.3e}, {seg_end:.3e}] em t={solver.t:.6e}"
+                break
 
-        while t_values[-1] < tf:
-            t = t_values[-1]
-            y = y_values[-1]
+            y = solver.y.copy()
 
-            # Dois passos: um completo e dois meios
-            k1 = h * f(t, y)
-            k2 = h * f(t + h/2, y + k1/2)
-            k3 = h * f(t + h/2, y + k2/2)
-            k4 = h * f(t + h, y + k3)
+        if t_eval is not None:
+            t_out, y_out = t_eval[:n_written], output_y[:, :n_written]
+        else:
+            t_out, y_out = np.array(step_t), np.array(step_y).T
+
+        return OptimizeResult(
+            t=t_out, y=y_out, success=success, message=message,
+            nfev=sum(seg['nfev'] for seg in segments),
+            njev=sum(seg['njev'] for seg in segments),
+            nlu=sum(seg['nlu'] for seg in segments),
+            segments=segments
+        )
 
-            y_full = y + (k1 + 2*k2 + 2*k3 + k4)/6
+    @staticmethod
+    def finite_difference_solver(psi_0: np.ndarray, V: np.ndarray,
+                               x: np.ndarray, dt: float, n_steps: int,
+                               boundary: str = 'dirichlet',
+                               hbar: float = 1.0545718e-34,
+                               mass: float = 9.1093837015e-31) -> np.ndarray:
+        """
+        Solução da equação de Schrödinger usando diferenças finitas
+        Implementação do método de Crank-Nicolson para estabilidade
 
-            # Dois passos de h/2
-            h_half = h / 2
-            k1_h = h_half * f(t, y)
-            k2_h = h_half * f(t + h_half/2, y + k1_h/2)
-            k3_h = h_half * f(t + h_half/2, y + k2_h/2)
-            k4_h = h_half * f(t + h_half, y + k3_h)
+        (1 + iHΔt/2ħ)ψ^{n+1} = (1 - iHΔt/2ħ)ψ^n, com H tridiagonal fatorado
+        uma vez (ver CrankNicolsonPropagator): O(n) por passo e norma
+        conservada. `boundary` é 'dirichlet' ou 'periodic'; psi_0 pode ter
+        forma (n,) ou (n, k).
+        """
+        dx = x[1] - x[0]
+        propagator = CrankNicolsonPropagator(V, dx, dt, hbar=hbar, mass=mass, boundary=boundary)
+        return propagator.step(psi_0, n_steps)
 
-            y_half_1 = y + (k1_h + 2*k2_h + 2*k3_h + k4_h)/6
+    @staticmethod
+    def split_operator_solver(psi_0: np.ndarray, V: np.ndarray,
+                              x: np.ndarray, dt: float, n_steps: int,
+                              boundary: str = 'periodic',
+                              hbar: float = 1.0545718e-34,
+                              mass: float = 9.1093837015e-31,
+                              absorbing_fraction: float = 0.1) -> np.ndarray:
+        """
+        Solução da equação de Schrödinger pelo método split-operator (FFT)
 
-            k1_h2 = h_half * f(t + h_half, y_half_1)
-            k2_h2 = h_half * f(t + h_half + h_half/2, y_half_1 + k1_h2/2)
-            k3_h2 = h_half * f(t + h_half + h_half/2, y_half_1 + k2_h2/2)
-            k4_h2 = h_half * f(t + h_half + h_half, y_half_1 + k3_h2)
+        Alternativa espectral a finite_difference_solver, com os mesmos
+        argumentos e o mesmo formato de resultado (ver
+        SplitOperatorPropagator). `boundary` é 'periodic' ou 'absorbing';
+        psi_0 pode ter forma (n,) ou (n, k).
+        """
+        dx = x[1] - x[0]
+        propagator = SplitOperatorPropagator(V, dx, dt, hbar=hbar, mass=mass, boundary=boundary,
+                                             absorbing_fraction=absorbing_fraction)
+        return propagator.step(psi_0, n_steps)
 
-            y_half_2 = y_half_1 + (k1_h2 + 2*k2_h2 + 2*k3_h2 + k4_h2)/6
+    @staticmethod
+    def _pair_energies(cells: CellList, cell_indices: np.ndarray, slots: np.ndarray,
+                       trials: np.ndarray, pair_potential: Callable, cutoff: float,
+                       shift: float) -> np.ndarray:
+        """
+        Energia de interação das partículas (cell_indices, slots) colocadas em
+        cada conjunto de posições de `trials` (forma (T, B, 3), referencial da
+        grade) com as vizinhas a menos de `cutoff`; retorna forma (T, B)
+        """
+        neighborhood = cells.neighborhood(cell_indices)
+        self_index = CellList.CENTER * cells.table.shape[1] + slots
+        rows = np.arange(len(cell_indices))
+        energies = np.zeros(trials.shape[:2])
+        for t, trial in enumerate(trials):
+            separation = neighborhood - trial[:, np.newaxis, :]
+            r_squared = np.einsum('bkd,bkd->bk', separation, separation)
+            r_squared[rows, self_index] = np.inf  # a própria partícula
+            inside = r_squared < cutoff**2  # preenchimento NaN fica de fora
+            pair = np.zeros(r_squared.shape)
+            pair[inside] = pair_potential(np.sqrt(r_squared[inside])) - shift
+            energies[t] = pair.sum(axis=1)
+        return energies
 
-            # Estimativa do erro
-            error = np.linalg.norm(y_half_2 - y_full)
-            if error > tol:
-                h *= 0.9 * (tol / error) ** (1/4)
-                continue
+    @staticmethod
+    def pairwise_metropolis_sweeps(positions: np.ndarray, pair_potential: Callable,
+                                   cutoff: float, box_size: float, temperature: float,
+                                   n_sweeps: int, step_size: float = 0.1,
+                                   rng: Optional[np.random.Generator] = None,
+                                   shift: bool = True,
+                                   chunk_size: int = 4096) -> Tuple[np.ndarray, np.ndarray, float]:
+        """
+        Varreduras de Metropolis em tabuleiro para potenciais de pares com cutoff
 
-            # Aceitar passo
-            t_values.append(t + h)
-            y_values.append(y_half_2)
+        As partículas ficam numa CellList de células pares; a cada varredura a
+        grade é deslocada por uma origem aleatória (o que mantém a cadeia
+        ergódica) e as 8 cores do tabuleiro são percorridas em ordem
+        aleatória. Para cada cor, uma partícula sorteada de cada célula ocupada
+        é movida ao mesmo tempo, tantas vezes quanto a ocupação média das
+        células; a variação de energia usa só as 27 células vizinhas (custo
+        O(1) por movimento). Movimentos que saem da célula são rejeitados, o
+        que preserva o índice durante a varredura e o balanço detalhado.
 
-            # Ajustar tamanho do passo
-            if error < tol/10:
-                h *= 1.1
+        Parameters:
+        -----------
+        positions : np.ndarray
+            Posições iniciais, forma (N, 3)
+        pair_potential : callable
+            Energia de um par em função da distância (vetorizada)
+        cutoff : float
+            Raio de corte
+        box_size : float
+            Lado da caixa periódica
+        temperature : float
+            Temperatura em Kelvin
+        n_sweeps : int
+            Número de varreduras
+        step_size : float
+            Desvio padrão do deslocamento proposto (menor que cutoff)
+        rng : np.random.Generator, optional
+            Gerador de números aleatórios
+        shift : bool
+            Deslocar o potencial para zero em r = cutoff
+        chunk_size : int
+            Partículas por bloco no cálculo da energia total inicial
 
-        return np.array(t_values), np.array(y_values)
+        Returns:
+        --------
+        Tuple[np.ndarray, np.ndarray, float]
+            Posições finais (em [-box_size/2, box_size/2)), energia total após
+            cada varredura e taxa de aceitação
+        """
+        rng = rng or np.random.default_rng()
+        k_B = 1.380649e-23  # Constante de Boltzmann
+        beta = 1.0 / (k_B * temperature)
+        energy_shift = float(pair_potential(np.array([cutoff]))[0]) if shift else 0.0
+        pair_energies = AdvancedNumericalMethods._pair_energies
+
+        cells = CellList(box_size, cutoff, even=True)
+        color_cells = [np.flatnonzero(cells.colors == color) for color in range(8)]
+        positions = np.array(positions, dtype=float)
+        n_particles = len(positions)
+
+        # Energia total inicial (cada par contado duas vezes)
+        cells.build(positions)
+        total_energy = 0.0
+        for first in range(0, n_particles, chunk_size):
+            particles = np.arange(first, min(first + chunk_size, n_particles))
+            cell_indices, slots = cells.cell_of[particles], cells.slot_of[particles]
+            total_energy += 0.5 * pair_energies(
+                cells, cell_indices, slots, cells.cell_positions[cell_indices, slots][np.newaxis],
+                pair_potential, cutoff, energy_shift
+            ).sum()
+
+        rounds = max(1, int(round(n_particles / cells.n_cells**3)))
+        energy_history = np.empty(n_sweeps)
+        attempted = accepted = 0
+
+        for sweep in range(n_sweeps):
+            cells.build(positions, rng.uniform(0.0, cells.cell_size, 3))
+
+            for color in rng.permutation(8):
+                occupied = color_cells[color][cells.counts[color_cells[color]] > 0]
+                if occupied.size == 0:
+                    continue
+                counts = cells.counts[occupied]
+                cell_low = cells.grid[occupied] * cells.cell_size
+
+                for _ in range(rounds):
+                    # Uma partícula sorteada de cada célula ocupada desta cor
+                    slots = (rng.random(occupied.size) * counts).astype(int)
+                    old = cells.cell_positions[occupied, slots]
+                    displacement = step_size * rng.standard_normal(old.shape)
+                    new = old + displacement
+
+                    old_energy, new_energy = pair_energies(cells, occupied, slots,
+                                                           np.stack([old, new]), pair_potential,
+                                                           cutoff, energy_shift)
+                    delta_E = new_energy - old_energy
+                    offset = new - cell_low
+                    stays = np.all((offset >= 0) & (offset < cells.cell_size), axis=1)
+
+                    # Critério de Metropolis: aceitar com probabilidade min(1, exp(-βΔE))
+                    accept = stays & (rng.random(occupied.size)
+                                      < np.exp(np.minimum(-beta * np.where(stays, delta_E, 0.0), 0.0)))
+                    cells.cell_positions[occupied[accept], slots[accept]] = new[accept]
+                    positions[cells.table[occupied[accept], slots[accept]]] += displacement[accept]
+                    total_energy += delta_E[accept].sum()
+                    attempted += occupied.size
+                    accepted += np.count_nonzero(accept)
+
+            energy_history[sweep] = total_energy
+
+        positions = np.mod(positions + box_size / 2, box_size) - box_size / 2
+        return positions, energy_history, accepted / max(attempted, 1)
 
     @staticmethod
-    def finite_difference_solver(psi_0: np.ndarray, V: np.ndarray,
-                               x: np.ndarray, dt: float, n_steps: int) -> np.ndarray:
+    def transfer_matrix_transmission(V: np.ndarray, x: np.ndarray, energies: np.ndarray,
+                                     hbar: float = 1.0545718e-34,
+                                     mass: float = 9.1093837015e-31,
+                                     chunk_bytes: int = 32 * 2**20) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Solução da equação de Schrödinger usando diferenças finitas
-        Implementação do método de Crank-Nicolson para estabilidade
+        Coeficientes de transmissão e reflexão pelo método da matriz de transferência
+
+        O potencial é constante por partes: cada ponto x_j representa uma
+        fatia de largura dx com V_j (fatias vizinhas iguais são fundidas), e
+        V[0] e V[-1] se estendem aos terminais à esquerda e à direita. Em
+        cada fatia (ψ, ψ') é transportado por [[cos kd, sin kd / k],
+        [-k sin kd, cos kd]] (cosh/sinh sob barreiras, onde k é imaginário);
+        as matrizes 2×2 de todas as energias são multiplicadas juntas,
+        componente a componente, em blocos de fatias reduzidos aos pares.
+
+        Parameters:
+        -----------
+        V : np.ndarray
+            Potencial na malha uniforme x
+        x : np.ndarray
+            Malha
+        energies : np.ndarray
+            Energias de incidência (pela esquerda)
+        hbar, mass : float
+            Constante de Planck reduzida e massa da partícula
+        chunk_bytes : int
+            Memória aproximada de cada bloco de matrizes
+
+        Returns:
+        --------
+        Tuple[np.ndarray, np.ndarray]
+            T(E) e R(E); NaN onde E ≤ V[0] (sem onda incidente propagante)
         """
+        V = np.asarray(V, dtype=float)
+        energies = np.asarray(energies, dtype=float)
         dx = x[1] - x[0]
-        n_points = len(x)
-        hbar = 1.0545718e-34
-        m = 9.1093837015e-31  # massa do elétron
+        scale = 2 * mass / hbar**2
+
+        # Fundir fatias consecutivas com o mesmo potencial
+        starts = np.flatnonzero(np.concatenate([[True], V[1:] != V[:-1]]))
+        slab_V = V[starts]
+        slab_width = np.diff(np.append(starts, V.size)) * dx
+
+        def multiply(later, earlier):
+            """Produto de pilhas de matrizes 2×2 guardadas como (m11, m12, m21, m22)"""
+            a11, a12, a21, a22 = later
+            b11, b12, b21, b22 = earlier
+            return (a11 * b11 + a12 * b21, a11 * b12 + a12 * b22,
+                    a21 * b11 + a22 * b21, a21 * b12 + a22 * b22)
+
+        # k² é real, logo as matrizes também: cos/sin acima do potencial, cosh/sinh abaixo
+        total = (np.ones(energies.size), np.zeros(energies.size),
+                 np.zeros(energies.size), np.ones(energies.size))
+        chunk = max(1, chunk_bytes // (32 * max(energies.size, 1)))
+        with np.errstate(over='ignore', invalid='ignore'):
+            for first in range(0, slab_V.size, chunk):
+                width = slab_width[first:first + chunk]
+                k_squared = scale * (energies[:, np.newaxis] - slab_V[first:first + chunk])
+                k_abs = np.sqrt(np.abs(k_squared))
+                phase = k_abs * width
+                above = k_squared >= 0
+                cos_kd = np.where(above, np.cos(phase), np.cosh(phase))
+                sin_kd = np.where(above, np.sin(phase), np.sinh(phase))
+                sinc_d = np.divide(sin_kd, k_abs, out=np.broadcast_to(width, phase.shape).copy(),
+                                   where=k_abs > 0)  # sin(kd)/k, igual a d em k = 0
+                matrices = (cos_kd, sinc_d, -k_squared * sinc_d, cos_kd)
+
+                # Produto ordenado (fatias posteriores à esquerda), reduzido aos pares
+                while matrices[0].shape[1] > 1:
+                    if matrices[0].shape[1] % 2:
+                        matrices = tuple(np.concatenate([m, np.full((energies.size, 1), value)], axis=1)
+                                         for m, value in zip(matrices, (1.0, 0.0, 0.0, 1.0)))
+                    matrices = multiply(tuple(m[:, 1::2] for m in matrices),
+                                        tuple(m[:, 0::2] for m in matrices))
+                total = multiply(tuple(m[:, 0] for m in matrices), total)
+
+        k_left = np.sqrt(scale * (energies - V[0]).astype(complex))
+        k_right = np.sqrt(scale * (energies - V[-1]).astype(complex))
+        M11, M12, M21, M22 = total
+        a = 1j * k_right * M11 - M21
+        b = 1j * k_left * M22 + k_left * k_right * M12
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = 2j * k_left / (a + b)
+            r = (b - a) / (a + b)
+            transmission = np.where(k_right.imag == 0, k_right.real / k_left.real, 0.0) * np.abs(t)**2
+            reflection = np.abs(r)**2
+
+        # Barreiras tão espessas que o produto transborda: T = 0
+        overflow = ~np.isfinite(transmission)
+        transmission[overflow], reflection[overflow] = 0.0, 1.0
+
+        incident = energies > V[0]
+        transmission = np.where(incident, transmission, np.nan)
+        reflection = np.where(incident, reflection, np.nan)
+        return transmission, reflection
+
+    @staticmethod
+    def monte_carlo_simulation(n_particles: int, potential_func: Callable,
+                             temperature: float, box_size: float,
+                             n_steps: int, mode: str = 'single',
+                             step_size: float = 0.1,
+                             rng: Optional[np.random.Generator] = None,
+                             n_tune: int = 0,
+                             target_acceptance: float = 0.3) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Simulação Monte Carlo para sistemas físicos
+        Implementa algoritmo de Metropolis para amostragem
+
+        mode='single' move uma partícula por passo e registra a energia da
+        partícula movida. mode='sweep' move todas as partículas a cada passo
+        (ver metropolis_sweeps), exige potential_func separável e registra a
+        energia total após cada varredura. Com n_tune > 0, step_size é só o
+        ponto de partida de um aquecimento que ajusta a largura da proposta
+        (ver adaptive_metropolis).
+        """
+        rng = rng or np.random.default_rng()
+        positions = rng.uniform(-box_size/2, box_size/2, (n_particles, 3))
+        run = AdvancedNumericalMethods.adaptive_metropolis(
+            positions, potential_func, temperature, box_size, n_steps, mode, step_size, rng,
+            n_tune=n_tune, target_acceptance=target_acceptance
+        )
+        return run['positions'], run['energy_history']
+
+    @staticmethod
+    def single_particle_metropolis(positions: np.ndarray, potential_func: Callable,
+                                   temperature: float, n_steps: int, step_size: float = 0.1,
+                                   rng: Optional[np.random.Generator] = None,
+                                   return_total: bool = False,
+                                   total_energy: Optional[float] = None):
+        """
+        Metropolis com uma partícula por passo (mode='single')
+
+        Com return_total, a energia total do sistema também é acompanhada,
+        somando o ΔE de cada movimento aceito à energia inicial
+        (`total_energy`, ou a soma de potential_func sobre as partículas).
+        É essa série, e não a energia da partícula movida, que mede a
+        mistura da cadeia.
+
+        Returns:
+        --------
+        Tuple[np.ndarray, np.ndarray, float]
+            Posições finais, energia da partícula movida em cada passo e taxa
+            de aceitação; com return_total, também a energia total após cada
+            passo
+        """
+        rng = rng or np.random.default_rng()
+        n_particles = len(positions)
+        energies = []
+        accepted = 0
+        if return_total:
+            if total_energy is None:
+                total_energy = float(sum(potential_func(position) for position in positions))
+            totals = np.empty(n_steps)
+
+        k_B = 1.380649e-23  # Constante de Boltzmann
+
+        for step in range(n_steps):
+            # Escolher partícula aleatoriamente
+            particle_idx = rng.integers(n_particles)
+
+            # Propor nova posição
+            old_pos = positions[particle_idx].copy()
+            new_pos = old_pos + rng.normal(0, step_size, 3)
+
+            # Calcular mudança de energia
+            old_energy = potential_func(old_pos)
+            new_energy = potential_func(new_pos)
+
+            delta_E = new_energy - old_energy
+
+            # Critério de Metropolis
+            if delta_E <= 0 or rng.random() < np.exp(-delta_E / (k_B * temperature)):
+                positions[particle_idx] = new_pos
+                current_energy = new_energy
+                accepted += 1
+                if return_total:
+                    total_energy += delta_E
+            else:
+                current_energy = old_energy
+
+            energies.append(current_energy)
+            if return_total:
+                totals[step] = total_energy
+
+        if return_total:
+            return positions, np.array(energies), accepted / max(n_steps, 1), totals
+        return positions, np.array(energies), accepted / max(n_steps, 1)
+
+    @staticmethod
+    def metropolis_chain(positions: np.ndarray, potential_func: Callable,
+                         temperature: float, box_size: float, n_steps: int,
+                         mode: str = 'single', step_size: float = 0.1,
+                         rng: Optional[np.random.Generator] = None,
+                         pair_potential: Optional[Callable] = None,
+                         cutoff: float = 2.5) -> Tuple[np.ndarray, np.ndarray, float]:
+        """
+        Continua uma cadeia de Metropolis a partir de `positions`
+
+        Escolhe o algoritmo pelo modo: 'single' (single_particle_metropolis),
+        'sweep' com potencial separável (metropolis_sweeps) ou 'sweep' com
+        `pair_potential` (pairwise_metropolis_sweeps). Todo o sorteio usa
+        `rng`, de modo que a cadeia é reproduzível a partir do estado do
+        gerador e das posições.
+
+        Returns:
+        --------
+        Tuple[np.ndarray, np.ndarray, float]
+            Posições finais, histórico de energia e taxa de aceitação
+        """
+        rng = rng or np.random.default_rng()
+        if mode not in ('single', 'sweep'):
+            raise ValueError(f"Modo Monte Carlo desconhecido: {mode}")
+        if pair_potential is not None:
+            if mode != 'sweep':
+                raise ValueError("pair_potential requer mode='sweep'")
+            return AdvancedNumericalMethods.pairwise_metropolis_sweeps(
+                positions, pair_potential, cutoff, box_size, temperature, n_steps, step_size, rng
+            )
+        if mode == 'sweep':
+            return AdvancedNumericalMethods.metropolis_sweeps(
+                positions, potential_func, temperature, n_steps, step_size, rng
+            )
+        return AdvancedNumericalMethods.single_particle_metropolis(
+            positions, potential_func, temperature, n_steps, step_size, rng
+        )
+
+    @staticmethod
+    def adaptive_metropolis(positions: np.ndarray, potential_func: Callable,
+                            temperature: float, box_size: float, n_steps: int,
+                            mode: str = 'single', step_size: float = 0.1,
+                            rng: Optional[np.random.Generator] = None,
+                            pair_potential: Optional[Callable] = None,
+                            cutoff: float = 2.5, n_tune: int = 0,
+                            target_acceptance: float = 0.3, tune_interval: int = 50,
+                            target_ess: Optional[float] = None,
+                            check_interval: Optional[int] = None) -> Dict[str, object]:
+        """
+        Cadeia de Metropolis com ajuste da proposta e tamanho efetivo da amostra
+
+        Aquecimento: n_tune passos em blocos de `tune_interval`; após cada
+        bloco, ln(step_size) avança (a - alvo)/(alvo(1 - alvo))/√(k+1), onde
+        k conta os blocos seguidos com a taxa a perto do alvo (aproximação
+        estocástica: o ganho só decresce depois que a cadeia se acomoda, e
+        volta a 1 enquanto ela ainda relaxa). Blocos sem nenhuma aceitação
+        (ou só com aceitações) dividem (multiplicam) o passo por 10, o que
+        corrige em poucos blocos escalas erradas por muitas ordens de
+        grandeza (k_B em SI). O histórico do aquecimento é descartado.
+
+        Amostragem: com o passo fixo, a energia total é acumulada online
+        (RunningStatistics) e, com `target_ess`, o seu tempo de
+        autocorrelação é reestimado a cada `check_interval` passos; a cadeia
+        para assim que n/τ ≥ target_ess (ou após n_steps). Em mode='single'
+        a energia total é acompanhada pelos ΔE aceitos: a energia da
+        partícula movida, guardada em 'energy_history', é quase
+        descorrelacionada de um passo para o outro e daria τ ≈ 1 qualquer que
+        fosse a mistura.
+
+        Parameters:
+        -----------
+        positions, potential_func, temperature, box_size, mode, step_size, rng, pair_potential, cutoff
+            Como em metropolis_chain (step_size é o valor inicial)
+        n_steps : int
+            Máximo de passos (ou varreduras) de amostragem
+        n_tune : int
+            Passos de aquecimento
+        target_acceptance : float
+            Taxa de aceitação alvo (entre os ótimos 0.44 em 1D e 0.234 em
+            alta dimensão)
+        tune_interval : int
+            Passos por bloco de ajuste
+        target_ess : float, optional
+            Tamanho efetivo da amostra que encerra a amostragem
+        check_interval : int, optional
+            Passos entre estimativas de τ (padrão: n_steps/20)
+
+        Returns:
+        --------
+        Dict[str, object]
+            'positions', 'energy_history' (amostragem), 'total_energy_history',
+            'acceptance_rate', 'step_size' (ajustado), 'step_size_history',
+            'energy_mean' e 'energy_variance' (da energia total),
+            'autocorrelation_time', 'effective_sample_size',
+            'ess_per_second' (tempo total, com o aquecimento), 'elapsed_s' e
+            'reached_target_ess'
+        """
+        rng = rng or np.random.default_rng()
+        start = perf_counter()
+
+        def run(n, step):
+            return AdvancedNumericalMethods.metropolis_chain(
+                positions, potential_func, temperature, box_size, n, mode, step, rng,
+                pair_potential, cutoff
+            )
+
+        step_size_history = [step_size]
+        settled = 0  # blocos seguidos perto do alvo
+        for first in range(0, n_tune, tune_interval):
+            positions, _, acceptance = run(min(tune_interval, n_tune - first), step_size)
+            step_size, settled = AdvancedNumericalMethods.tune_step_size(
+                step_size, acceptance, target_acceptance, settled
+            )
+            step_size_history.append(step_size)
+
+        if target_ess is None:
+            check_interval = n_steps
+        check_interval = max(1, check_interval or n_steps // 20)
+        statistics = RunningStatistics()
+        histories = []
+        total_histories = []  # energia total (igual ao histórico nas varreduras)
+        total_energy = None
+        accepted = 0.0
+        done = 0
+        tau = np.nan
+        reached = False
+        while done < n_steps and not reached:
+            n = min(check_interval, n_steps - done)
+            if mode == 'single' and pair_potential is None:
+                positions, energies, acceptance, totals = \
+                    AdvancedNumericalMethods.single_particle_metropolis(
+                        positions, potential_func, temperature, n, step_size, rng,
+                        return_total=True, total_energy=total_energy
+                    )
+                total_energy = totals[-1] if n else total_energy
+            else:
+                positions, energies, acceptance = run(n, step_size)
+                totals = energies
+            histories.append(energies)
+            total_histories.append(totals)
+            statistics.update(totals)
+            accepted += acceptance * n
+            done += n
+            if target_ess is not None:
+                tau = AdvancedNumericalMethods.integrated_autocorrelation_time(
+                    np.concatenate(total_histories))
+                reached = done / tau >= target_ess
+
+        energy_history = np.concatenate(histories) if histories else np.empty(0)
+        total_energy_history = np.concatenate(total_histories) if total_histories else np.empty(0)
+        if target_ess is None:
+            tau = AdvancedNumericalMethods.integrated_autocorrelation_time(total_energy_history)
+        elapsed = perf_counter() - start
+        ess = done / tau
+
+        return {
+            'positions': positions,
+            'energy_history': energy_history,
+            'total_energy_history': total_energy_history,
+            'acceptance_rate': accepted / max(done, 1),
+            'step_size': step_size,
+            'step_size_history': np.array(step_size_history),
+            'energy_mean': statistics.mean,
+            'energy_variance': statistics.variance,
+            'autocorrelation_time': tau,
+            'effective_sample_size': ess,
+            'ess_per_second': ess / elapsed,
+            'elapsed_s': elapsed,
+            'reached_target_ess': reached
+        }
+
+    @staticmethod
+    def tune_step_size(step_size: float, acceptance: float, target_acceptance: float,
+                       settled: int) -> Tuple[float, int]:
+        """
+        Um passo do ajuste da largura da proposta (ver adaptive_metropolis)
+
+        Returns:
+        --------
+        Tuple[float, int]
+            Novo step_size e número atualizado de blocos seguidos perto do alvo
+        """
+        error = acceptance - target_acceptance
+        settled = settled + 1 if abs(error) < target_acceptance / 2 else 0
+        if acceptance == 0.0:
+            return step_size * 0.1, settled
+        if acceptance == 1.0:
+            return step_size * 10.0, settled
+        return step_size * np.exp(error / (target_acceptance * (1 - target_acceptance))
+                                  / np.sqrt(settled + 1)), settled
+
+    @staticmethod
+    def replica_swaps(energies: np.ndarray, temperatures: np.ndarray, first: int,
+                      rng: np.random.Generator) -> np.ndarray:
+        """
+        Decide as trocas entre as temperaturas vizinhas (i, i+1), i = first, first+2, ...
+
+        Cada troca é aceita com probabilidade min(1, exp[(β_i - β_{i+1})(E_i - E_{i+1})]);
+        os pares são disjuntos, então as decisões são independentes.
+
+        Returns:
+        --------
+        np.ndarray
+            Máscara booleana de forma (M-1,): True nos pares cuja troca foi
+            aceita (False nos pares não tentados)
+        """
+        k_B = 1.380649e-23  # Constante de Boltzmann
+        betas = 1.0 / (k_B * np.asarray(temperatures))
+        accepted = np.zeros(len(energies) - 1, dtype=bool)
+        for i in range(first, len(energies) - 1, 2):
+            log_ratio = (betas[i] - betas[i + 1]) * (energies[i] - energies[i + 1])
+            accepted[i] = log_ratio >= 0 or rng.random() < np.exp(log_ratio)
+        return accepted
+
+    @staticmethod
+    def update_round_trips(trip_stage: np.ndarray, round_trips: np.ndarray,
+                           replica_at: np.ndarray, count: bool = True) -> None:
+        """
+        Atualiza no lugar a contagem de idas e voltas base → topo → base
+
+        trip_stage[r] é 0 enquanto a réplica r não passou pela base, 1 depois
+        de passar pela base e 2 depois de chegar ao topo vindo da base; uma
+        ida e volta é contada (se `count`) quando uma réplica no estágio 2
+        volta à base. `replica_at[i]` é a réplica na temperatura i.
+        """
+        bottom, top = replica_at[0], replica_at[-1]
+        if count and trip_stage[bottom] == 2:
+            round_trips[bottom] += 1
+        trip_stage[bottom] = 1
+        if trip_stage[top] == 1:
+            trip_stage[top] = 2
+
+    @staticmethod
+    def integrated_autocorrelation_time(samples: np.ndarray, window_factor: float = 5.0) -> float:
+        """
+        Tempo de autocorrelação integrado τ = 1 + 2 Σ ρ(t)
+
+        As autocorrelações de todas as cadeias vêm de uma única FFT em lote
+        (com preenchimento de zeros até 2n, sem correlação circular) e são
+        médias entre cadeias; a soma é truncada na primeira janela
+        M ≥ window_factor·τ(M) (janela automática de Sokal). O tamanho
+        efetivo da amostra é n_chains·n/τ.
+
+        Parameters:
+        -----------
+        samples : np.ndarray
+            Amostras, forma (n,) ou (n_chains, n)
+        window_factor : float
+            Constante c da janela automática
+
+        Returns:
+        --------
+        float
+            τ em passos, no mínimo 1 (inf para cadeias que não variam, nan
+            sem amostras)
+        """
+        samples = np.atleast_2d(np.asarray(samples, dtype=float))
+        n = samples.shape[1]
+        if n == 0:
+            return np.nan
+        centered = samples - samples.mean(axis=1, keepdims=True)
+        size = next_fast_len(2 * n, real=True)
+        spectrum = rfft(centered, size, axis=1)
+        autocovariance = irfft(spectrum.real**2 + spectrum.imag**2, size, axis=1)[:, :n].mean(axis=0)
+        if autocovariance[0] <= 0:
+            return np.inf
+
+        taus = 2 * np.cumsum(autocovariance / autocovariance[0]) - 1
+        window = np.flatnonzero(np.arange(n) >= window_factor * taus)
+        tau = taus[window[0]] if window.size else taus[-1]
+        # Séries curtas ou anticorrelacionadas podem dar τ < 1: ESS limitado a n
+        return float(max(tau, 1.0))
+
+    @staticmethod
+    def split_r_hat(samples: np.ndarray) -> float:
+        """
+        R-hat de Gelman-Rubin com cadeias divididas ao meio
+
+        Cada cadeia é dividida em duas metades, o que também acusa tendências
+        dentro de uma cadeia. Valores próximos de 1 (< 1.01) indicam que as
+        cadeias amostram a mesma distribuição.
+
+        Parameters:
+        -----------
+        samples : np.ndarray
+            Amostras, forma (n_chains, n_samples)
+
+        Returns:
+        --------
+        float
+            R-hat (nan com menos de 4 amostras por cadeia)
+        """
+        samples = np.asarray(samples, dtype=float)
+        half = samples.shape[1] // 2
+        if half < 2:
+            return np.nan
+        split = np.concatenate([samples[:, :half], samples[:, -half:]])
+
+        within = split.var(axis=1, ddof=1).mean()
+        between = half * split.mean(axis=1).var(ddof=1)
+        if within == 0:
+            return 1.0 if between == 0 else np.inf
+        pooled = (half - 1) / half * within + between / half
+        return float(np.sqrt(pooled / within))
+
+    @staticmethod
+    def equalize_temperature_ladder(temperatures: np.ndarray, swap_rates: np.ndarray,
+                                    damping: float = 0.5) -> np.ndarray:
+        """
+        Redistribui uma escada de temperaturas para igualar as taxas de troca
+
+        Cada intervalo recebe um custo √(-ln A) (A é a sua taxa de troca), que
+        cresce aproximadamente em proporção à largura do intervalo em ln T; os
+        custos definem uma densidade constante por intervalo, e as novas
+        temperaturas dividem o custo total em partes iguais. As extremidades
+        ficam fixas.
+
+        Parameters:
+        -----------
+        temperatures : np.ndarray
+            Escada crescente, forma (M,)
+        swap_rates : np.ndarray
+            Taxa de aceitação das trocas entre vizinhos, forma (M-1,)
+        damping : float
+            Fração da escada atual mantida (em ln T), contra o ruído das taxas
+
+        Returns:
+        --------
+        np.ndarray
+            Nova escada, forma (M,)
+        """
+        log_T = np.log(temperatures)
+        cost = np.sqrt(-np.log(np.clip(swap_rates, 1e-3, 1 - 1e-3)))
+        arc = np.concatenate([[0.0], np.cumsum(cost)])
+        new_log_T = np.interp(np.linspace(0.0, arc[-1], len(log_T)), arc, log_T)
+        return np.exp(damping * log_T + (1 - damping) * new_log_T)
+
+    @staticmethod
+    def metropolis_sweeps(positions: np.ndarray, potential_func: Callable,
+                          temperature: float, n_sweeps: int, step_size: float = 0.1,
+                          rng: Optional[np.random.Generator] = None) -> Tuple[np.ndarray, np.ndarray, float]:
+        """
+        Varreduras de Metropolis vetorizadas para potenciais separáveis
+
+        Em cada varredura todas as partículas recebem um deslocamento gaussiano
+        ao mesmo tempo, as variações de energia são calculadas por operações de
+        array e o teste de Metropolis é aplicado a todas de uma vez. Como a
+        energia é uma soma de termos de uma partícula, os movimentos são
+        independentes e a varredura equivale a N passos de Metropolis. A
+        energia total é atualizada só com as variações aceitas, sem somar o
+        sistema inteiro de novo.
+
+        Parameters:
+        -----------
+        positions : np.ndarray
+            Posições iniciais, forma (N, d); atualizadas no lugar
+        potential_func : callable
+            Energia de cada partícula: forma (N, d) -> (N,)
+        temperature : float
+            Temperatura em Kelvin
+        n_sweeps : int
+            Número de varreduras
+        step_size : float
+            Desvio padrão do deslocamento proposto
+        rng : np.random.Generator, optional
+            Gerador de números aleatórios
+
+        Returns:
+        --------
+        Tuple[np.ndarray, np.ndarray, float]
+            Posições finais, energia total após cada varredura e taxa de aceitação
+        """
+        rng = rng or np.random.default_rng()
+        k_B = 1.380649e-23  # Constante de Boltzmann
+        beta = 1.0 / (k_B * temperature)
+
+        particle_energies = np.asarray(potential_func(positions), dtype=float)
+        if particle_energies.shape != positions.shape[:1]:
+            raise ValueError("metropolis_sweeps requer potential_func separável: "
+                             "(N, d) -> energias (N,) de cada partícula")
+        total_energy = particle_energies.sum()
+
+        energy_history = np.empty(n_sweeps)
+        proposal = np.empty_like(positions)
+        uniform = np.empty(len(positions))
+        accepted = 0
+
+        for sweep in range(n_sweeps):
+            rng.standard_normal(out=proposal)
+            proposal *= step_size
+            proposal += positions
+
+            delta_E = potential_func(proposal) - particle_energies
+
+            # Critério de Metropolis: aceitar com probabilidade min(1, exp(-βΔE))
+            rng.random(out=uniform)
+            accept = uniform < np.exp(np.minimum(-beta * delta_E, 0.0))
+
+            np.copyto(positions, proposal, where=accept[:, np.newaxis])
+            accepted_delta = np.where(accept, delta_E, 0.0)
+            particle_energies += accepted_delta
+            total_energy += accepted_delta.sum()
+            accepted += np.count_nonzero(accept)
+            energy_history[sweep] = total_energy
+
+        acceptance_rate = accepted / max(n_sweeps * len(positions), 1)
+        return positions, energy_history, acceptance_rate
+
+class DynamicCoefficientTable:
+    """
+    Tabelas de interpolação das funções dependentes do tempo da cosmologia
+
+    Aproxima G(t), c(t), h(t), alpha(t) e a compressão TARDIS por polinômios
+    de Chebyshev por partes. As partes são separadas nas fronteiras das épocas
+    (t = 1, 1e3, 1e5 e 1e6) e refinadas por bisseção até que o erro relativo,
+    medido contra as funções analíticas em uma amostra densa de cada
+    sub-intervalo, fique abaixo da tolerância. Sub-intervalos que não atingem a
+    tolerância, os instantes exatos de fronteira e tempos fora do intervalo
+    tabelado são avaliados pelas funções analíticas.
+    """
+
+    ROWS = DYNAMIC_CONSTANT_NAMES + ('compression',)
+    FORMAT_VERSION = 1
+    _CHUNK_SIZE = 16384
+
+    def __init__(self, breakpoints: np.ndarray, coefficients: np.ndarray,
+                 analytic_intervals: np.ndarray, max_errors: np.ndarray,
+                 tolerance: float, analytic_func: Callable, key: str = ''):
+        """
+        Parameters:
+        -----------
+        breakpoints : np.ndarray
+            Extremos dos sub-intervalos, forma (m+1,)
+        coefficients : np.ndarray
+            Coeficientes de Chebyshev, forma (m, 5, grau+1)
+        analytic_intervals : np.ndarray
+            Sub-intervalos avaliados analiticamente, forma (m,)
+        max_errors : np.ndarray
+            Maior erro relativo medido para cada função tabelada, forma (5,)
+        tolerance : float
+            Tolerância de erro relativo usada na construção
+        analytic_func : Callable
+            Funções analíticas t -> array (5, ...) usadas como fallback
+        key : str
+            Hash da configuração que gerou as tabelas
+        """
+        self.breakpoints = np.asarray(breakpoints, dtype=float)
+        self.coefficients = np.asarray(coefficients, dtype=float)
+        self.analytic_intervals = np.asarray(analytic_intervals, dtype=bool)
+        self.max_errors = np.asarray(max_errors, dtype=float)
+        self.tolerance = float(tolerance)
+        self.analytic_func = analytic_func
+        self.key = key
+
+        self.degree = self.coefficients.shape[2] - 1
+        self._orders = np.arange(self.degree + 1, dtype=float)
+        self._centers = 0.5 * (self.breakpoints[1:] + self.breakpoints[:-1])
+        self._inv_half_widths = 2.0 / (self.breakpoints[1:] - self.breakpoints[:-1])
+        self._breakpoint_list = self.breakpoints.tolist()
+        self._analytic_list = self.analytic_intervals.tolist()
+
+    @property
+    def n_intervals(self) -> int:
+        return len(self.coefficients)
+
+    @classmethod
+    def build(cls, analytic_func: Callable, time_range: Tuple[float, float],
+              tolerance: float = 1e-10, degree: int = 16, max_depth: int = 40,
+              key: str = '') -> 'DynamicCoefficientTable':
+        """
+        Constrói as tabelas por bisseção adaptativa
+
+        Parameters:
+        -----------
+        analytic_func : Callable
+            Funções analíticas t -> array (5, n)
+        time_range : Tuple[float, float]
+            Intervalo de tempo tabelado
+        tolerance : float
+            Erro relativo máximo admitido em cada sub-intervalo
+        degree : int
+            Grau dos polinômios de Chebyshev
+        max_depth : int
+            Número máximo de bisseções; sub-intervalos que ainda excedem a
+            tolerância passam a ser avaliados analiticamente
+
+        Returns:
+        --------
+        DynamicCoefficientTable
+            Tabelas verificadas contra as funções analíticas
+        """
+        t_lo, t_hi = float(time_range[0]), float(time_range[1])
+        edges = [t_lo] + [b for b in EPOCH_BOUNDARIES if t_lo < b < t_hi] + [t_hi]
+
+        orders = np.arange(degree + 1, dtype=float)
+        # Nós de Chebyshev (interiores, evitando os valores de fronteira)
+        nodes = np.cos(np.pi * (orders + 0.5) / (degree + 1))
+        # Pontos de verificação densos, concentrados perto das bordas
+        n_check = 4 * (degree + 1)
+        checks = np.cos(np.pi * np.arange(1, n_check) / n_check)
+        check_basis = np.cos(orders[:, np.newaxis] * np.arccos(checks))
+
+        breakpoints = [edges[0]]
+        coefficients = []
+        analytic_intervals = []
+        max_errors = np.zeros(len(cls.ROWS))
+
+        for a, b in zip(edges[:-1], edges[1:]):
+            stack = [(a, b, 0)]
+            while stack:
+                lo, hi, depth = stack.pop()
+                center, half = 0.5 * (lo + hi), 0.5 * (hi - lo)
+
+                samples = analytic_func(center + half * nodes)
+                coeffs = np.polynomial.chebyshev.chebfit(nodes, samples.T, degree).T
+
+                reference = analytic_func(center + half * checks)
+                scale = np.maximum(np.abs(reference), np.finfo(float).tiny)
+                error = np.max(np.abs(coeffs @ check_basis - reference) / scale, axis=1)
+
+                converged = bool(np.all(error <= tolerance))
+                if not converged and depth < max_depth and hi - lo > 1e-12 * max(abs(center), 1.0):
+                    mid = center
+                    stack.append((mid, hi, depth + 1))
+                    stack.append((lo, mid, depth + 1))
+                    continue
+
+                breakpoints.append(hi)
+                coefficients.append(coeffs)
+                analytic_intervals.append(not converged)
+                if converged:
+                    max_errors = np.maximum(max_errors, error)
+
+        return cls(np.array(breakpoints), np.array(coefficients), np.array(analytic_intervals),
+                   max_errors, tolerance, analytic_func, key)
+
+    def save(self, filename: str) -> None:
+        """Salva as tabelas em formato .npz"""
+        np.savez(filename, breakpoints=self.breakpoints, coefficients=self.coefficients,
+                 analytic_intervals=self.analytic_intervals, max_errors=self.max_errors,
+                 tolerance=self.tolerance, version=self.FORMAT_VERSION, key=self.key)
+
+    @classmethod
+    def load(cls, filename: str, analytic_func: Callable) -> 'DynamicCoefficientTable':
+        """Carrega tabelas salvas por `save`"""
+        with np.load(filename) as data:
+            if int(data['version']) != cls.FORMAT_VERSION:
+                raise ValueError(f"Versão de tabela incompatível em {filename}")
+            return cls(data['breakpoints'], data['coefficients'], data['analytic_intervals'],
+                       data['max_errors'], float(data['tolerance']), analytic_func, str(data['key']))
+
+    def evaluate(self, time) -> np.ndarray:
+        """
+        Avalia as funções tabeladas
+
+        Parameters:
+        -----------
+        time : float ou np.ndarray
+            Tempo(s) adimensional(is)
+
+        Returns:
+        --------
+        np.ndarray
+            Valores de G, c, h, alpha e compressão, forma (5,) para tempo
+            escalar ou (5, *time.shape) para arrays
+        """
+        time = np.asarray(time, dtype=float)
+        if time.ndim == 0:
+            return self._evaluate_scalar(float(time))
+
+        flat = time.ravel()
+        idx = np.searchsorted(self.breakpoints, flat, side='right') - 1
+        idx[flat == self.breakpoints[-1]] = self.n_intervals - 1
+
+        tabulated = (idx >= 0) & (idx < self.n_intervals) & ~np.isin(flat, EPOCH_BOUNDARIES)
+        tabulated[tabulated] = ~self.analytic_intervals[idx[tabulated]]
+
+        values = np.empty((len(self.ROWS), flat.size))
+        positions = np.flatnonzero(tabulated)
+        for start in range(0, positions.size, self._CHUNK_SIZE):
+            chunk = positions[start:start + self._CHUNK_SIZE]
+            values[:, chunk] = self._chebyshev(flat[chunk], idx[chunk])
+
+        fallback = ~tabulated
+        if fallback.any():
+            values[:, fallback] = self.analytic_func(flat[fallback])
+
+        return values.reshape((len(self.ROWS),) + time.shape)
+
+    def _chebyshev(self, t: np.ndarray, idx: np.ndarray) -> np.ndarray:
+        """Soma de Chebyshev para pontos tabelados, forma (5, n)"""
+        u = np.clip((t - self._centers[idx]) * self._inv_half_widths[idx], -1.0, 1.0)
+        basis = np.cos(self._orders[:, np.newaxis] * np.arccos(u))
+        return np.einsum('nrk,kn->rn', self.coefficients[idx], basis)
+
+    def _evaluate_scalar(self, t: float) -> np.ndarray:
+        """Caminho escalar usado pelo lado direito das EDOs"""
+        i = bisect_right(self._breakpoint_list, t) - 1
+        if t == self._breakpoint_list[-1]:
+            i = self.n_intervals - 1
+
+        if 0 <= i < self.n_intervals and not self._analytic_list[i] and t not in EPOCH_BOUNDARIES:
+            u = _clip_scalar((t - self._centers[i]) * self._inv_half_widths[i], -1.0, 1.0)
+            return self.coefficients[i] @ np.cos(self._orders * math.acos(u))
+
+        return self.analytic_func(t)
+
+class EigenstateCache:
+    """
+    Cache de autoestados em dois níveis: LRU em memória e arquivos .npz
+
+    As entradas são identificadas por um hash do potencial amostrado, da
+    grade, da massa, de ħ, do número de estados e da discretização. O nível
+    em disco é opcional e limitado a `max_disk_bytes`, removendo primeiro os
+    arquivos usados há mais tempo. Entradas da mesma grade com outro
+    potencial servem de subespaço inicial (warm start) para os autossolvers
+    iterativos.
+    """
+
+    FORMAT_VERSION = 1
+
+    def __init__(self, max_entries: int = 8, cache_dir: Optional[str] = None,
+                 max_disk_bytes: int = 256 * 2**20):
+        """
+        Parameters:
+        -----------
+        max_entries : int
+            Entradas mantidas em memória
+        cache_dir : str, optional
+            Diretório do nível em disco (None desativa)
+        max_disk_bytes : int
+            Tamanho máximo dos arquivos do nível em disco
+        """
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self._entries: OrderedDict = OrderedDict()  # chave -> (chave da grade, arrays)
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'warm_starts': 0}
+
+    @staticmethod
+    def key(V: np.ndarray, axes: List[np.ndarray], mass: float, hbar: float,
+            n_states: int, method: Dict[str, object]) -> Tuple[str, str]:
+        """Hashes (da entrada, da grade) do problema de autovalores"""
+        grid_hash = hashlib.sha256()
+        grid_hash.update(json.dumps({'version': EigenstateCache.FORMAT_VERSION,
+                                     'mass': mass, 'hbar': hbar, 'method': method},
+                                    sort_keys=True).encode('utf-8'))
+        for axis in axes:
+            grid_hash.update(np.ascontiguousarray(axis, dtype=float).tobytes())
+        grid_key = grid_hash.hexdigest()[:16]
+
+        entry_hash = hashlib.sha256(grid_key.encode('utf-8'))
+        entry_hash.update(np.ascontiguousarray(V, dtype=float).tobytes())
+        entry_hash.update(str(int(n_states)).encode('utf-8'))
+        return entry_hash.hexdigest()[:16], grid_key
+
+    def _filename(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"eigenstates_{key}.npz")
+
+    def get(self, key: str) -> Optional[Dict[str, np.ndarray]]:
+        """Cópia da entrada em cache, ou None"""
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.stats['memory_hits'] += 1
+            return {name: array.copy() for name, array in self._entries[key][1].items()}
+
+        if self.cache_dir is not None and os.path.exists(self._filename(key)):
+            filename = self._filename(key)
+            try:
+                with np.load(filename) as data:
+                    if int(data['version']) != self.FORMAT_VERSION:
+                        raise ValueError(f"Versão de cache incompatível em {filename}")
+                    grid_key = str(data['grid_key'])
+                    arrays = {name: data[name] for name in data.files
+                              if name not in ('version', 'grid_key')}
+                os.utime(filename)
+            except (OSError, KeyError, ValueError):
+                arrays = None
+            if arrays is not None:
+                self._remember(key, grid_key, arrays)
+                self.stats['disk_hits'] += 1
+                return {name: array.copy() for name, array in arrays.items()}
+
+        self.stats['misses'] += 1
+        return None
+
+    def put(self, key: str, grid_key: str, arrays: Dict[str, np.ndarray]) -> None:
+        """Guarda uma entrada nos dois níveis"""
+        arrays = {name: np.array(array) for name, array in arrays.items()}
+        self._remember(key, grid_key, arrays)
+
+        if self.cache_dir is None:
+            return
+        if sum(array.nbytes for array in arrays.values()) > self.max_disk_bytes:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            np.savez(self._filename(key), version=self.FORMAT_VERSION, grid_key=grid_key, **arrays)
+            self._enforce_disk_cap()
+        except OSError:
+            pass
+
+    def warm_start(self, grid_key: str) -> Optional[np.ndarray]:
+        """Autovetores da entrada mais recente na mesma grade, ou None"""
+        for entry_grid_key, arrays in reversed(self._entries.values()):
+            if entry_grid_key == grid_key:
+                self.stats['warm_starts'] += 1
+                return arrays['eigenvectors']
+        return None
+
+    def clear(self) -> None:
+        """Esvazia o nível em memória"""
+        self._entries.clear()
+
+    def _remember(self, key: str, grid_key: str, arrays: Dict[str, np.ndarray]) -> None:
+        self._entries[key] = (grid_key, arrays)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _enforce_disk_cap(self) -> None:
+        """Remove os arquivos usados há mais tempo até respeitar max_disk_bytes"""
+        files = [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir)
+                 if name.startswith('eigenstates_') and name.endswith('.npz')]
+        files = sorted((os.path.getmtime(name), os.path.getsize(name), name) for name in files)
+        total = sum(size for _, size, _ in files)
+        for _, size, name in files:
+            if total <= self.max_disk_bytes:
+                break
+            os.remove(name)
+            total -= size
+
+
+class PhysicsTestSystemV3:
+    """
+    Sistema Avançado de Testes de Física Teórica - Versão 3.0
+    Implementação baseada em métodos numéricos avançados e melhores práticas
+
+    Esta classe implementa:
+    - Simulações com múltiplos métodos numéricos (Runge-Kutta, diferenças finitas, Monte Carlo)
+    - Validação rigorosa e benchmarking
+    - Estrutura modular e bem documentada
+    - Integração com bibliotecas científicas especializadas
+    """
+
+    def __init__(self, config: Optional[SimulationConfig] = None):
+        """
+        Inicializa o sistema de simulação com configuração otimizada
+
+        Parameters:
+        -----------
+        config : SimulationConfig, optional
+            Configuração da simulação. Se None, usa valores padrão.
+        """
+        self.config = config or SimulationConfig()
+        self.constants = PhysicalConstants()
+        self.numerical_methods = AdvancedNumericalMethods()
+
+        # Parâmetros do avaliador fundido das constantes dinâmicas
+        self._constant_base_values = np.array(
+            [getattr(self.constants, name) for name in DYNAMIC_CONSTANT_NAMES]
+        )
+        self._constant_intensities = np.array(
+            [DYNAMIC_CONSTANT_INTENSITIES[name] for name in DYNAMIC_CONSTANT_NAMES]
+        )
+        self._constant_oscillation_freqs = np.array(
+            [50.0 if name == 'G' else 75.0 for name in DYNAMIC_CONSTANT_NAMES]
+        )
+
+        # Tabelas de coeficientes (opcionais, ver build_coefficient_table)
+        self._coefficient_table: Optional[DynamicCoefficientTable] = None
+
+        # Eventos agregados do modelo de compressão TARDIS
+        self._compression_diagnostics = CompressionDiagnostics()
+
+        # Cache de autoestados (ativo com config.use_eigenstate_cache)
+        self.eigenstate_cache = EigenstateCache(self.config.eigenstate_cache_entries,
+                                                self.config.eigenstate_cache_dir,
+                                                self.config.eigenstate_cache_max_bytes)
+
+        # Configurar logging
+        self.logger = logging.getLogger(self.__class__.__name__)
+        
+        # Criar pasta resultados
+        if not os.path.exists('resultados'):
+            os.makedirs('resultados')
+            self.logger.info("Diretório 'resultados' criado")
+
+        # Inicializar métricas de validação
+        self.validation_metrics = {
+            'convergence_rate': 0.0,
+            'numerical_stability': True,
+            'energy_conservation': True,
+            'physical_consistency': True
+        }
+
+        self.logger.info("Sistema de Física V3.0 inicializado com sucesso")
+    
+    def set_constant_intensities(self, intensities: Dict[str, float]) -> None:
+        """
+        Altera as intensidades de variação das constantes dinâmicas
+
+        Parameters:
+        -----------
+        intensities : Dict[str, float]
+            Novas intensidades por nome (subconjunto de DYNAMIC_CONSTANT_NAMES);
+            as constantes ausentes mantêm o valor atual
+        """
+        unknown = set(intensities) - set(DYNAMIC_CONSTANT_NAMES)
+        if unknown:
+            raise ValueError(f"Constantes desconhecidas nas intensidades: {sorted(unknown)}")
+
+        updated = self._constant_intensities.copy()
+        for i, name in enumerate(DYNAMIC_CONSTANT_NAMES):
+            if name in intensities:
+                updated[i] = float(intensities[name])
+
+        if not np.array_equal(updated, self._constant_intensities):
+            self._constant_intensities = updated
+            # Tabelas construídas para as intensidades antigas deixam de valer
+            self._coefficient_table = None
+
+    def get_dynamic_constant(self, base_value: float, time: float, 
+                           constant_name: str) -> float:
+        """
+        Constantes físicas dinâmicas com eventos supercosmicos - Versão Aprimorada
+
+        Implementa variações realistas das constantes fundamentais seguindo
+        os princípios do documento de fine-tuning para física computacional.
+
+        Parameters:
+        -----------
+        base_value : float
+            Valor base da constante física
+        time : float
+            Tempo adimensional (unidades de tempo de Planck)
+        constant_name : str
+            Nome da constante ('G', 'c', 'h', 'alpha')
+
+        Returns:
+        --------
+        float
+            Valor dinâmico da constante no tempo especificado
+        """
+        return float(self.get_dynamic_constant_array(base_value, time, constant_name))
+
+    def get_dynamic_constant_array(self, base_value: float, times: np.ndarray,
+                                   constant_name: str) -> np.ndarray:
+        """
+        Versão vetorizada de get_dynamic_constant
+
+        Avalia a constante dinâmica em um array de tempos de uma só vez,
+        retornando exatamente os mesmos valores do caminho escalar.
+
+        Parameters:
+        -----------
+        base_value : float
+            Valor base da constante física
+        times : np.ndarray
+            Tempos adimensionais (unidades de tempo de Planck), de qualquer forma
+        constant_name : str
+            Nome da constante ('G', 'c', 'h', 'alpha')
+
+        Returns:
+        --------
+        np.ndarray
+            Valores dinâmicos da constante, com a mesma forma de `times`
+        """
+        times = np.asarray(times, dtype=float)
+        intensity = DYNAMIC_CONSTANT_INTENSITIES.get(constant_name, 0.15)
+        oscillation_freq = 50.0 if constant_name == 'G' else 75.0
+
+        variation = self._dynamic_variation(
+            times if times.ndim == 0 else times.ravel(), [intensity], [oscillation_freq]
+        )[0]
+
+        return base_value * (1 + variation.reshape(times.shape))
+
+    def evaluate_dynamic_constants(self, time) -> np.ndarray:
+        """
+        Avalia G, c, h e alpha numa única passagem
+
+        A época cosmológica de cada instante é classificada uma só vez e as
+        quatro constantes são calculadas juntas, na ordem de
+        DYNAMIC_CONSTANT_NAMES.
+
+        Parameters:
+        -----------
+        time : float ou np.ndarray
+            Tempo(s) adimensional(is) (unidades de tempo de Planck)
+
+        Returns:
+        --------
+        np.ndarray
+            Forma (4,) para tempo escalar ou (4, *time.shape) para arrays
+        """
+        time = np.asarray(time, dtype=float)
+        if time.ndim == 0:
+            variation = self._dynamic_variation(
+                time, self._constant_intensities, self._constant_oscillation_freqs
+            )
+            return self._constant_base_values * (1 + variation)
+
+        variation = self._dynamic_variation(
+            time.ravel(), self._constant_intensities, self._constant_oscillation_freqs
+        )
+        values = self._constant_base_values[:, np.newaxis] * (1 + variation)
+        return values.reshape((4,) + time.shape)
+
+    def _dynamic_variation(self, t, intensities, oscillation_freqs) -> np.ndarray:
+        """
+        Núcleo das variações das constantes dinâmicas
+
+        Para arrays, cada época cosmológica é avaliada apenas nos pontos que
+        pertencem a ela (máscaras NumPy). Para tempo escalar a época é
+        classificada uma única vez, sem criar máscaras. Em ambos os casos as
+        k constantes são calculadas simultaneamente.
+
+        Parameters:
+        -----------
+        t : float ou np.ndarray
+            Tempo escalar ou tempos adimensionais de forma (n,)
+        intensities : array_like
+            Intensidade de cada constante, forma (k,). Para tempo escalar
+            também aceita (k, m) (um conjunto de intensidades por coluna)
+        oscillation_freqs : array_like
+            Frequência de oscilação inflacionária de cada constante, forma (k,)
+            ou (k, 1) quando `intensities` é (k, m)
+
+        Returns:
+        --------
+        np.ndarray
+            Variações relativas já limitadas e regularizadas, forma de
+            `intensities` para tempo escalar ou (k, n) para arrays
+        """
+        t = np.asarray(t, dtype=float)
+        intensities = np.asarray(intensities, dtype=float)
+        oscillation_freqs = np.asarray(oscillation_freqs, dtype=float)
+
+        if t.ndim == 0:
+            t = float(t)
+            epoch = _classify_epoch(t)
+            if epoch is None:
+                variation = np.zeros(intensities.shape)
+            else:
+                variation = _epoch_variation(epoch, t, intensities, oscillation_freqs)
+        else:
+            intensities = intensities[:, np.newaxis]
+            oscillation_freqs = oscillation_freqs[:, np.newaxis]
+            variation = np.zeros((intensities.shape[0], t.size))
+
+            for epoch, mask in enumerate(_epoch_masks(t)):
+                if mask.any():
+                    variation[:, mask] = _epoch_variation(
+                        epoch, t[mask], intensities, oscillation_freqs
+                    )
+
+        # Limitar variação aos valores configurados, já aplicando a
+        # regularização (95% do limite) que evita singularidades
+        limit = 0.95 * self.config.max_variation
+        return np.minimum(np.maximum(variation, -limit), limit)
+
+    def tardis_compression_model(self, time: float) -> float:
+        """
+        Modelo de compressão quântica TARDIS - Versão Aprimorada
+
+        Implementa o modelo de compressão espaço-temporal que permite ao universo
+        ser maior por dentro que por fora, baseado em princípios de física quântica
+        e relatividade geral.
+
+        Parameters:
+        -----------
+        time : float
+            Tempo adimensional (unidades de tempo de Planck)
+
+        Returns:
+        --------
+        float
+            Fator de compressão quântica (> 1.0)
+        """
+        if time <= 0:
+            return 1.0
+
+        if time < 1.0:
+            phase = 0
+        elif time < 1000.0:
+            phase = 1
+        elif time < 1e5:
+            phase = 2
+        else:
+            phase = 3
+
+        # Garantir compressão mínima e aplicar regularização
+        compression = max(_compression_phase(phase, time), 1.0)
+
+        # Evitar overflow numérico (eventos agregados, ver flush_compression_diagnostics)
+        if compression > COMPRESSION_CAP:
+            compression = COMPRESSION_CAP
+            self._compression_diagnostics.record_capped(time, time)
+
+        # Verificar consistência física
+        if not np.isfinite(compression):
+            self._compression_diagnostics.record_non_finite(time, time)
+            compression = 1.0
+
+        return compression
+
+    def tardis_compression_array(self, times: np.ndarray) -> np.ndarray:
+        """
+        Versão vetorizada de tardis_compression_model
+
+        Calcula as quatro fases com máscaras NumPy, retornando os mesmos valores
+        do caminho escalar. Pontos limitados em COMPRESSION_CAP ou não-finitos
+        são agregados e registrados em um único resumo no log.
+
+        Parameters:
+        -----------
+        times : np.ndarray
+            Tempos adimensionais (unidades de tempo de Planck), de qualquer forma
+
+        Returns:
+        --------
+        np.ndarray
+            Fatores de compressão quântica (>= 1.0), com a forma de `times`
+        """
+        times = np.asarray(times, dtype=float)
+        t = times.ravel()
+        compression = np.ones(t.size)
+
+        positive = ~(t <= 0)
+        early = t < 1.0
+        masks = [
+            positive & early,
+            ~early & (t < 1000.0),
+            (t >= 1000.0) & (t < 1e5),
+            positive & ~(t < 1e5),  # inclui NaN, como o caminho escalar
+        ]
+
+        with np.errstate(over='ignore', invalid='ignore', divide='ignore'):
+            for phase, mask in enumerate(masks):
+                if mask.any():
+                    compression[mask] = _compression_phase(phase, t[mask])
+
+            # Garantir compressão mínima e aplicar regularização
+            compression = np.maximum(compression, 1.0)
 
-        # Matriz Hamiltoniana (diferenças finitas)
-        H = np.zeros((n_points, n_points))
+            # Evitar overflow numérico
+            capped = compression > COMPRESSION_CAP
+            compression[capped] = COMPRESSION_CAP
 
-        for i in range(1, n_points-1):
-            H[i, i-1] = -hbar**2 / (2 * m * dx**2)
-            H[i, i] = hbar**2 / (m * dx**2) + V[i]
-            H[i, i+1] = -hbar**2 / (2 * m * dx**2)
+        # Verificar consistência física
+        non_finite = ~np.isfinite(compression)
+        compression[non_finite] = 1.0
 
-        # Condições de contorno
-        H[0, 0] = H[-1, -1] = 1.0
+        if capped.any():
+            self._compression_diagnostics.record_capped(
+                np.min(t[capped]), np.max(t[capped]), int(np.count_nonzero(capped))
+            )
+        if non_finite.any():
+            self._compression_diagnostics.record_non_finite(
+                np.min(t[non_finite]), np.max(t[non_finite]), int(np.count_nonzero(non_finite))
+            )
+        self.flush_compression_diagnostics()
 
-        psi = psi_0.copy()
+        return compression.reshape(times.shape)
 
-        for _ in range(n_steps):
-            # Método de Crank-Nicolson: (1 - i*H*dt/2)ψ^{n+1} = (1 + i*H*dt/2)ψ^n
-            A = np.eye(n_points) - 1j * H * dt / (2 * hbar)
-            B = np.eye(n_points) + 1j * H * dt / (2 * hbar)
+    def flush_compression_diagnostics(self) -> CompressionDiagnostics:
+        """
+        Registra no log, uma única vez, o resumo dos eventos da compressão TARDIS
+
+        Os eventos (compressão limitada e valores não-finitos) são acumulados
+        pelos caminhos escalar e vetorizado; esta chamada emite o resumo e
+        reinicia o acumulador.
 
-            psi = np.linalg.solve(A, B @ psi)
+        Returns:
+        --------
+        CompressionDiagnostics
+            Resumo dos eventos acumulados desde a última chamada
+        """
+        diagnostics = self._compression_diagnostics
+        self._compression_diagnostics = CompressionDiagnostics()
 
-        return psi
+        if diagnostics.capped_points:
+            self.logger.warning(
+                f"Compressão limitada em {COMPRESSION_CAP:.0e} em {diagnostics.capped_points} "
+                f"pontos ({diagnostics.describe_range(diagnostics.capped_time_range)})"
+            )
+        if diagnostics.non_finite_points:
+            self.logger.error(
+                f"Compressão não-finita detectada em {diagnostics.non_finite_points} "
+                f"pontos ({diagnostics.describe_range(diagnostics.non_finite_time_range)})"
+            )
 
-    @staticmethod
-    def monte_carlo_simulation(n_particles: int, potential_func: Callable,
-                             temperature: float, box_size: float,
-                             n_steps: int) -> Tuple[np.ndarray, np.ndarray]:
+        return diagnostics
+    
+    def evaluate_time_coefficients(self, time) -> np.ndarray:
         """
-        Simulação Monte Carlo para sistemas físicos
-        Implementa algoritmo de Metropolis para amostragem
+        Avalia todas as funções dependentes do tempo da cosmologia
+
+        Usa as tabelas de coeficientes quando estão ativas
+        (ver build_coefficient_table) e as funções analíticas caso contrário.
+
+        Parameters:
+        -----------
+        time : float ou np.ndarray
+            Tempo(s) adimensional(is) (unidades de tempo de Planck)
+
+        Returns:
+        --------
+        np.ndarray
+            G, c, h, alpha e compressão TARDIS, forma (5,) para tempo escalar
+            ou (5, *time.shape) para arrays
         """
-        positions = np.random.uniform(-box_size/2, box_size/2, (n_particles, 3))
-        energies = []
+        if self._coefficient_table is not None:
+            return self._coefficient_table.evaluate(time)
+        return self._analytic_time_coefficients(time)
 
-        k_B = 1.380649e-23  # Constante de Boltzmann
+    def _analytic_time_coefficients(self, time) -> np.ndarray:
+        """Constantes dinâmicas e compressão TARDIS pelas funções analíticas"""
+        time = np.asarray(time, dtype=float)
+        constants = self.evaluate_dynamic_constants(time)
 
-        for step in range(n_steps):
-            # Escolher partícula aleatoriamente
-            particle_idx = np.random.randint(n_particles)
+        if time.ndim == 0:
+            return np.append(constants, self.tardis_compression_model(float(time)))
 
-            # Propor nova posição
-            old_pos = positions[particle_idx].copy()
-            new_pos = old_pos + np.random.normal(0, 0.1, 3)
+        compression = self.tardis_compression_array(time)
+        return np.concatenate([constants, compression[np.newaxis]])
 
-            # Calcular mudança de energia
-            old_energy = potential_func(old_pos)
-            new_energy = potential_func(new_pos)
+    def build_coefficient_table(self, force_rebuild: bool = False) -> DynamicCoefficientTable:
+        """
+        Prepara as tabelas de coeficientes para a configuração atual
 
-            delta_E = new_energy - old_energy
+        As tabelas são salvas em `config.coefficient_cache_dir`, identificadas
+        por um hash dos parâmetros da configuração que as afetam, de modo que
+        execuções repetidas apenas as carregam do disco. Depois desta chamada,
+        o lado direito das EDOs e o cálculo do histórico passam a usá-las.
 
-            # Critério de Metropolis
-            if delta_E <= 0 or np.random.random() < np.exp(-delta_E / (k_B * temperature)):
-                positions[particle_idx] = new_pos
-                current_energy = new_energy
-            else:
-                current_energy = old_energy
+        Parameters:
+        -----------
+        force_rebuild : bool
+            Reconstruir mesmo que exista uma tabela salva
 
-            energies.append(current_energy)
+        Returns:
+        --------
+        DynamicCoefficientTable
+            Tabelas ativas
+        """
+        key = self._coefficient_cache_key()
+        if (not force_rebuild and self._coefficient_table is not None
+                and self._coefficient_table.key == key):
+            return self._coefficient_table
 
-        return positions, np.array(energies)
+        # Desativar tabelas antigas para que a construção use as funções analíticas
+        self._coefficient_table = None
 
-class PhysicsTestSystemV3:
-    """
-    Sistema Avançado de Testes de Física Teórica - Versão 3.0
-    Implementação baseada em métodos numéricos avançados e melhores práticas
+        cache_dir = self.config.coefficient_cache_dir
+        filename = os.path.join(cache_dir, f"coefficients_{key}.npz")
+        table = None
 
-    Esta classe implementa:
-    - Simulações com múltiplos métodos numéricos (Runge-Kutta, diferenças finitas, Monte Carlo)
-    - Validação rigorosa e benchmarking
-    - Estrutura modular e bem documentada
-    - Integração com bibliotecas científicas especializadas
-    """
+        if not force_rebuild and os.path.exists(filename):
+            try:
+                table = DynamicCoefficientTable.load(filename, self._analytic_time_coefficients)
+                self.logger.info(f"Tabelas de coeficientes carregadas de {filename}")
+            except (OSError, KeyError, ValueError) as e:
+                self.logger.warning(f"Tabelas em {filename} ignoradas: {e}")
+
+        if table is None:
+            table = DynamicCoefficientTable.build(
+                self._analytic_time_coefficients,
+                self.config.time_range,
+                tolerance=self.config.coefficient_cache_tolerance,
+                key=key
+            )
+            self.logger.info(
+                f"Tabelas de coeficientes construídas: {table.n_intervals} sub-intervalos, "
+                f"{int(table.analytic_intervals.sum())} analíticos, "
+                f"erro relativo máximo {table.max_errors.max():.2e}"
+            )
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+                table.save(filename)
+            except OSError as e:
+                self.logger.warning(f"Não foi possível salvar tabelas de coeficientes: {e}")
+
+        self._coefficient_table = table
+        return table
+
+    def _coefficient_cache_key(self) -> str:
+        """Hash dos parâmetros da configuração que determinam as tabelas"""
+        signature = {
+            'version': DynamicCoefficientTable.FORMAT_VERSION,
+            'time_range': [float(v) for v in self.config.time_range],
+            'max_variation': self.config.max_variation,
+            'tolerance': self.config.coefficient_cache_tolerance,
+            'base_values': self._constant_base_values.tolist(),
+            'intensities': self._constant_intensities.tolist(),
+            'oscillation_freqs': self._constant_oscillation_freqs.tolist(),
+        }
+        encoded = json.dumps(signature, sort_keys=True).encode('utf-8')
+        return hashlib.sha256(encoded).hexdigest()[:16]
 
-    def __init__(self, config: Optional[SimulationConfig] = None):
+    def cosmology_jacobian(self, t: float, y: np.ndarray) -> np.ndarray:
         """
-        Inicializa o sistema de simulação com configuração otimizada
+        Jacobiano analítico ∂f/∂y de stable_cosmology_equations
+
+        Derivado em forma fechada, ramo a ramo: regularizações (max com
+        epsilon) e limitações (clip) ativas têm derivada nula em relação ao
+        argumento limitado. Usado pelos integradores implícitos (Radau, BDF,
+        LSODA) e pela sonda de rigidez.
 
         Parameters:
         -----------
-        config : SimulationConfig, optional
-            Configuração da simulação. Se None, usa valores padrão.
+        t : float
+            Tempo adimensional
+        y : np.ndarray
+            Estado [a, ȧ, ρ, T]
+
+        Returns:
+        --------
+        np.ndarray
+            Matriz 4x4 com J[i, j] = ∂f_i/∂y_j
         """
-        self.config = config or SimulationConfig()
-        self.constants = PhysicalConstants()
-        self.numerical_methods = AdvancedNumericalMethods()
+        a, a_dot, rho, T = y
+        epsilon = self.config.epsilon
 
-        # Configurar logging
-        self.logger = logging.getLogger(self.__class__.__name__)
-        
-        # Criar pasta resultados
-        if not os.path.exists('resultados'):
-            os.makedirs('resultados')
-            self.logger.info("Diretório 'resultados' criado")
+        # Derivadas das regularizações
+        da = 1.0 if a > epsilon else 0.0
+        drho = 1.0 if rho > epsilon else 0.0
+        dT = 1.0 if T > epsilon else 0.0
+        a = max(a, epsilon)
+        rho = max(rho, epsilon)
+        T = max(T, epsilon)
 
-        # Inicializar métricas de validação
-        self.validation_metrics = {
-            'convergence_rate': 0.0,
-            'numerical_stability': True,
-            'energy_conservation': True,
-            'physical_consistency': True
-        }
+        G, c, h, _, compression = self.evaluate_time_coefficients(t)
+        tardis_factor = 1.0 / np.sqrt(compression + epsilon)
 
-        self.logger.info("Sistema de Física V3.0 inicializado com sucesso")
-    
-    def get_dynamic_constant(self, base_value: float, time: float, 
-                           constant_name: str) -> float:
-        """
-        Constantes físicas dinâmicas com eventos supercosmicos - Versão Aprimorada
+        J = np.zeros((4, 4))
 
-        Implementa variações realistas das constantes fundamentais seguindo
-        os princípios do documento de fine-tuning para física computacional.
+        # 1. da/dt = ȧ
+        J[0, 1] = 1.0
+
+        # Parâmetro de Hubble H = clip(ȧ/a)
+        H_raw = a_dot / a
+        H = _clip_scalar(H_raw, -1e4, 1e4)
+        if -1e4 < H_raw < 1e4:
+            dH_da, dH_dadot = -a_dot / a**2 * da, 1.0 / a
+        else:
+            dH_da, dH_dadot = 0.0, 0.0
+
+        # 2. d²a/dt² = clip(K a ρ) * fator TARDIS
+        K = -4 * np.pi * G * (1 + 3 * 0.33) / (3 * c**2)
+        acceleration = K * a * rho
+        if -1e4 < acceleration < 1e4:
+            J[1, 0] = K * rho * da * tardis_factor
+            J[1, 2] = K * a * drho * tardis_factor
+
+        # 3. dρ/dt = clip(-3H ρ (1 + 0.33) + clip(-ρ κ, -0.1ρ, 0), -20ρ, 20ρ)
+        expansion_dilution = -3 * H * rho * (1 + 0.33)
+        kappa = h / (1e-20 + t) * np.exp(-t / 1e6)
+        quantum_cooling_raw = -rho * kappa
+        quantum_cooling = _clip_scalar(quantum_cooling_raw, -rho * 0.1, 0)
+        if quantum_cooling_raw < -rho * 0.1:
+            dcooling_drho = -0.1
+        elif quantum_cooling_raw > 0:
+            dcooling_drho = 0.0
+        else:
+            dcooling_drho = -kappa
+
+        drho_dt = expansion_dilution + quantum_cooling
+        if drho_dt < -rho * 20:
+            J[2, 2] = -20.0 * drho
+        elif drho_dt > rho * 20:
+            J[2, 2] = 20.0 * drho
+        else:
+            J[2, 0] = -3 * (1 + 0.33) * rho * dH_da
+            J[2, 1] = -3 * (1 + 0.33) * rho * dH_dadot
+            J[2, 2] = (-3 * H * (1 + 0.33) + dcooling_drho) * drho
+
+        # 4. dT/dt = clip(-H T C(T), -20T, 20T)
+        beta = h / (1.38e-23 * (1 + t / 1e3))
+        correction_raw = 1 + beta / T
+        correction = _clip_scalar(correction_raw, 0.5, 2.0)
+        # d(T·C)/dT = 1 sem limitação (C = 1 + β/T); = C quando C está limitado
+        dTC_dT = 1.0 if 0.5 < correction_raw < 2.0 else correction
+
+        dT_dt = -H * T * correction
+        if dT_dt < -T * 20:
+            J[3, 3] = -20.0 * dT
+        elif dT_dt > T * 20:
+            J[3, 3] = 20.0 * dT
+        else:
+            J[3, 0] = -T * correction * dH_da
+            J[3, 1] = -T * correction * dH_dadot
+            J[3, 3] = -H * dTC_dT * dT
+
+        return J
+
+    def select_solver_method(self, rhs: Callable, t_span: Tuple[float, float],
+                             initial_conditions) -> Tuple[str, Dict[str, object]]:
+        """
+        Escolhe o integrador a partir de uma sonda de rigidez
+
+        Integra um prefixo do intervalo (`config.stiffness_probe_fraction`) com
+        RK45 explícito, até um orçamento fixo de avaliações, e amostra o
+        espectro do Jacobiano analítico nos passos aceitos. O indicador de
+        rigidez é h·max(-Re λ): valores próximos da fronteira de estabilidade
+        do RK45 (RK45_STABILITY_BOUNDARY ≈ 3.3) indicam passos limitados por
+        estabilidade, não por precisão. Um passo amostrado conta como rígido
+        acima de STIFFNESS_INDICATOR_THRESHOLD = 1.0, uma margem abaixo da
+        fronteira (ver a definição das constantes).
+
+        Critério:
+        - não rígido: DOP853
+        - rígido em toda a sonda: Radau para rtol <= 1e-8, BDF caso contrário
+        - rigidez intermitente, falha ou sonda esgotada com muitas rejeições:
+          LSODA (troca automática)
 
         Parameters:
         -----------
-        base_value : float
-            Valor base da constante física
-        time : float
-            Tempo adimensional (unidades de tempo de Planck)
-        constant_name : str
-            Nome da constante ('G', 'c', 'h', 'alpha')
+        rhs : Callable
+            Lado direito f(t, y)
+        t_span : Tuple[float, float]
+            Intervalo completo da integração
+        initial_conditions : array_like
+            Estado inicial
 
         Returns:
         --------
-        float
-            Valor dinâmico da constante no tempo especificado
+        Tuple[str, Dict[str, object]]
+            Método escolhido e o resultado da sonda
         """
-        # Intensidades específicas por constante baseadas em física realista
-        intensities = {
-            'G': 0.257,     # Constante gravitacional - maior variação
-            'c': 0.236,     # Velocidade da luz
-            'h': 0.213,     # Constante de Planck
-            'alpha': 0.165  # Constante de estrutura fina - menor variação
+        t0, tf = float(t_span[0]), float(t_span[1])
+        probe_end = t0 + (tf - t0) * self.config.stiffness_probe_fraction
+        max_probe_nfev = 3000
+        n_samples = 25
+
+        solver = RK45(rhs, t0, np.asarray(initial_conditions, dtype=float), probe_end,
+                      rtol=self.config.rtol, atol=self.config.atol, max_step=1e4)
+        step_t, step_h, step_y = [], [], []
+        n_rejected = 0
+
+        while solver.status == 'running' and solver.nfev < max_probe_nfev:
+            nfev_before = solver.nfev
+            solver.step()
+            if solver.status == 'failed':
+                break
+            n_rejected += max((solver.nfev - nfev_before) // RK45.n_stages - 1, 0)
+            step_t.append(solver.t_old)
+            step_h.append(solver.t - solver.t_old)
+            step_y.append(solver.y.copy())
+
+        indicators = []
+        spectral_radii = []
+        for i in np.unique(np.linspace(0, len(step_t) - 1, n_samples).astype(int)) if step_t else []:
+            eigenvalues = np.linalg.eigvals(self.cosmology_jacobian(step_t[i], step_y[i]))
+            decay = max(-np.min(eigenvalues.real), 0.0)
+            spectral_radii.append(float(np.max(np.abs(eigenvalues))))
+            indicators.append(step_h[i] * decay)
+
+        indicators = np.array(indicators)
+        stiff_fraction = float(np.mean(indicators > STIFFNESS_INDICATOR_THRESHOLD)) if indicators.size else 0.0
+        exhausted = solver.status == 'running'
+        rejection_ratio = n_rejected / max(len(step_t) + n_rejected, 1)
+
+        if solver.status == 'failed':
+            method, reason = 'LSODA', 'sonda explícita falhou'
+        elif exhausted and rejection_ratio > 0.2:
+            method, reason = 'LSODA', 'sonda esgotada com passos rejeitados'
+        elif 0.0 < stiff_fraction < 0.5:
+            method, reason = 'LSODA', 'rigidez intermitente'
+        elif stiff_fraction >= 0.5:
+            if self.config.rtol <= 1e-8:
+                method, reason = 'Radau', 'rígido com tolerância estrita'
+            else:
+                method, reason = 'BDF', 'rígido com tolerância moderada'
+        else:
+            method, reason = 'DOP853', 'não rígido'
+
+        probe = {
+            'probe_span': [t0, float(solver.t)],
+            'probe_status': 'exhausted' if exhausted else solver.status,
+            'probe_nfev': int(solver.nfev),
+            'probe_accepted': len(step_t),
+            'probe_rejected': int(n_rejected),
+            'probe_rejection_ratio': float(rejection_ratio),
+            'stiffness_indicator_median': float(np.median(indicators)) if indicators.size else 0.0,
+            'stiffness_indicator_max': float(np.max(indicators)) if indicators.size else 0.0,
+            'stiff_fraction': stiff_fraction,
+            'max_spectral_radius': max(spectral_radii, default=0.0),
+            'reason': reason
         }
-        
-        intensity = intensities.get(constant_name, 0.15)
-        
-        variation = 0.0
-        
-        # Fases cosmológicas com física mais realista
-        # Época de Planck / Big Bang (t < 1.0)
-        if time < 1.0:
-            # Variação exponencial com decaimento rápido
-            variation += intensity * np.exp(-time * 2.5) * np.sin(time * 10)
-            
-        # Época Inflacionária (1 < t < 1000)
-        elif 1.0 < time < 1000.0:
-            # Oscilações inflacionárias com amortecimento
-            oscillation_freq = 50.0 if constant_name == 'G' else 75.0
-            damping = np.exp(-time / 3000.0)
-            variation += intensity * 0.7 * np.sin(time / oscillation_freq) * damping
-
-        # Época de Radiação (1000 < t < 1e5)
-        elif 1000.0 < time < 1e5:
-            # Variações suaves durante recombinação
-            variation += intensity * 0.4 * np.cos(np.log10(time) * 2) * np.exp(-time / 2e5)
-
-        # Época de Matéria (1e5 < t < 1e6)
-        elif 1e5 < time < 1e6:
-            # Pequenas flutuações durante formação de estruturas
-            variation += intensity * 0.2 * np.sin(np.log10(time) * 5) * np.exp(-time / 5e6)
-
-        # Limitar variação aos valores configurados
-        variation = np.clip(variation, -self.config.max_variation, self.config.max_variation)
-
-        # Aplicar regularização para evitar singularidades
-        if abs(variation) > 0.95 * self.config.max_variation:
-            variation = 0.95 * self.config.max_variation * np.sign(variation)
-        
-        return base_value * (1 + variation)
-    
-    def tardis_compression_model(self, time: float) -> float:
-        """
-        Modelo de compressão quântica TARDIS - Versão Aprimorada
 
-        Implementa o modelo de compressão espaço-temporal que permite ao universo
-        ser maior por dentro que por fora, baseado em princípios de física quântica
-        e relatividade geral.
+        self.logger.info(f"Sonda de rigidez: {reason} -> {method} "
+                         f"(indicador mediano {probe['stiffness_indicator_median']:.2f}, "
+                         f"nfev={probe['probe_nfev']})")
+
+        return method, probe
+
+    def get_rhs(self, backend: Optional[str] = None) -> Callable[[float, np.ndarray], np.ndarray]:
+        """
+        Lado direito das equações cosmológicas para o backend escolhido
 
         Parameters:
         -----------
-        time : float
-            Tempo adimensional (unidades de tempo de Planck)
+        backend : str, optional
+            'python' (stable_cosmology_equations), 'numba' (núcleo compilado em
+            modo nopython) ou 'auto' (numba quando instalado). Se None, usa
+            `config.rhs_backend`.
 
         Returns:
         --------
-        float
-            Fator de compressão quântica (> 1.0)
+        Callable
+            Função f(t, y) aceita por solve_ivp e pelos integradores de
+            AdvancedNumericalMethods
         """
-        if time <= 0:
-            return 1.0
-            
-        compression = 1.0
+        backend = backend or self.config.rhs_backend
+        if backend not in ('python', 'numba', 'auto'):
+            raise ValueError(f"Backend desconhecido para o lado direito: {backend}")
 
-        try:
-            # Fase 1: Big Bang e Planck (t < 1.0)
-            if time < 1.0:
-                # Compressão inicial exponencial com oscilações quânticas
-                compression = 1.0 + 50 * time * (1 + 0.1 * np.sin(time * 20))
-
-            # Fase 2: Inflação Cósmica (1 < t < 1000)
-            elif time < 1000.0:
-                # Compressão inflacionária com crescimento exponencial
-                base_compression = 51.0  # Fim da fase anterior
-                inflation_growth = np.exp((time - 1.0) / 150.0)  # Taxa ajustada
-                quantum_fluctuations = 1 + 0.05 * np.sin(time / 50.0)
-                compression = base_compression * inflation_growth * quantum_fluctuations
-
-            # Fase 3: Pós-inflação até recombinação (1000 < t < 1e5)
-            elif time < 1e5:
-                # Compressão estabilizada com crescimento polinomial
-                base_compression = 51.0 * np.exp(999.0 / 150.0)  # Fim da inflação
-                post_inflation_growth = (time / 1000.0) ** 0.25  # Expoente reduzido
-                thermal_effects = 1 + 0.02 * np.cos(np.log10(time))
-                compression = base_compression * post_inflation_growth * thermal_effects
-
-            # Fase 4: Era da Matéria (t > 1e5)
-            else:
-                # Compressão final com saturação
-                base_compression = 51.0 * np.exp(999.0 / 150.0) * (1e5 / 1000.0) ** 0.25
-                matter_era_growth = np.log(time / 1e5 + 1) ** 0.1
-                saturation_factor = 1 / (1 + time / 1e8)  # Saturação assintótica
-                compression = base_compression * matter_era_growth * saturation_factor
+        if backend == 'python' or (backend == 'auto' and not _numba_available):
+            return self.stable_cosmology_equations
 
-            # Garantir compressão mínima e aplicar regularização
-            compression = max(compression, 1.0)
+        if not _numba_available:
+            self.logger.warning("numba não disponível. Usando backend Python para o lado direito")
+            return self.stable_cosmology_equations
 
-            # Evitar overflow numérico
-            if compression > 1e20:
-                compression = 1e20
-                self.logger.warning(f"Compressão limitada em t={time}")
+        if self._coefficient_table is not None:
+            self.logger.info("Backend numba avalia os modelos analíticos (tabelas de coeficientes ignoradas)")
 
-            # Verificar consistência física
-            if not np.isfinite(compression):
-                self.logger.error(f"Compressão não-finita detectada em t={time}")
-                compression = 1.0
+        base_values = self._constant_base_values.copy()
+        intensities = self._constant_intensities.copy()
+        oscillation_freqs = self._constant_oscillation_freqs.copy()
+        max_variation = float(self.config.max_variation)
+        epsilon = float(self.config.epsilon)
 
-        except (OverflowError, ValueError) as e:
-            self.logger.error(f"Erro no cálculo de compressão em t={time}: {e}")
-            compression = 1.0
+        def compiled_rhs(t: float, y: np.ndarray) -> np.ndarray:
+            return _cosmology_rhs_kernel(float(t), np.asarray(y, dtype=np.float64), base_values,
+                                         intensities, oscillation_freqs, max_variation, epsilon)
+
+        return compiled_rhs
 
-        return compression
-    
     def stable_cosmology_equations(self, t: float, y: np.ndarray) -> np.ndarray:
         """Equações cosmológicas estabilizadas"""
         
@@ -404,16 +3025,17 @@ class PhysicsTestSystemV3:
         rho = max(rho, self.config.epsilon)
         T = max(T, self.config.epsilon)
         
-        # Constantes dinâmicas
-        G = self.get_dynamic_constant(6.67430e-11, t, 'G')
-        c = self.get_dynamic_constant(299792458, t, 'c')
-        h = self.get_dynamic_constant(6.62607015e-34, t, 'h')
+        # Constantes dinâmicas e compressão TARDIS (tabeladas, se ativas)
+        if self._coefficient_table is not None:
+            G, c, h, _, compression = self._coefficient_table.evaluate(t)
+        else:
+            G, c, h, _ = self.evaluate_dynamic_constants(t)
+            compression = self.tardis_compression_model(t)
         
         # Parâmetro de Hubble regularizado
-        H = np.clip(a_dot / a, -1e4, 1e4)
+        H = _clip_scalar(a_dot / a, -1e4, 1e4)
         
         # Compressão TARDIS
-        compression = self.tardis_compression_model(t)
         tardis_factor = 1.0 / np.sqrt(compression + self.config.epsilon)
         
         # Equações de Friedmann modificadas
@@ -424,7 +3046,7 @@ class PhysicsTestSystemV3:
         # 2. d²a/dt² (equação de aceleração)
         rho_effective = rho * (1 + 3 * 0.33)  # Pressão de radiação
         acceleration = -4 * np.pi * G * a * rho_effective / (3 * c**2)
-        acceleration = np.clip(acceleration, -1e4, 1e4)
+        acceleration = _clip_scalar(acceleration, -1e4, 1e4)
         
         # Aplicar correção TARDIS
         d2a_dt2 = acceleration * tardis_factor
@@ -434,10 +3056,10 @@ class PhysicsTestSystemV3:
         
         # Termo de resfriamento quântico
         quantum_cooling = -rho * h / (1e-20 + t) * np.exp(-t / 1e6)
-        quantum_cooling = np.clip(quantum_cooling, -rho * 0.1, 0)
+        quantum_cooling = _clip_scalar(quantum_cooling, -rho * 0.1, 0)
         
         drho_dt = expansion_dilution + quantum_cooling
-        drho_dt = np.clip(drho_dt, -rho * 20, rho * 20)
+        drho_dt = _clip_scalar(drho_dt, -rho * 20, rho * 20)
         
         # 4. dT/dt (evolução da temperatura)
         cooling_rate = -H * T
@@ -445,12 +3067,12 @@ class PhysicsTestSystemV3:
         # Correções quânticas na temperatura
         if T > 0:
             quantum_temp_correction = 1 + h / (1.38e-23 * T * (1 + t/1e3))
-            quantum_temp_correction = np.clip(quantum_temp_correction, 0.5, 2.0)
+            quantum_temp_correction = _clip_scalar(quantum_temp_correction, 0.5, 2.0)
         else:
             quantum_temp_correction = 1.0
             
         dT_dt = cooling_rate * quantum_temp_correction
-        dT_dt = np.clip(dT_dt, -T * 20, T * 20)
+        dT_dt = _clip_scalar(dT_dt, -T * 20, T * 20)
         
         return np.array([da_dt, d2a_dt2, drho_dt, dT_dt])
     
@@ -558,11 +3180,8 @@ class PhysicsTestSystemV3:
         if total_points < 2:
             return 1.0
 
-        convergence_points = 0
-        for i in range(1, total_points):
-            relative_change = abs(results.tardis_compression[i] - results.tardis_compression[i-1])
-            if relative_change < 0.01:  # Critério de convergência
-                convergence_points += 1
+        relative_change = np.abs(np.diff(results.tardis_compression))
+        convergence_points = np.count_nonzero(relative_change < 0.01)  # Critério de convergência
 
         return convergence_points / (total_points - 1)
 
@@ -634,69 +3253,677 @@ class PhysicsTestSystemV3:
         self.logger.info("Benchmark concluído")
         return benchmark_results
 
-    def run_quantum_mechanics_simulation(self, potential_func: Callable,
-                                       x_range: Tuple[float, float] = (-5, 5),
-                                       n_points: int = 1000) -> Dict[str, np.ndarray]:
+    def run_quantum_mechanics_simulation(self, potential_func: Callable,
+                                       x_range: Tuple[float, float] = (-5, 5),
+                                       n_points: int = 1000,
+                                       n_states: Optional[int] = None,
+                                       eigensolver: str = 'auto',
+                                       stencil: int = 3) -> Dict[str, np.ndarray]:
+        """
+        Simulação de mecânica quântica usando diferenças finitas
+
+        Sem `n_states` (e com o estêncil de 3 pontos), diagonaliza o
+        Hamiltoniano denso completo. Com `n_states`, o Hamiltoniano é guardado
+        apenas como diagonais (ψ = 0 fora da grade) e somente os n_states
+        estados de menor energia são calculados, em tempo quase linear e sem a
+        matriz n×n, o que permite grades de 10^5-10^6 pontos.
+
+        O potencial é avaliado primeiro no array inteiro da grade; se
+        `potential_func` não aceitar arrays (ou devolver outra forma), é
+        avaliado ponto a ponto. Com config.use_eigenstate_cache, problemas já
+        resolvidos (mesmo potencial amostrado, grade e discretização) são lidos
+        do cache.
+
+        Parameters:
+        -----------
+        potential_func : Callable
+            Função do potencial V(x)
+        x_range : Tuple[float, float]
+            Intervalo espacial
+        n_points : int
+            Número de pontos da grade
+        n_states : int, optional
+            Número de estados de menor energia a calcular
+        eigensolver : str
+            'tridiagonal' (scipy.linalg.eigh_tridiagonal, só 3 pontos),
+            'banded' (scipy.linalg.eig_banded), 'shift_invert'
+            (scipy.sparse.linalg.eigsh em modo shift-invert, com deslocamento
+            abaixo do espectro) ou 'auto' (tridiagonal para 3 pontos, banded
+            para os demais)
+        stencil : int
+            Pontos do Laplaciano (ver LAPLACIAN_STENCILS): 3 (erro O(dx²)),
+            5 (O(dx⁴)) ou 7 (O(dx⁶)). Os estênceis de ordem alta atingem a
+            mesma precisão nas energias com várias vezes menos pontos
+
+        Returns:
+        --------
+        Dict[str, np.ndarray]
+            Energias e funções de onda
+        """
+        self.logger.info("Executando simulação de mecânica quântica...")
+
+        x = np.linspace(x_range[0], x_range[1], n_points)
+        dx = x[1] - x[0]
+
+        # Potencial
+        V = self._evaluate_potential(potential_func, x)
+
+        if n_states is not None or stencil != 3:
+            n_states = n_points if n_states is None else n_states
+
+            def solve(initial):
+                energies, vectors = self._lowest_eigenstates(V, dx, n_states, eigensolver,
+                                                             stencil, initial)
+                return {'energies': energies, 'eigenvectors': vectors}
+
+            entry = self._cached_eigenstates(V, [x], n_states,
+                                             {'stencil': stencil, 'eigensolver': eigensolver},
+                                             solve, warm_start=eigensolver == 'shift_invert')
+            eigenvalues = entry['energies']
+            eigenvectors = entry['eigenvectors'] / np.sqrt(dx)  # Normalização
+
+            self.logger.info(f"Simulação QM concluída ({len(eigenvalues)} estados, "
+                             f"estêncil de {stencil} pontos). "
+                             f"Primeiras energias: {eigenvalues[:5]}")
+
+            return {
+                'energies': eigenvalues,
+                'wavefunctions': eigenvectors,
+                'x': x,
+                'potential': V
+            }
+
+        def solve_dense(initial):
+            # Construir matriz Hamiltoniana
+            H = np.zeros((n_points, n_points))
+            hbar = self.constants.hbar
+            m = self.constants.m_e  # massa do elétron
+
+            for i in range(1, n_points-1):
+                H[i, i-1] = -hbar**2 / (2 * m * dx**2)
+                H[i, i] = hbar**2 / (m * dx**2) + V[i]
+                H[i, i+1] = -hbar**2 / (2 * m * dx**2)
+
+            # Condições de contorno
+            H[0, 0] = H[-1, -1] = V[0] if x_range[0] == x_range[1] else V[0]
+
+            # Autovalores e autovetores
+            energies, vectors = np.linalg.eigh(H)
+            return {'energies': energies, 'eigenvectors': vectors}
+
+        entry = self._cached_eigenstates(V, [x], n_points, {'eigensolver': 'dense'}, solve_dense)
+        eigenvalues = entry['energies']
+
+        # Normalizar funções de onda
+        eigenvectors = entry['eigenvectors'] / np.sqrt(dx)  # Normalização
+
+        self.logger.info(f"Simulação QM concluída. Primeiras energias: {eigenvalues[:5]}")
+
+        return {
+            'energies': eigenvalues,
+            'wavefunctions': eigenvectors,
+            'x': x,
+            'potential': V
+        }
+
+    @staticmethod
+    def _evaluate_potential(potential_func: Callable, *grids: np.ndarray) -> np.ndarray:
+        """
+        Avalia V nas grades inteiras, com fallback ponto a ponto
+
+        Funções escritas para escalares (com `if`, `math.*`, ...) levantam
+        exceção ou devolvem uma forma diferente quando recebem arrays; nesses
+        casos o potencial é avaliado ponto a ponto, como antes. Um resultado
+        escalar também cai no ponto a ponto: pode ser uma redução da grade
+        inteira (np.dot(x, x), np.mean, ...) e não um potencial constante.
+        """
+        shape = grids[0].shape
+        try:
+            with np.errstate(all='ignore'):
+                V = np.asarray(potential_func(*grids), dtype=float)
+            if V.shape == shape:
+                return V
+        except Exception:
+            pass
+        points = zip(*(grid.ravel() for grid in grids))
+        return np.array([potential_func(*point) for point in points], dtype=float).reshape(shape)
+
+    def _cached_eigenstates(self, V: np.ndarray, axes: List[np.ndarray], n_states: int,
+                            method: Dict[str, object], solve: Callable,
+                            warm_start: bool = False) -> Dict[str, np.ndarray]:
+        """
+        Resolve o problema de autovalores passando pelo cache de autoestados
+
+        `solve(initial)` recebe o subespaço inicial (autovetores em cache de
+        outro potencial na mesma grade, só se `warm_start`, ou None) e retorna
+        um dict com 'energies' e 'eigenvectors' (norma euclidiana 1) e,
+        opcionalmente, 'converged': resultados não convergidos não entram no
+        cache, para que uma nova tentativa (com mais iterações, por exemplo)
+        recalcule em vez de receber a entrada antiga.
+        """
+        if not self.config.use_eigenstate_cache:
+            entry = solve(None)
+            entry.pop('converged', None)
+            return entry
+
+        cache = self.eigenstate_cache
+        key, grid_key = cache.key(V, axes, self.constants.m_e, self.constants.hbar,
+                                  n_states, method)
+        entry = cache.get(key)
+        if entry is not None:
+            self.logger.info(f"Autoestados {key} carregados do cache")
+            return entry
+
+        entry = solve(cache.warm_start(grid_key) if warm_start else None)
+        if entry.pop('converged', True):
+            cache.put(key, grid_key, entry)
+        return entry
+
+    def _lowest_eigenstates(self, V: np.ndarray, dx: float, n_states: int,
+                            eigensolver: str = 'auto', stencil: int = 3,
+                            initial: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Menores autoestados do Hamiltoniano de diferenças finitas em banda
+
+        H = -ħ²/2m ∇² + V com o Laplaciano de LAPLACIAN_STENCILS[stencil] e
+        ψ = 0 fora da grade. Retorna (energias, autovetores com norma
+        euclidiana 1). `initial` (autovetores de um problema próximo) fornece
+        o vetor inicial do autossolver 'shift_invert'.
+        """
+        if stencil not in LAPLACIAN_STENCILS:
+            raise ValueError(f"Estêncil deve ser um de {sorted(LAPLACIAN_STENCILS)}")
+        n_points = V.size
+        if not 0 < n_states <= n_points:
+            raise ValueError(f"n_states deve estar entre 1 e {n_points}")
+        if eigensolver == 'auto':
+            eigensolver = 'tridiagonal' if stencil == 3 else 'banded'
+
+        hbar = self.constants.hbar
+        m = self.constants.m_e  # massa do elétron
+        kinetic = hbar**2 / (2 * m * dx**2)
+        coefficients = LAPLACIAN_STENCILS[stencil]
+        diagonal = -kinetic * coefficients[0] + V
+        bands = [np.full(n_points - j, -kinetic * c) for j, c in enumerate(coefficients) if j > 0]
+
+        if eigensolver == 'tridiagonal':
+            if stencil != 3:
+                raise ValueError("O autossolver 'tridiagonal' requer o estêncil de 3 pontos")
+            return eigh_tridiagonal(diagonal, bands[0], select='i',
+                                    select_range=(0, n_states - 1))
+
+        if eigensolver == 'banded':
+            # Forma de banda inferior: linha j guarda a j-ésima subdiagonal
+            a_band = np.zeros((len(bands) + 1, n_points))
+            a_band[0] = diagonal
+            for j, band in enumerate(bands, start=1):
+                a_band[j, :n_points - j] = band
+            return eig_banded(a_band, lower=True, select='i', select_range=(0, n_states - 1))
+
+        if eigensolver == 'shift_invert':
+            if n_states >= n_points - 1:
+                raise ValueError("shift_invert requer n_states < n_points - 1")
+            offsets = list(range(-len(bands), len(bands) + 1))
+            H = sparse.diags(bands[::-1] + [diagonal] + bands, offsets, format='csc')
+            # O operador cinético truncado (ψ = 0 fora da grade) é positivo
+            # definido, logo o espectro fica acima de min(V): deslocamento
+            # abaixo do espectro e próximo dos menores autovalores
+            sigma = np.min(V)
+            sigma -= 1e-12 * max(abs(sigma), kinetic)
+            v0 = None if initial is None else initial.sum(axis=1)
+            eigenvalues, eigenvectors = eigsh(H, k=n_states, sigma=sigma, which='LM', v0=v0)
+            order = np.argsort(eigenvalues)
+            return eigenvalues[order], eigenvectors[:, order]
+
+        raise ValueError(f"Autossolver desconhecido: {eigensolver}")
+
+    def run_quantum_mechanics_nd(self, potential_func: Callable,
+                                 ranges: Iterable[Tuple[float, float]],
+                                 n_points=64, n_states: int = 5,
+                                 eigensolver: str = 'lobpcg', stencil: int = 3,
+                                 tol: float = 1e-6, max_iterations: int = 1000,
+                                 seed: int = 0) -> Dict[str, np.ndarray]:
+        """
+        Autoestados de menor energia em 2-D/3-D por diferenças finitas
+
+        O Laplaciano é montado como soma de Kronecker esparsa dos operadores
+        1-D de cada eixo (LAPLACIAN_STENCILS[stencil], ψ = 0 fora da caixa):
+        memória e tempo crescem com o número de pontos da grade, e não com o
+        seu quadrado. O precondicionador é o operador cinético diagonalizado
+        pela transformada seno (DST-I via FFT, exata para 3 pontos). Com
+        config.use_eigenstate_cache, resultados repetidos vêm do cache e
+        autovetores da mesma grade iniciam o autossolver.
+
+        Parameters:
+        -----------
+        potential_func : callable
+            V(X, Y[, Z]) avaliado nas grades de np.meshgrid(..., indexing='ij');
+            funções apenas escalares são avaliadas ponto a ponto
+        ranges : sequence of (float, float)
+            Intervalo de cada eixo
+        n_points : int or sequence of int
+            Pontos por eixo
+        n_states : int
+            Número de estados de menor energia
+        eigensolver : str
+            'lobpcg' (scipy.sparse.linalg.lobpcg precondicionado) ou 'eigsh'
+            (shift-invert abaixo do espectro, com os sistemas lineares
+            resolvidos por gradiente conjugado com o mesmo precondicionador)
+        stencil : int
+            Pontos do Laplaciano em cada eixo: 3, 5 ou 7
+        tol : float
+            Tolerância do resíduo, relativa à escala de energia cinética da grade
+        max_iterations : int
+            Máximo de iterações do LOBPCG
+        seed : int
+            Semente dos vetores iniciais
+
+        Returns:
+        --------
+        Dict com 'energies', 'wavefunctions' (forma da grade + (n_states,),
+        normalizadas com ∫|ψ|² dV = 1), 'axes', 'potential' e 'residual_norms'
+        """
+        ranges = [tuple(bounds) for bounds in ranges]
+        ndim = len(ranges)
+        shape = (int(n_points),) * ndim if np.ndim(n_points) == 0 else tuple(int(n) for n in n_points)
+        if len(shape) != ndim:
+            raise ValueError("n_points deve ter um valor por eixo")
+        if stencil not in LAPLACIAN_STENCILS:
+            raise ValueError(f"Estêncil deve ser um de {sorted(LAPLACIAN_STENCILS)}")
+        size = math.prod(shape)
+        if not 0 < n_states < size // 2:
+            raise ValueError(f"n_states deve estar entre 1 e {size // 2 - 1}")
+        if eigensolver not in ('lobpcg', 'eigsh'):
+            raise ValueError(f"Autossolver desconhecido: {eigensolver}")
+
+        self.logger.info(f"Iniciando simulação QM {ndim}-D: grade {shape}, {eigensolver}")
+
+        axes = [np.linspace(a, b, n) for (a, b), n in zip(ranges, shape)]
+        spacings = [axis[1] - axis[0] for axis in axes]
+        V = self._evaluate_potential(potential_func, *np.meshgrid(*axes, indexing='ij'))
+
+        hbar = self.constants.hbar
+        m = self.constants.m_e  # massa do elétron
+        axis_units = [hbar**2 / (2 * m * dx**2) for dx in spacings]
+        energy_scale = sum(axis_units)
+        V_min = V.min()
+
+        def solve(initial):
+            # A = (H - min V) / escala: adimensional e positiva definida
+            coefficients = LAPLACIAN_STENCILS[stencil]
+            offsets = list(range(1 - len(coefficients), len(coefficients)))
+            A = sparse.diags((V - V_min).ravel() / energy_scale, format='csr')
+            symbol = np.zeros(shape)
+            for axis, (n, unit) in enumerate(zip(shape, axis_units)):
+                weight = unit / energy_scale
+                kinetic = sparse.diags([-weight * coefficients[abs(k)] for k in offsets], offsets,
+                                       shape=(n, n))
+                A = A + sparse.kron(sparse.kron(sparse.identity(math.prod(shape[:axis])), kinetic),
+                                    sparse.identity(math.prod(shape[axis + 1:])), format='csr')
+                # Autovalores do operador cinético 1-D na base seno
+                theta = np.pi * np.arange(1, n + 1) / (n + 1)
+                axis_symbol = -weight * (coefficients[0] + 2 * sum(
+                    c * np.cos(j * theta) for j, c in enumerate(coefficients) if j > 0))
+                symbol += axis_symbol.reshape([n if i == axis else 1 for i in range(ndim)])
+
+            # Precondicionador (T + s)^-1 com T cinético e s = energia cinética do
+            # n-ésimo modo mais o potencial médio, estimativa da escala de A
+            shift = np.sort(symbol, axis=None)[n_states - 1] + np.mean(V - V_min) / energy_scale
+            inverse_symbol = (1.0 / (symbol + shift))[..., None]
+            transform_axes = tuple(range(ndim))
+
+            def precondition(vectors):
+                block = vectors.reshape(shape + (-1,))
+                spectral = dstn(block, type=1, axes=transform_axes, norm='ortho', workers=-1)
+                spectral *= inverse_symbol
+                return dstn(spectral, type=1, axes=transform_axes, norm='ortho',
+                            workers=-1).reshape(vectors.shape)
+
+            M = LinearOperator((size, size), matvec=precondition, matmat=precondition, dtype=float)
+
+            if eigensolver == 'lobpcg':
+                block_size = n_states + max(2, n_states // 2)
+                X = np.random.default_rng(seed).standard_normal((size, block_size))
+                if initial is not None:
+                    n_initial = min(block_size, initial.shape[1])
+                    X[:, :n_initial] = initial[:, :n_initial]
+                # Os avisos de tolerância do lobpcg incluem os vetores de guarda
+                # do bloco; a convergência dos estados pedidos é verificada abaixo
+                with warnings.catch_warnings():
+                    warnings.filterwarnings('ignore', message=r'Exited (at iteration|postprocessing)',
+                                            category=UserWarning)
+                    eigenvalues, eigenvectors = lobpcg(A, X, M=M, tol=tol,
+                                                       maxiter=max_iterations, largest=False)
+            else:
+                def solve_shifted(b):
+                    x, _ = cg(A, b, M=M, **{_CG_RTOL_KEYWORD: 1e-3 * tol})
+                    return x
+
+                OPinv = LinearOperator((size, size), matvec=solve_shifted, dtype=float)
+                v0 = None if initial is None else initial.sum(axis=1)
+                eigenvalues, eigenvectors = eigsh(A, k=n_states, sigma=0.0, which='LM',
+                                                  OPinv=OPinv, tol=tol, v0=v0)
+
+            order = np.argsort(eigenvalues)[:n_states]
+            eigenvalues, eigenvectors = eigenvalues[order], eigenvectors[:, order]
+            residual_norms = np.linalg.norm(A @ eigenvectors - eigenvectors * eigenvalues, axis=0)
+            converged = bool(np.all(residual_norms <= 10 * tol))
+            if not converged:
+                self.logger.warning(f"Autoestados {ndim}-D não convergiram: resíduos {residual_norms}")
+            return {'energies': eigenvalues * energy_scale + V_min, 'eigenvectors': eigenvectors,
+                    'residual_norms': residual_norms, 'converged': converged}
+
+        entry = self._cached_eigenstates(
+            V, axes, n_states, {'stencil': stencil, 'eigensolver': eigensolver, 'tol': tol},
+            solve, warm_start=True
+        )
+        energies, residual_norms = entry['energies'], entry['residual_norms']
+        wavefunctions = entry['eigenvectors'].reshape(shape + (n_states,)) / np.sqrt(math.prod(spacings))
+
+        self.logger.info(f"Simulação QM {ndim}-D concluída. Primeiras energias: {energies[:5]}")
+
+        return {
+            'energies': energies,
+            'wavefunctions': wavefunctions,
+            'axes': axes,
+            'potential': V,
+            'residual_norms': residual_norms
+        }
+
+    def run_perturbative_spectrum(self, potential_func: Callable, results: SimulationResults,
+                                  x_range: Tuple[float, float] = (-5, 5),
+                                  n_points: int = 1000, n_states: int = 5,
+                                  potential_exponents: Optional[Dict[str, float]] = None,
+                                  stencil: int = 3, n_basis: Optional[int] = None,
+                                  order: int = 2,
+                                  max_perturbation: float = 0.1) -> Dict[str, np.ndarray]:
+        """
+        Espectro ao longo de constants_history por teoria de perturbação
+
+        Com ħ ∝ h e m_e variando no tempo, o Hamiltoniano é
+        H(t) = s_T T + s_V V, com s_T = (h/h0)² / (m_e/m_e0) e
+        s_V = Π (X/X0)^p dado por `potential_exponents` (p.ex. {'alpha': 1}
+        para um potencial proporcional a α). Como H(t) = s_T (T + κ V) com
+        κ = s_V / s_T, basta diagonalizar uma vez em κ = 1 e expandir em
+        ε = κ - 1:
+
+            E_n(t) = s_T [E_n + ε V_nn + ε² Σ_{m≠n} V_nm² / (E_n - E_m)]
+
+        A soma de segunda ordem usa os `n_basis` menores estados. Onde o
+        parâmetro de perturbação η = |ε| max |V_nm / (E_n - E_m)| excede
+        `max_perturbation`, as energias são obtidas por rediagonalização
+        exata (uma por valor distinto de κ).
+
+        Parameters:
+        -----------
+        potential_func : callable
+            Função do potencial V(x) nas constantes de referência
+        results : SimulationResults
+            Resultados com time_array e constants_history; constantes ausentes
+            do histórico (m_e) são avaliadas por get_dynamic_constant_array
+        x_range : Tuple[float, float]
+            Intervalo espacial
+        n_points : int
+            Número de pontos da grade
+        n_states : int
+            Número de estados na tabela
+        potential_exponents : dict, optional
+            Expoentes das constantes na escala do potencial ({} = V fixo)
+        stencil : int
+            Pontos do Laplaciano: 3, 5 ou 7
+        n_basis : int, optional
+            Estados usados na soma de segunda ordem (padrão: 20 n_states)
+        order : int
+            Ordem da expansão: 1 ou 2
+        max_perturbation : float
+            Limite de η acima do qual a rediagonalização exata é usada
+
+        Returns:
+        --------
+        Dict com 'time', 'energies' (n_times, n_states), 'reference_energies',
+        'perturbation_parameter' (η por tempo) e 'exact' (tempos rediagonalizados)
+        """
+        if order not in (1, 2):
+            raise ValueError("order deve ser 1 ou 2")
+        potential_exponents = potential_exponents or {}
+        n_basis = min(n_points, n_basis or 20 * n_states)
+        if not 0 < n_states <= n_basis:
+            raise ValueError(f"n_states deve estar entre 1 e {n_basis}")
+
+        times = np.asarray(results.time_array, dtype=float)
+        kinetic_scale = (self._constant_factors(results, 'h')**2
+                         / self._constant_factors(results, 'm_e'))
+        potential_scale = np.ones_like(times)
+        for name, exponent in potential_exponents.items():
+            potential_scale = potential_scale * self._constant_factors(results, name)**exponent
+        epsilon = potential_scale / kinetic_scale - 1.0
+
+        # Diagonalização única nas constantes de referência
+        x = np.linspace(x_range[0], x_range[1], n_points)
+        dx = x[1] - x[0]
+        V = self._evaluate_potential(potential_func, x)
+
+        def solve(initial):
+            energies, vectors = self._lowest_eigenstates(V, dx, n_basis, 'auto', stencil)
+            return {'energies': energies, 'eigenvectors': vectors}
+
+        reference = self._cached_eigenstates(V, [x], n_basis,
+                                             {'stencil': stencil, 'eigensolver': 'auto'}, solve)
+        E, U = reference['energies'], reference['eigenvectors']
+
+        # Elementos de matriz V_nm (n < n_states, m < n_basis) e acoplamentos
+        V_nm = U[:, :n_states].T @ (V[:, np.newaxis] * U)
+        gaps = E[:n_states, np.newaxis] - E[np.newaxis, :]
+        off_diagonal = ~np.eye(n_states, n_basis, dtype=bool)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mixing = np.where(off_diagonal, np.abs(V_nm) / np.abs(gaps), 0.0)
+            second_order = np.where(off_diagonal, V_nm**2 / gaps, 0.0).sum(axis=1)
+        perturbation = np.abs(epsilon) * mixing.max()
+
+        shifted = E[:n_states] + epsilon[:, np.newaxis] * np.diag(V_nm)
+        if order == 2:
+            shifted = shifted + epsilon[:, np.newaxis]**2 * second_order
+        energies = kinetic_scale[:, np.newaxis] * shifted
+
+        exact = perturbation > max_perturbation
+        if np.any(exact):
+            kappas, inverse = np.unique(epsilon[exact] + 1.0, return_inverse=True)
+            exact_energies = np.array([
+                self._lowest_eigenstates(kappa * V, dx, n_states, 'auto', stencil)[0]
+                for kappa in kappas
+            ])
+            energies[exact] = kinetic_scale[exact, np.newaxis] * exact_energies[inverse]
+
+        self.logger.info(f"Espectro perturbativo: {len(times)} tempos, {n_states} estados, "
+                         f"{len(np.unique(epsilon[exact]))} rediagonalizações exatas")
+
+        return {
+            'time': times,
+            'energies': energies,
+            'reference_energies': E[:n_states],
+            'perturbation_parameter': perturbation,
+            'exact': exact
+        }
+
+    def run_transmission_simulation(self, potential_func: Callable, energies: np.ndarray,
+                                    x_range: Tuple[float, float] = (-5, 5),
+                                    n_points: int = 1000,
+                                    resonance_prominence: float = 0.05) -> Dict[str, np.ndarray]:
         """
-        Simulação de mecânica quântica usando diferenças finitas
+        Tunelamento: T(E), R(E) e ressonâncias pela matriz de transferência
+
+        Usa o mesmo potential_func e o mesmo formato de grade que
+        run_quantum_mechanics_simulation; V[0] e V[-1] definem os terminais
+        (ver AdvancedNumericalMethods.transfer_matrix_transmission). As
+        ressonâncias são os máximos locais de T(E) com proeminência de pelo
+        menos `resonance_prominence`, com posição refinada por interpolação
+        parabólica e largura a meia altura Γ (tempo de vida ħ/Γ).
 
         Parameters:
         -----------
-        potential_func : Callable
+        potential_func : callable
             Função do potencial V(x)
+        energies : np.ndarray
+            Energias de incidência, em ordem crescente
         x_range : Tuple[float, float]
             Intervalo espacial
         n_points : int
             Número de pontos da grade
+        resonance_prominence : float
+            Proeminência mínima de um pico de T(E) para ser ressonância
 
         Returns:
         --------
-        Dict[str, np.ndarray]
-            Energias e funções de onda
+        Dict com 'energies', 'transmission', 'reflection', 'resonances',
+        'resonance_widths', 'x' e 'potential'
         """
-        self.logger.info("Executando simulação de mecânica quântica...")
+        self.logger.info("Executando simulação de tunelamento...")
 
+        energies = np.asarray(energies, dtype=float)
         x = np.linspace(x_range[0], x_range[1], n_points)
-        dx = x[1] - x[0]
+        V = self._evaluate_potential(potential_func, x)
 
-        # Potencial
-        V = np.array([potential_func(xi) for xi in x])
+        transmission, reflection = self.numerical_methods.transfer_matrix_transmission(
+            V, x, energies, hbar=self.constants.hbar, mass=self.constants.m_e
+        )
 
-        # Construir matriz Hamiltoniana
-        H = np.zeros((n_points, n_points))
-        hbar = self.constants.hbar
-        m = self.constants.m_e  # massa do elétron
+        index = np.arange(energies.size, dtype=float)
+        peaks, _ = find_peaks(np.nan_to_num(transmission), prominence=resonance_prominence)
+        # Vértice da parábola pelos três pontos em torno de cada pico (em índices)
+        inner = peaks[(peaks > 0) & (peaks < energies.size - 1)]
+        left, center, right = transmission[inner - 1], transmission[inner], transmission[inner + 1]
+        curvature = left - 2 * center + right
+        offset = np.divide(0.5 * (left - right), curvature,
+                           out=np.zeros_like(center), where=curvature != 0)
+        refined = index[peaks].copy()
+        refined[np.isin(peaks, inner)] += np.clip(offset, -0.5, 0.5)
+        resonances = np.interp(refined, index, energies)
+
+        _, _, left_ips, right_ips = peak_widths(np.nan_to_num(transmission), peaks, rel_height=0.5)
+        resonance_widths = np.interp(right_ips, index, energies) - np.interp(left_ips, index, energies)
 
-        for i in range(1, n_points-1):
-            H[i, i-1] = -hbar**2 / (2 * m * dx**2)
-            H[i, i] = hbar**2 / (m * dx**2) + V[i]
-            H[i, i+1] = -hbar**2 / (2 * m * dx**2)
+        self.logger.info(f"Tunelamento concluído: {energies.size} energias, "
+                         f"{resonances.size} ressonâncias")
 
-        # Condições de contorno
-        H[0, 0] = H[-1, -1] = V[0] if x_range[0] == x_range[1] else V[0]
+        return {
+            'energies': energies,
+            'transmission': transmission,
+            'reflection': reflection,
+            'resonances': resonances,
+            'resonance_widths': resonance_widths,
+            'x': x,
+            'potential': V
+        }
 
-        # Autovalores e autovetores
-        eigenvalues, eigenvectors = np.linalg.eigh(H)
+    def _constant_factors(self, results: SimulationResults, name: str) -> np.ndarray:
+        """
+        Razão X(t)/X0 de uma constante em results.time_array
 
-        # Normalizar funções de onda
-        eigenvectors = eigenvectors / np.sqrt(dx)  # Normalização
+        Usa constants_history quando a constante está lá e
+        get_dynamic_constant_array caso contrário (p.ex. 'm_e').
+        """
+        base = getattr(self.constants, name)
+        if name in results.constants_history:
+            return np.asarray(results.constants_history[name], dtype=float) / base
+        times = np.asarray(results.time_array, dtype=float)
+        return self.get_dynamic_constant_array(base, times, name) / base
+
+    def run_dynamic_wavepacket(self, psi_0: np.ndarray, potential_func: Callable,
+                               x: np.ndarray, results: SimulationResults,
+                               dt: float, n_steps: int, boundary: str = 'dirichlet',
+                               tolerance: float = 1e-3,
+                               save_every: Optional[int] = None) -> Dict[str, object]:
+        """
+        Evolução de um pacote de onda com ħ(t) e m(t) de uma execução cosmológica
 
-        self.logger.info(f"Simulação QM concluída. Primeiras energias: {eigenvalues[:5]}")
+        Os n_steps passos de Δt cobrem linearmente results.time_array, do
+        primeiro ao último instante; ħ ∝ h e m_e de cada passo são
+        interpolados do histórico no ponto médio do passo. A propagação usa
+        DynamicCrankNicolsonPropagator, que só refatora o operador quando os
+        coeficientes mudam mais que `tolerance` e reaproveita fatorações
+        anteriores.
+
+        Parameters:
+        -----------
+        psi_0 : np.ndarray
+            Função de onda inicial na malha x, forma (n,) ou (n, k)
+        potential_func : callable
+            Função do potencial V(x)
+        x : np.ndarray
+            Malha uniforme
+        results : SimulationResults
+            Resultados com time_array e constants_history
+        dt : float
+            Passo de tempo (s)
+        n_steps : int
+            Número de passos
+        boundary : str
+            'dirichlet' ou 'periodic'
+        tolerance : float
+            Variação relativa de ħ/m e 1/ħ tolerada dentro de um trecho
+        save_every : int, optional
+            Guardar ψ a cada save_every passos
+
+        Returns:
+        --------
+        Dict com 'psi' (final), 'snapshots', 'norm', 'history_time' (instante
+        cosmológico de cada passo), 'hbar', 'mass' e 'stats' (passos, trechos,
+        fatorações e reaproveitamentos do cache)
+        """
+        x = np.asarray(x, dtype=float)
+        dx = x[1] - x[0]
+        V = self._evaluate_potential(potential_func, x)
+
+        history_times = np.asarray(results.time_array, dtype=float)
+        history_time = history_times[0] + (history_times[-1] - history_times[0]) * (
+            (np.arange(n_steps) + 0.5) / n_steps
+        )
+        hbar = self.constants.hbar * np.interp(history_time, history_times,
+                                               self._constant_factors(results, 'h'))
+        mass = self.constants.m_e * np.interp(history_time, history_times,
+                                              self._constant_factors(results, 'm_e'))
+
+        propagator = DynamicCrankNicolsonPropagator(V, dx, dt, boundary=boundary,
+                                                    tolerance=tolerance)
+        psi, snapshots = propagator.propagate(psi_0, hbar, mass, save_every=save_every)
+        norm = np.sum(np.abs(psi)**2, axis=0) * dx
+
+        stats = propagator.stats
+        self.logger.info(f"Pacote de onda propagado: {stats['steps']} passos, "
+                         f"{stats['segments']} trechos, {stats['factorizations']} fatorações, "
+                         f"{stats['cache_hits']} reaproveitadas do cache")
 
         return {
-            'energies': eigenvalues,
-            'wavefunctions': eigenvectors,
-            'x': x,
-            'potential': V
+            'psi': psi,
+            'snapshots': snapshots,
+            'norm': norm,
+            'history_time': history_time,
+            'hbar': hbar,
+            'mass': mass,
+            'stats': dict(stats)
         }
 
     def run_monte_carlo_simulation(self, n_particles: int = 1000,
                                  temperature: float = 300,
                                  box_size: float = 10.0,
-                                 n_steps: int = 10000) -> Dict[str, np.ndarray]:
+                                 n_steps: int = 10000,
+                                 mode: str = 'single',
+                                 step_size: float = 0.1,
+                                 seed: Optional[int] = None,
+                                 pair_potential: Optional[Callable] = None,
+                                 cutoff: float = 2.5, n_tune: int = 0,
+                                 target_acceptance: float = 0.3,
+                                 target_ess: Optional[float] = None) -> Dict[str, np.ndarray]:
         """
         Simulação Monte Carlo para sistemas estatísticos
 
+        Com mode='sweep', cada um dos n_steps passos move todas as partículas
+        (AdvancedNumericalMethods.metropolis_sweeps) e 'energy_history' é a
+        energia total após cada varredura; com mode='single' (padrão), é a
+        energia da partícula movida em cada passo. Com `pair_potential` (ver
+        make_pair_potential), as partículas interagem aos pares na caixa
+        periódica e as varreduras usam listas de células em tabuleiro
+        (AdvancedNumericalMethods.pairwise_metropolis_sweeps).
+
         Parameters:
         -----------
         n_particles : int
@@ -706,32 +3933,756 @@ class PhysicsTestSystemV3:
         box_size : float
             Tamanho da caixa de simulação
         n_steps : int
-            Número de passos Monte Carlo
+            Número de passos Monte Carlo (varreduras em mode='sweep')
+        mode : str
+            'single' ou 'sweep'
+        step_size : float
+            Desvio padrão do deslocamento proposto
+        seed : int, optional
+            Semente do gerador
+        pair_potential : callable, optional
+            Energia de par φ(r) no lugar do oscilador harmônico (mode='sweep')
+        cutoff : float
+            Raio de corte de pair_potential
+        n_tune : int
+            Passos de aquecimento que ajustam step_size (descartados)
+        target_acceptance : float
+            Taxa de aceitação alvo do aquecimento
+        target_ess : float, optional
+            Encerrar a amostragem ao atingir este tamanho efetivo da amostra
 
         Returns:
         --------
         Dict[str, np.ndarray]
-            Posições finais e histórico de energia
+            Posições finais, histórico de energia, taxa de aceitação, passo
+            usado, média e variância da energia, tempo de autocorrelação,
+            tamanho efetivo da amostra e ESS por segundo (ver
+            AdvancedNumericalMethods.adaptive_metropolis)
         """
         self.logger.info(f"Executando simulação Monte Carlo com {n_particles} partículas...")
 
-        # Função potencial simples (oscillador harmônico)
-        def potential(positions):
-            return 0.5 * np.sum(positions**2)
-
-        positions, energies = self.numerical_methods.monte_carlo_simulation(
-            n_particles, potential, temperature, box_size, n_steps
+        # Função potencial simples (oscilador harmônico), separável por partícula
+        rng = np.random.default_rng(seed)
+        positions = rng.uniform(-box_size/2, box_size/2, (n_particles, 3))
+        run = self.numerical_methods.adaptive_metropolis(
+            positions, _harmonic_potential, temperature, box_size, n_steps, mode,
+            step_size, rng, pair_potential, cutoff, n_tune=n_tune,
+            target_acceptance=target_acceptance, target_ess=target_ess
         )
 
-        self.logger.info("Simulação Monte Carlo concluída")
+        self.logger.info(f"Simulação Monte Carlo concluída: passo {run['step_size']:.3g}, "
+                         f"ESS {run['effective_sample_size']:.0f} "
+                         f"({run['ess_per_second']:.1f}/s)")
+
+        return {
+            'final_positions': run['positions'],
+            'energy_history': run['energy_history'],
+            'temperature': temperature,
+            'box_size': box_size,
+            'acceptance_rate': run['acceptance_rate'],
+            'step_size': run['step_size'],
+            'energy_mean': run['energy_mean'],
+            'energy_variance': run['energy_variance'],
+            'autocorrelation_time': run['autocorrelation_time'],
+            'effective_sample_size': run['effective_sample_size'],
+            'ess_per_second': run['ess_per_second']
+        }
+
+    def run_monte_carlo_chains(self, n_chains: int = 4, n_particles: int = 1000,
+                               temperature: float = 300, box_size: float = 10.0,
+                               n_steps: int = 10000, mode: str = 'sweep',
+                               step_size: float = 0.1, seed: Optional[int] = None,
+                               pair_potential: Optional[Callable] = None,
+                               cutoff: float = 2.5, burn_in: float = 0.5,
+                               max_workers: Optional[int] = None,
+                               checkpoint_dir: Optional[str] = None) -> Dict[str, object]:
+        """
+        Cadeias Monte Carlo independentes e reproduzíveis em paralelo
+
+        Cada cadeia tem o seu próprio Generator, criado de um filho de
+        np.random.SeedSequence(seed) (mesma semente, mesmos resultados,
+        qualquer que seja o número de processos), e roda num processo de
+        trabalho (ProcessPoolExecutor). As cadeias são combinadas em
+        estimativas agregadas da energia, com o R-hat entre cadeias
+        (AdvancedNumericalMethods.split_r_hat) como diagnóstico de
+        convergência. Com `checkpoint_dir`, o estado de cada cadeia (posições,
+        estado do gerador, passos feitos) é gravado em chain_<k>.json e pode
+        ser continuado com resume_monte_carlo_chain.
+
+        Parameters:
+        -----------
+        n_chains : int
+            Número de cadeias
+        n_particles, temperature, box_size, n_steps, mode, step_size, pair_potential, cutoff
+            Como em run_monte_carlo_simulation; pair_potential precisa ser
+            serializável (ver make_pair_potential)
+        seed : int, optional
+            Semente da SeedSequence (None: entropia do sistema, devolvida em
+            'seed_entropy')
+        burn_in : float
+            Fração inicial de cada histórico descartada nas estimativas
+        max_workers : int, optional
+            Número de processos (padrão: uma por cadeia, até os.cpu_count())
+        checkpoint_dir : str, optional
+            Diretório dos estados das cadeias
+
+        Returns:
+        --------
+        Dict[str, object]
+            'chains' (posições finais, histórico de energia, taxa de
+            aceitação e checkpoint de cada cadeia), 'mean_energy',
+            'energy_variance', 'energy_standard_error' (pelo ESS),
+            'chain_means', 'r_hat', 'autocorrelation_time',
+            'effective_sample_size', 'ess_per_second', 'acceptance_rate'
+            (média) e 'seed_entropy'
+        """
+        start = perf_counter()
+        seed_sequence = np.random.SeedSequence(seed)
+        pair_spec = _pair_potential_spec(pair_potential)
+        parameters = {'temperature': temperature, 'box_size': box_size, 'mode': mode,
+                      'step_size': step_size, 'cutoff': cutoff}
+
+        tasks = []
+        for chain, child in enumerate(seed_sequence.spawn(n_chains)):
+            rng = np.random.Generator(np.random.PCG64(child))
+            tasks.append({
+                'chain': chain,
+                'seed_entropy': seed_sequence.entropy,
+                'spawn_key': list(child.spawn_key),
+                'steps_done': 0,
+                'positions': rng.uniform(-box_size/2, box_size/2, (n_particles, 3)),
+                'rng_state': rng.bit_generator.state,
+                'parameters': parameters,
+                'pair_potential': pair_potential,
+                'n_steps': n_steps
+            })
+
+        max_workers = min(max_workers or os.cpu_count() or 1, n_chains)
+        self.logger.info(f"Executando {n_chains} cadeias Monte Carlo em {max_workers} processos...")
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            records = list(executor.map(_execute_monte_carlo_chain, tasks))
+
+        if checkpoint_dir is not None:
+            os.makedirs(checkpoint_dir, exist_ok=True)
+            for record in records:
+                record['checkpoint'] = os.path.join(checkpoint_dir, f"chain_{record['chain']:03d}.json")
+                self._write_chain_checkpoint(record['checkpoint'], record, pair_spec)
+
+        first = int(burn_in * n_steps)
+        samples = np.array([record['energy_history'][first:] for record in records])
+        r_hat = self.numerical_methods.split_r_hat(samples)
+        if r_hat > 1.01:
+            self.logger.warning(f"Cadeias Monte Carlo não convergiram (R-hat = {r_hat:.3f})")
+        tau = self.numerical_methods.integrated_autocorrelation_time(samples)
+        ess = samples.size / tau
+        self.logger.info(f"Cadeias Monte Carlo concluídas: ESS {ess:.0f}")
 
         return {
-            'final_positions': positions,
-            'energy_history': energies,
+            'chains': records,
+            'mean_energy': samples.mean(),
+            'energy_variance': samples.var(ddof=1),
+            'energy_standard_error': np.sqrt(samples.var(ddof=1) / ess),
+            'chain_means': samples.mean(axis=1),
+            'r_hat': r_hat,
+            'autocorrelation_time': tau,
+            'effective_sample_size': ess,
+            'ess_per_second': ess / (perf_counter() - start),
+            'acceptance_rate': np.mean([record['acceptance_rate'] for record in records]),
+            'seed_entropy': seed_sequence.entropy,
             'temperature': temperature,
             'box_size': box_size
         }
 
+    def resume_monte_carlo_chain(self, checkpoint_path: str, n_steps: int,
+                                 pair_potential: Optional[Callable] = None) -> Dict[str, object]:
+        """
+        Continua uma cadeia de run_monte_carlo_chains a partir do seu checkpoint
+
+        A cadeia retoma o estado exato do gerador e as posições gravadas, de
+        modo que continuar por n passos reproduz a mesma cadeia que teria
+        rodado sem interrupção. O checkpoint é atualizado ao final.
+
+        Parameters:
+        -----------
+        checkpoint_path : str
+            Arquivo chain_<k>.json gravado por run_monte_carlo_chains
+        n_steps : int
+            Passos (ou varreduras) adicionais
+        pair_potential : callable, optional
+            Potencial de par, obrigatório apenas se o da cadeia não pôde ser
+            gravado (funções que não vêm de make_pair_potential)
+
+        Returns:
+        --------
+        Dict[str, object]
+            Registro da cadeia: posições finais, histórico de energia dos
+            novos passos, taxa de aceitação e passos totais
+        """
+        with open(checkpoint_path, 'r', encoding='utf-8') as f:
+            checkpoint = json.load(f)
+
+        spec = checkpoint['pair_potential']
+        if pair_potential is None and spec is not None:
+            if spec['function'] is None:
+                raise ValueError("O potencial de par da cadeia não foi gravado; passe pair_potential")
+            pair_potential = partial(_PAIR_POTENTIAL_FUNCTIONS[spec['function']], **spec['keywords'])
+
+        record = _execute_monte_carlo_chain({**checkpoint, 'pair_potential': pair_potential,
+                                             'n_steps': n_steps})
+        record['checkpoint'] = checkpoint_path
+        self._write_chain_checkpoint(checkpoint_path, record,
+                                     spec if spec is not None else _pair_potential_spec(pair_potential))
+        self.logger.info(f"Cadeia {record['chain']} continuada até {record['steps_done']} passos")
+        return record
+
+    def run_parallel_tempering(self, n_replicas: int = 8, n_particles: int = 1000,
+                               temperature: float = 300, max_temperature: float = 3000,
+                               box_size: float = 10.0, n_steps: int = 10000,
+                               exchange_interval: int = 10, step_size: float = 0.1,
+                               seed: Optional[int] = None,
+                               pair_potential: Optional[Callable] = None,
+                               cutoff: float = 2.5, adapt_fraction: float = 0.5,
+                               adapt_window: int = 100, target_acceptance: float = 0.3,
+                               max_workers: Optional[int] = None) -> Dict[str, object]:
+        """
+        Monte Carlo com troca de réplicas (parallel tempering)
+
+        Uma réplica por temperatura, numa escada geométrica entre
+        `temperature` e `max_temperature`. As réplicas fazem
+        `exchange_interval` varreduras de Metropolis em processos de trabalho
+        (ProcessPoolExecutor) e, entre blocos, o processo principal tenta
+        trocar as configurações de temperaturas vizinhas (pares pares e
+        ímpares alternados), aceitando com probabilidade
+        min(1, exp[(β_i - β_j)(E_i - E_j)]). As réplicas quentes atravessam
+        barreiras e passam as configurações para as frias, que sozinhas
+        ficariam presas (a aceitação de Metropolis com k_B em SI é quase nula
+        em baixa temperatura).
+
+        Durante a fração `adapt_fraction` inicial dos blocos, a largura da
+        proposta de cada temperatura é ajustada após cada bloco rumo a
+        `target_acceptance` (AdvancedNumericalMethods.tune_step_size, a mesma
+        regra de adaptive_metropolis; `step_size` é só o valor inicial), e a
+        escada é ajustada sempre que cada par de vizinhos acumula
+        `adapt_window` tentativas de troca, para igualar as taxas
+        (AdvancedNumericalMethods.equalize_temperature_ladder). Depois tudo
+        fica fixo, e as estatísticas de aceitação e as idas e voltas de cada
+        réplica pela escada são contadas só nessa fase de amostragem.
+
+        Escolha da escada: as temperaturas só importam pela razão entre as
+        diferenças de energia e k_B·T. A réplica mais quente deve ter k_B·T_max
+        da ordem das barreiras de energia a atravessar (em J); se k_B·T_max
+        for muito menor que elas, nenhuma réplica atravessa, mesmo com a
+        proposta ajustada (que apenas encolhe). Com o potencial harmônico
+        padrão, em J com posições O(1), isso significa temperaturas da ordem
+        de 1/k_B ≈ 7e22 K, e não de 300 K.
+
+        Parameters:
+        -----------
+        n_replicas : int
+            Número de temperaturas (≥ 2)
+        n_particles, box_size, pair_potential, cutoff
+            Como em run_monte_carlo_simulation (mode='sweep')
+        step_size : float
+            Largura inicial da proposta em todas as temperaturas
+        temperature : float
+            Temperatura mais baixa (a de interesse), em Kelvin
+        max_temperature : float
+            Temperatura mais alta da escada
+        n_steps : int
+            Varreduras por réplica
+        exchange_interval : int
+            Varreduras entre tentativas de troca
+        seed : int, optional
+            Semente da SeedSequence (uma sequência por réplica e uma para as
+            trocas)
+        adapt_fraction : float
+            Fração dos blocos usada para ajustar a escada
+        adapt_window : int
+            Tentativas de troca por par entre ajustes da escada
+        target_acceptance : float
+            Taxa de aceitação de Metropolis alvo no ajuste das propostas
+        max_workers : int, optional
+            Número de processos (padrão: um por réplica, até os.cpu_count())
+
+        Returns:
+        --------
+        Dict[str, object]
+            'temperatures' (escada final), 'energy_history' (energia total em
+            cada temperatura após cada varredura, forma (M, n)),
+            'sampling_start' (primeira varredura com a escada fixa),
+            'final_positions' (por temperatura), 'acceptance_rate' (de
+            Metropolis, por temperatura), 'swap_acceptance' (por par de
+            vizinhos), 'round_trips' (por réplica), 'ladder_history',
+            'step_sizes' (por temperatura), 'effective_sample_size' (da
+            energia na fase de amostragem, por temperatura),
+            'ess_per_cpu_second' (na temperatura mais baixa), 'elapsed_s' e
+            'cpu_s' (tempo de CPU, process_time, dos processos de trabalho
+            mais o do processo principal, que inclui a serialização das
+            posições e as trocas)
+        """
+        if n_replicas < 2:
+            raise ValueError("parallel tempering requer n_replicas ≥ 2")
+
+        start, cpu_start = perf_counter(), process_time()
+        seed_sequence = np.random.SeedSequence(seed)
+        children = seed_sequence.spawn(n_replicas + 1)
+        swap_rng = np.random.Generator(np.random.PCG64(children[-1]))
+
+        temperatures = np.geomspace(temperature, max_temperature, n_replicas)
+        ladder_history = [temperatures.copy()]
+        n_rounds = max(1, n_steps // exchange_interval)
+        adapt_rounds = int(adapt_fraction * n_rounds)
+
+        tasks = []
+        for replica, child in enumerate(children[:-1]):
+            rng = np.random.Generator(np.random.PCG64(child))
+            tasks.append({
+                'chain': replica,
+                'seed_entropy': seed_sequence.entropy,
+                'spawn_key': list(child.spawn_key),
+                'steps_done': 0,
+                'positions': rng.uniform(-box_size/2, box_size/2, (n_particles, 3)),
+                'rng_state': rng.bit_generator.state,
+                'pair_potential': pair_potential,
+                'n_steps': exchange_interval
+            })
+
+        energy_history = np.empty((n_replicas, n_rounds * exchange_interval))
+        replica_at = np.arange(n_replicas)  # réplica em cada temperatura
+        # 0: ainda não passou pela base; 1: passou pela base; 2: base e depois topo
+        trip_stage = np.zeros(n_replicas, dtype=int)
+        round_trips = np.zeros(n_replicas, dtype=int)
+        move_rates = np.zeros(n_replicas)
+        swap_attempts = np.zeros(n_replicas - 1, dtype=int)
+        swap_accepts = np.zeros(n_replicas - 1, dtype=int)
+        window_attempts = np.zeros(n_replicas - 1, dtype=int)
+        window_accepts = np.zeros(n_replicas - 1, dtype=int)
+        step_sizes = np.full(n_replicas, float(step_size))
+        settled = np.zeros(n_replicas, dtype=int)
+        cpu_time = 0.0
+
+        max_workers = min(max_workers or os.cpu_count() or 1, n_replicas)
+        self.logger.info(f"Executando parallel tempering com {n_replicas} réplicas "
+                         f"em {max_workers} processos...")
+
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            for block in range(n_rounds):
+                sampling = block >= adapt_rounds
+                for slot, task in enumerate(tasks):
+                    task['parameters'] = {'temperature': temperatures[slot], 'box_size': box_size,
+                                          'mode': 'sweep', 'step_size': step_sizes[slot],
+                                          'cutoff': cutoff}
+                records = list(executor.map(_execute_monte_carlo_chain, tasks))
+
+                columns = slice(block * exchange_interval, (block + 1) * exchange_interval)
+                for slot, record in enumerate(records):
+                    energy_history[slot, columns] = record['energy_history']
+                    tasks[slot].update(positions=record['final_positions'],
+                                       rng_state=record['rng_state'],
+                                       steps_done=record['steps_done'])
+                    cpu_time += record['cpu_s']
+                    if sampling:
+                        move_rates[slot] += record['acceptance_rate']
+                    else:
+                        step_sizes[slot], settled[slot] = self.numerical_methods.tune_step_size(
+                            step_sizes[slot], record['acceptance_rate'], target_acceptance,
+                            settled[slot]
+                        )
+                energies = energy_history[:, columns.stop - 1]
+
+                # Trocas entre vizinhos: pares (0,1), (2,3), ... e (1,2), (3,4), ... alternados
+                first = block % 2
+                accepted = self.numerical_methods.replica_swaps(energies, temperatures, first,
+                                                                swap_rng)
+                window_attempts[first::2] += 1
+                window_accepts += accepted
+                if sampling:
+                    swap_attempts[first::2] += 1
+                    swap_accepts += accepted
+                for i in np.flatnonzero(accepted):
+                    tasks[i]['positions'], tasks[i + 1]['positions'] = \
+                        tasks[i + 1]['positions'], tasks[i]['positions']
+                    replica_at[[i, i + 1]] = replica_at[[i + 1, i]]
+
+                self.numerical_methods.update_round_trips(trip_stage, round_trips, replica_at,
+                                                          count=sampling)
+
+                if not sampling and window_attempts.min() >= adapt_window:
+                    temperatures = self.numerical_methods.equalize_temperature_ladder(
+                        temperatures, window_accepts / np.maximum(window_attempts, 1)
+                    )
+                    ladder_history.append(temperatures.copy())
+                    window_attempts[:] = 0
+                    window_accepts[:] = 0
+
+        cpu_time += process_time() - cpu_start
+        sampling_rounds = n_rounds - adapt_rounds
+        swap_acceptance = swap_accepts / np.maximum(swap_attempts, 1)
+        sampled = energy_history[:, adapt_rounds * exchange_interval:]
+        ess = np.array([sampled.shape[1] / self.numerical_methods.integrated_autocorrelation_time(row)
+                        for row in sampled])
+        self.logger.info(f"Parallel tempering concluído: taxas de troca "
+                         f"{np.round(swap_acceptance, 2).tolist()}, "
+                         f"{round_trips.sum()} idas e voltas")
+
+        return {
+            'temperatures': temperatures,
+            'ladder_history': ladder_history,
+            'energy_history': energy_history,
+            'sampling_start': adapt_rounds * exchange_interval,
+            'final_positions': [task['positions'] for task in tasks],
+            'acceptance_rate': move_rates / max(sampling_rounds, 1),
+            'swap_acceptance': swap_acceptance,
+            'swap_attempts': swap_attempts,
+            'round_trips': round_trips,
+            'replica_at_temperature': replica_at,
+            'step_sizes': step_sizes,
+            'effective_sample_size': ess,
+            'ess_per_cpu_second': ess[0] / max(cpu_time, 1e-12),
+            'elapsed_s': perf_counter() - start,
+            'cpu_s': cpu_time,
+            'seed_entropy': seed_sequence.entropy,
+            'box_size': box_size
+        }
+
+    @staticmethod
+    def _write_chain_checkpoint(path: str, record: Dict[str, object],
+                                pair_spec: Optional[Dict[str, object]]) -> None:
+        """Grava o estado de uma cadeia (substituição atômica do arquivo)"""
+        checkpoint = {key: record[key] for key in ('chain', 'seed_entropy', 'spawn_key',
+                                                    'steps_done', 'rng_state', 'parameters')}
+        checkpoint['positions'] = record['final_positions']
+        checkpoint['pair_potential'] = pair_spec
+        temporary = f"{path}.tmp"
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump(checkpoint, f, default=_json_default)
+        os.replace(temporary, path)
+
+    def make_pair_potential(self, kind: str = 'lennard_jones', time: Optional[float] = None,
+                            epsilon: float = 1.380649e-23 * 120.0, sigma: float = 1.0,
+                            screening_length: float = 1.0, charge_product: float = 1.0,
+                            mass: Optional[float] = None,
+                            length_unit: float = 1e-9) -> Callable[[np.ndarray], np.ndarray]:
+        """
+        Potencial de par φ(r) para run_monte_carlo_simulation
+
+        - 'lennard_jones': 4ε[(σ/r)¹² - (σ/r)⁶]
+        - 'screened_coulomb': q₁q₂ α ħc e^(-r/λ) / r
+        - 'screened_gravity': -G m² e^(-r/λ) / r
+
+        Com `time`, α e G vêm das constantes dinâmicas nesse instante
+        (get_dynamic_constant); sem ele, dos valores de referência.
+
+        Parameters:
+        -----------
+        kind : str
+            Tipo de potencial
+        time : float, optional
+            Tempo adimensional das constantes dinâmicas
+        epsilon, sigma : float
+            Profundidade (J) e diâmetro (unidades da caixa) de Lennard-Jones
+        screening_length : float
+            Comprimento de blindagem λ (unidades da caixa)
+        charge_product : float
+            Produto das cargas em unidades da carga elementar
+        mass : float, optional
+            Massa das partículas (padrão: massa do próton)
+        length_unit : float
+            Metros por unidade de comprimento da caixa
+
+        Returns:
+        --------
+        Callable
+            φ(r) vetorizada, com r em unidades da caixa e energia em J
+            (serializável, pode ir para processos de trabalho)
+        """
+        def constant(name):
+            base = getattr(self.constants, name)
+            return base if time is None else self.get_dynamic_constant(base, time, name)
+
+        if kind == 'lennard_jones':
+            return partial(_lennard_jones_pair, epsilon=epsilon, sigma=sigma)
+        if kind == 'screened_coulomb':
+            strength = charge_product * constant('alpha') * self.constants.hbar * self.constants.c
+        elif kind == 'screened_gravity':
+            strength = -constant('G') * (mass or self.constants.m_p)**2
+        else:
+            raise ValueError(f"Potencial de par desconhecido: {kind}")
+        return partial(_screened_pair, strength=strength, screening_length=screening_length,
+                       length_unit=length_unit)
+
+    def ensemble_cosmology_equations(self, t: float, Y: np.ndarray,
+                                     intensities: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Equações cosmológicas estabilizadas para um ensemble de estados
+
+        Mesmas fórmulas de stable_cosmology_equations, avaliadas de uma vez
+        para todos os membros. As funções do tempo são calculadas uma única vez
+        por chamada; apenas as operações sobre o estado são vetorizadas.
+
+        Parameters:
+        -----------
+        t : float
+            Tempo adimensional
+        Y : np.ndarray
+            Estados de forma (4, N) ou (4, N, k), linhas [a, ȧ, ρ, T]
+        intensities : np.ndarray, optional
+            Intensidades por membro, forma (4, N), na ordem de
+            DYNAMIC_CONSTANT_NAMES. Se None, todos usam as intensidades do
+            sistema (e as tabelas de coeficientes, se ativas)
+
+        Returns:
+        --------
+        np.ndarray
+            Derivadas com a forma de `Y`
+        """
+        epsilon = self.config.epsilon
+        a_dot = Y[1]
+
+        # Regularização
+        a = np.maximum(Y[0], epsilon)
+        rho = np.maximum(Y[2], epsilon)
+        T = np.maximum(Y[3], epsilon)
+
+        # Constantes dinâmicas (por membro, se houver intensidades próprias)
+        if intensities is None:
+            G, c, h, _, compression = self.evaluate_time_coefficients(t)
+        else:
+            variation = self._dynamic_variation(
+                t, intensities, self._constant_oscillation_freqs[:, np.newaxis]
+            )
+            G, c, h, _ = self._constant_base_values[:, np.newaxis] * (1 + variation)
+            if Y.ndim == 3:
+                G, c, h = G[:, np.newaxis], c[:, np.newaxis], h[:, np.newaxis]
+            if self._coefficient_table is not None:
+                compression = self._coefficient_table.evaluate(t)[4]
+            else:
+                compression = self.tardis_compression_model(t)
+
+        # Parâmetro de Hubble regularizado e compressão TARDIS
+        H = np.clip(a_dot / a, -1e4, 1e4)
+        tardis_factor = 1.0 / np.sqrt(compression + epsilon)
+
+        dYdt = np.empty(np.broadcast(Y, h).shape)
+        dYdt[0] = a_dot
+
+        rho_effective = rho * (1 + 3 * 0.33)
+        acceleration = -4 * np.pi * G * a * rho_effective / (3 * c**2)
+        dYdt[1] = np.clip(acceleration, -1e4, 1e4) * tardis_factor
+
+        expansion_dilution = -3 * H * rho * (1 + 0.33)
+        quantum_cooling = -rho * h / (1e-20 + t) * np.exp(-t / 1e6)
+        quantum_cooling = np.clip(quantum_cooling, -rho * 0.1, 0)
+        dYdt[2] = np.clip(expansion_dilution + quantum_cooling, -rho * 20, rho * 20)
+
+        # T > 0 sempre após a regularização (epsilon > 0)
+        quantum_temp_correction = np.clip(1 + h / (1.38e-23 * T * (1 + t/1e3)), 0.5, 2.0)
+        dYdt[3] = np.clip(-H * T * quantum_temp_correction, -T * 20, T * 20)
+
+        return dYdt
+
+    def _ensemble_intensities(self, intensities, n_members: int) -> np.ndarray:
+        """
+        Normaliza as intensidades do ensemble para a forma (4, N)
+
+        Aceita None (intensidades do sistema), um dicionário compartilhado, uma
+        sequência de N dicionários (chaves ausentes usam o valor do sistema)
+        ou um array (N, 4) na ordem de DYNAMIC_CONSTANT_NAMES.
+        """
+        if intensities is None:
+            intensities = [{}] * n_members
+        elif isinstance(intensities, dict):
+            intensities = [intensities] * n_members
+
+        if len(intensities) and isinstance(intensities[0], dict):
+            unknown = set().union(*intensities) - set(DYNAMIC_CONSTANT_NAMES)
+            if unknown:
+                raise ValueError(f"Constantes desconhecidas nas intensidades: {sorted(unknown)}")
+            intensities = [
+                [member.get(name, default) for name, default
+                 in zip(DYNAMIC_CONSTANT_NAMES, self._constant_intensities)]
+                for member in intensities
+            ]
+
+        intensities = np.asarray(intensities, dtype=float)
+        if intensities.shape != (n_members, 4):
+            raise ValueError(f"Intensidades com forma {intensities.shape}; "
+                             f"esperado ({n_members}, 4)")
+        return intensities
+
+    def run_ensemble(self, initial_conditions, intensities=None,
+                     t_eval: Optional[np.ndarray] = None,
+                     method: Optional[str] = None) -> EnsembleResults:
+        """
+        Integra N condições iniciais (e conjuntos de intensidades) como um único sistema
+
+        O estado do ensemble é empilhado num único vetor de 4N componentes e
+        avaliado por ensemble_cosmology_equations, de modo que o custo Python
+        de cada avaliação do lado direito é pago uma vez por passo, não N
+        vezes. Não gera gráficos nem arquivos.
+
+        Todos os membros compartilham a malha de passos; o controle de erro
+        de solve_ivp usa a norma RMS sobre as 4N componentes, portanto o erro
+        de um membro individual pode exceder rtol/atol por até um fator √N.
+        Para os métodos implícitos o Jacobiano é bloco-diagonal (blocos 4x4):
+        Radau/BDF recebem `jac_sparsity` com avaliação vetorizada e LSODA
+        usa o modo de banda.
+
+        Parameters:
+        -----------
+        initial_conditions : array_like
+            Estados iniciais de forma (N, 4): [a0, ȧ0, ρ0, T0] por membro
+        intensities : dict, sequência de dict ou array_like, optional
+            Intensidades das constantes dinâmicas por membro
+            (ver _ensemble_intensities). Se None, usa as do sistema
+        t_eval : np.ndarray, optional
+            Tempos de saída. Se None, `config.n_points` pontos uniformes em
+            `config.time_range`
+        method : str, optional
+            Integrador do solve_ivp. Se None, usa `config.solver_method`; com
+            'auto' a sonda de rigidez é executada no primeiro membro
+
+        Returns:
+        --------
+        EnsembleResults
+            Trajetórias de forma (N, 4, T) e estatísticas da integração
+        """
+        y0 = np.array(initial_conditions, dtype=float)
+        if y0.ndim != 2 or y0.shape[1] != 4:
+            raise ValueError(f"Condições iniciais com forma {y0.shape}; esperado (N, 4)")
+        n_members = y0.shape[0]
+
+        member_intensities = self._ensemble_intensities(intensities, n_members)
+        shared = np.array_equal(member_intensities,
+                                np.broadcast_to(self._constant_intensities, (n_members, 4)))
+        rhs_intensities = None if shared else np.ascontiguousarray(member_intensities.T)
+
+        t_span = self.config.time_range
+        if t_eval is None:
+            t_eval = np.linspace(t_span[0], t_span[1], self.config.n_points)
+
+        # Vetor do solver ordenado por membro ([a, ȧ, ρ, T] de cada um), para
+        # que o Jacobiano seja bloco-diagonal com banda 3
+        def ensemble_rhs(t: float, y: np.ndarray) -> np.ndarray:
+            Y = np.moveaxis(y.reshape((n_members, 4) + y.shape[1:]), 1, 0)
+            dYdt = self.ensemble_cosmology_equations(t, Y, rhs_intensities)
+            return np.moveaxis(dYdt, 0, 1).reshape(y.shape)
+
+        method = method or self.config.solver_method
+        selection = None
+        if method == 'auto':
+            # Sonda de rigidez no primeiro membro
+            if shared:
+                probe_rhs = self.stable_cosmology_equations
+            else:
+                def probe_rhs(t: float, y: np.ndarray) -> np.ndarray:
+                    return self.ensemble_cosmology_equations(
+                        t, y[:, np.newaxis], rhs_intensities[:, :1]
+                    )[:, 0]
+            method, selection = self.select_solver_method(probe_rhs, t_span, y0[0])
+
+        if method == 'LSODA':
+            implicit_options = {'lband': 3, 'uband': 3}
+        else:
+            implicit_options = {
+                'jac_sparsity': sparse.block_diag([np.ones((4, 4))] * n_members, format='csc'),
+                'vectorized': True
+            }
+
+        self.logger.info(f"Integrando ensemble de {n_members} membros com {method}...")
+        sol = self._integrate_cosmology(ensemble_rhs, t_span, y0.ravel(), t_eval,
+                                        method=method, implicit_options=implicit_options,
+                                        selection=selection)
+        self.flush_compression_diagnostics()
+
+        if not sol.success:
+            self.logger.warning(f"Integração do ensemble não convergiu: {sol.message}")
+
+        metrics = self._integration_metrics(sol)
+        metrics.update({
+            'success': bool(sol.success),
+            'message': sol.message,
+            'n_members': n_members,
+            'shared_intensities': shared
+        })
+
+        return EnsembleResults(
+            time_array=sol.t,
+            trajectories=sol.y.reshape(n_members, 4, -1),
+            initial_conditions=y0,
+            intensities=member_intensities,
+            convergence_metrics=metrics
+        )
+
+    def simulate(self, initial_conditions=None, timestamp: Optional[str] = None
+                 ) -> Tuple[Optional[SimulationResults], Dict[str, bool], OptimizeResult]:
+        """
+        Núcleo da simulação cosmológica: integração, histórico e validação
+
+        Não imprime, não gera gráficos e não grava arquivos; é usado por
+        run_complete_simulation e pelas varreduras de parâmetros
+        (ParameterSweep).
+
+        Parameters:
+        -----------
+        initial_conditions : array_like, optional
+            Estado inicial [a, ȧ, ρ, T]. Se None, usa DEFAULT_INITIAL_CONDITIONS
+        timestamp : str, optional
+            Identificador gravado nos resultados. Se None, usa a hora atual
+
+        Returns:
+        --------
+        Tuple[Optional[SimulationResults], Dict[str, bool], OptimizeResult]
+            Resultados (None se a integração falhou), status de cada validação
+            e a solução do integrador
+        """
+        timestamp = timestamp or datetime.now().strftime("%Y%m%d_%H%M%S")
+        if initial_conditions is None:
+            initial_conditions = list(DEFAULT_INITIAL_CONDITIONS)
+
+        t_span = self.config.time_range
+        t_eval = np.linspace(t_span[0], t_span[1], self.config.n_points)
+
+        if self.config.use_coefficient_cache:
+            self.logger.info("Preparando tabelas de coeficientes dependentes do tempo...")
+            self.build_coefficient_table()
+
+        # Método principal: SciPy (DOP853 por padrão, integração única ou por segmentos)
+        self.logger.info(f"Executando integração principal com {self.config.solver_method}...")
+        sol = self._integrate_cosmology(self.get_rhs(), t_span, initial_conditions, t_eval)
+        integration_metrics = self._integration_metrics(sol)
+
+        if not sol.success:
+            self.flush_compression_diagnostics()
+            return None, {}, sol
+
+        times = sol.t
+        self.logger.info(f"Integração concluída. Pontos: {len(times)}")
+        self.flush_compression_diagnostics()
+
+        # Calcular constantes dinâmicas ao longo do tempo
+        self.logger.info("Calculando constantes físicas dinâmicas...")
+        time_coefficients = self.evaluate_time_coefficients(times)
+        constants_history = dict(zip(DYNAMIC_CONSTANT_NAMES, time_coefficients[:4]))
+
+        # Calcular compressão TARDIS
+        self.logger.info("Calculando compressão quântica TARDIS...")
+        tardis_compression = time_coefficients[4]
+
+        # Executar validação rigorosa
+        self.logger.info("Executando validação dos resultados...")
+        results = SimulationResults(
+            timestamp=timestamp,
+            constants_history=constants_history,
+            tardis_compression=tardis_compression,
+            time_array=times,
+            convergence_metrics={'convergence_rate': 0.998, **integration_metrics},
+            validation_results={}
+        )
+        validation_results = self.validate_simulation_results(results)
+
+        return results, validation_results, sol
+
     def run_complete_simulation(self) -> dict:
         """
         Executa simulação completa aprimorada V3.0
@@ -756,37 +4707,16 @@ class PhysicsTestSystemV3:
         self.logger.info(f"Iniciando simulação completa - Timestamp: {timestamp}")
 
         try:
-            # Configurar condições iniciais otimizadas
-            initial_conditions = [
-                1e-8,    # Fator de escala inicial (a)
-                1e3,     # Taxa de expansão inicial (ȧ)
-                1e25,    # Densidade de energia inicial (ρ)
-                1e12     # Temperatura inicial (T)
-            ]
-
             t_span = self.config.time_range
-            t_eval = np.linspace(t_span[0], t_span[1], self.config.n_points)
 
             print(f"Simulando de t={t_span[0]} até t={t_span[1]:.0e} unidades de Planck")
             print(f"Pontos de avaliação: {self.config.n_points}")
             print("Integrando equações de gravitação quântica modificadas...")
             print("Métodos: SciPy DOP853 + validação múltipla")
 
-            # Método principal: SciPy solve_ivp com DOP853
-            self.logger.info("Executando integração principal com DOP853...")
-            sol = solve_ivp(
-                self.stable_cosmology_equations,
-                t_span,
-                initial_conditions,
-                method='DOP853',
-                t_eval=t_eval,
-                rtol=self.config.rtol,
-                atol=self.config.atol,
-                max_step=1e4,
-                first_step=1e-2
-            )
-        
-            if not sol.success:
+            temp_results, validation_results, sol = self.simulate(timestamp=timestamp)
+
+            if temp_results is None:
                 self.logger.error("Falha na integração principal")
                 return {
                     'simulation_success': False,
@@ -794,57 +4724,9 @@ class PhysicsTestSystemV3:
                     'timestamp': timestamp
                 }
 
-            # Extrair resultados
-            times = sol.t
-            scale_factors = sol.y[0]
-            expansion_rates = sol.y[1] 
-            energy_densities = sol.y[2]
-            temperatures = sol.y[3]
-            
-            self.logger.info(f"Integração concluída. Pontos: {len(times)}")
-            
-            # Calcular constantes dinâmicas ao longo do tempo
-            self.logger.info("Calculando constantes físicas dinâmicas...")
-            constants_history = {}
-            for const_name in ['G', 'c', 'h', 'alpha']:
-                base_value = getattr(self.constants, const_name)
-                constants_history[const_name] = np.array([
-                    self.get_dynamic_constant(base_value, t, const_name) for t in times
-                ])
-            
-            # Calcular compressão TARDIS
-            self.logger.info("Calculando compressão quântica TARDIS...")
-            tardis_compression = np.array([
-                self.tardis_compression_model(t) for t in times
-            ])
-
-            # Criar objeto de resultados estruturado
-            results = SimulationResults(
-                timestamp=timestamp,
-                constants_history=constants_history,
-                tardis_compression=tardis_compression,
-                time_array=times,
-                convergence_metrics={
-                    'total_points': len(times),
-                    'time_span': t_span,
-                    'method': 'DOP853'
-                },
-                validation_results={}
-            )
-
-            # Executar validação rigorosa
-            self.logger.info("Executando validação dos resultados...")
-            # Criar objeto SimulationResults temporário para validação
-            temp_results = SimulationResults(
-                timestamp=timestamp,
-                constants_history=constants_history,
-                tardis_compression=tardis_compression,
-                time_array=times,
-                convergence_metrics={'convergence_rate': 0.998, 'method': 'DOP853'},
-                validation_results={}
-            )
-
-            validation_results = self.validate_simulation_results(temp_results)
+            times = temp_results.time_array
+            constants_history = temp_results.constants_history
+            tardis_compression = temp_results.tardis_compression
 
             # Calcular taxa de convergência
             convergence_rate = temp_results.convergence_metrics['convergence_rate']
@@ -909,6 +4791,73 @@ class PhysicsTestSystemV3:
                 'timestamp': timestamp if 'timestamp' in locals() else datetime.now().strftime("%Y%m%d_%H%M%S")
             }
 
+    def _integrate_cosmology(self, rhs: Callable, t_span: Tuple[float, float],
+                             initial_conditions, t_eval: np.ndarray,
+                             method: Optional[str] = None,
+                             implicit_options: Optional[Dict[str, object]] = None,
+                             selection: Optional[Dict[str, object]] = None) -> OptimizeResult:
+        """
+        Integração principal das equações cosmológicas
+
+        Usa `method` (padrão `config.solver_method`, com a sonda de rigidez se
+        'auto') e `config.integration_mode`. Métodos implícitos recebem
+        `implicit_options` (padrão: o Jacobiano analítico de um único estado).
+        """
+        method = method or self.config.solver_method
+        if method == 'auto':
+            method, selection = self.select_solver_method(rhs, t_span, initial_conditions)
+        if method not in IVP_METHODS:
+            raise ValueError(f"Integrador desconhecido: {method}")
+
+        options = {'rtol': self.config.rtol, 'atol': self.config.atol, 'max_step': 1e4}
+        if method in ('Radau', 'BDF', 'LSODA'):
+            if implicit_options is None:
+                implicit_options = {'jac': self.cosmology_jacobian}
+            options.update(implicit_options)
+
+        if self.config.integration_mode == 'segmented':
+            sol = self.numerical_methods.segmented_solve_ivp(
+                rhs, t_span, initial_conditions, t_eval=t_eval, method=method, **options
+            )
+            for seg in sol.segments:
+                self.logger.info(
+                    f"Segmento [{seg['t_start']:.0e}, {seg['t_end']:.0e}]: "
+                    f"{seg['n_accepted']} passos aceitos, {seg['n_rejected']} rejeitados, "
+                    f"nfev={seg['nfev']}"
+                )
+        elif self.config.integration_mode == 'single':
+            sol = solve_ivp(
+                rhs,
+                t_span,
+                initial_conditions,
+                method=method,
+                t_eval=t_eval,
+                first_step=1e-2,
+                **options
+            )
+        else:
+            raise ValueError(f"Modo de integração desconhecido: {self.config.integration_mode}")
+
+        sol['solver_method'] = method
+        sol['solver_selection'] = selection
+        return sol
+
+    def _integration_metrics(self, sol) -> Dict[str, object]:
+        """Estatísticas da integração para `convergence_metrics`"""
+        metrics = {
+            'method': sol.solver_method,
+            'integration_mode': self.config.integration_mode,
+            'nfev': int(sol.nfev),
+            'njev': int(sol.njev),
+            'nlu': int(sol.nlu)
+        }
+        if sol.solver_selection is not None:
+            metrics['solver_selection'] = sol.solver_selection
+        if 'segments' in sol:
+            metrics['segments'] = sol.segments
+            metrics['n_rejected'] = sum(seg['n_rejected'] or 0 for seg in sol.segments)
+        return metrics
+
     def _calculate_final_metrics(self, results: SimulationResults) -> Dict[str, str]:
         """Calcula métricas finais das hipóteses para relatório"""
         metrics = {}
@@ -1507,6 +5456,432 @@ class PhysicsTestSystemV3:
         else:
             print("🔧 Ambas requerem refinamento adicional")
 
+def _json_default(obj):
+    """Conversão de tipos NumPy para json.dump"""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"Objeto do tipo {type(obj).__name__} não é serializável em JSON")
+
+def _pair_potential_spec(pair_potential: Optional[Callable]) -> Optional[Dict[str, object]]:
+    """Descrição serializável em JSON de um potencial de make_pair_potential"""
+    if pair_potential is None:
+        return None
+    if isinstance(pair_potential, partial) and pair_potential.func in _PAIR_POTENTIAL_FUNCTIONS.values():
+        return {'function': pair_potential.func.__name__, 'keywords': pair_potential.keywords}
+    return {'function': None}
+
+def _execute_monte_carlo_chain(task: Dict[str, object]) -> Dict[str, object]:
+    """
+    Executa (ou continua) uma cadeia Monte Carlo num processo de trabalho
+
+    O gerador é reconstruído a partir do estado gravado na tarefa, e as
+    posições e o estado finais voltam no registro para que a cadeia possa
+    ser continuada depois.
+    """
+    start, cpu_start = perf_counter(), process_time()
+    rng = np.random.Generator(np.random.PCG64())
+    rng.bit_generator.state = task['rng_state']
+    positions = np.array(task['positions'], dtype=float)
+
+    positions, energies, acceptance_rate = AdvancedNumericalMethods.metropolis_chain(
+        positions, _harmonic_potential, n_steps=task['n_steps'], rng=rng,
+        pair_potential=task['pair_potential'], **task['parameters']
+    )
+
+    return {
+        'chain': task['chain'],
+        'seed_entropy': task['seed_entropy'],
+        'spawn_key': task['spawn_key'],
+        'steps_done': task['steps_done'] + task['n_steps'],
+        'rng_state': rng.bit_generator.state,
+        'parameters': task['parameters'],
+        'final_positions': positions,
+        'energy_history': energies,
+        'acceptance_rate': acceptance_rate,
+        'worker_pid': os.getpid(),
+        'elapsed_s': perf_counter() - start,
+        'cpu_s': process_time() - cpu_start
+    }
+
+def _execute_sweep_run(task: Dict[str, object]) -> Dict[str, object]:
+    """
+    Executa uma simulação da varredura num processo de trabalho
+
+    Sem impressão, gráficos ou arquivos: devolve apenas o registro compacto
+    que ParameterSweep grava no armazenamento agregado.
+    """
+    start = perf_counter()
+    logging.getLogger(PhysicsTestSystemV3.__name__).setLevel(task['log_level'])
+
+    system = PhysicsTestSystemV3(SimulationConfig(**task['config']))
+    if task['intensities']:
+        system.set_constant_intensities(task['intensities'])
+
+    results, validation_results, sol = system.simulate(task['initial_conditions'],
+                                                       timestamp=task['run_id'])
+
+    record = {
+        'run_id': task['run_id'],
+        'index': task['index'],
+        'attempts': task['attempt'] + 1,
+        'overrides': task['overrides'],
+        'success': results is not None,
+        'message': sol.message,
+        'validation_results': validation_results,
+        'convergence_metrics': (results.convergence_metrics if results is not None
+                                else system._integration_metrics(sol)),
+        'final_state': sol.y[:, -1].tolist() if sol.y.size else None,
+        'final_compression': (float(results.tardis_compression[-1])
+                              if results is not None else None),
+        'worker_pid': os.getpid(),
+        'elapsed_s': perf_counter() - start
+    }
+    if task['store_trajectories'] and results is not None:
+        record['trajectories'] = {'t': sol.t.tolist(), 'y': sol.y.tolist()}
+    return record
+
+class ParameterSweep:
+    """
+    Varredura de parâmetros da cosmologia em paralelo (ProcessPoolExecutor)
+
+    Cada execução é um dicionário de sobrescritas: campos de SimulationConfig
+    (max_variation, rtol, atol, time_range, ...), 'intensities' (intensidade
+    por constante, ver PhysicsTestSystemV3.set_constant_intensities) e
+    'initial_conditions' ([a, ȧ, ρ, T]). As execuções rodam sem gráficos e
+    cada registro concluído é gravado imediatamente numa linha de um único
+    arquivo JSON Lines.
+
+    A memória é limitada: as execuções são consumidas sob demanda do iterável
+    (que pode ser um gerador, como o de grid), no máximo `max_pending`
+    ficam em andamento e o processo principal mantém apenas contadores
+    agregados. Execuções que levantam exceção ou perdem o processo de
+    trabalho são repetidas até `max_retries` vezes; integrações que não
+    convergem são registradas como falhas, sem repetição. Quando um processo
+    de trabalho morre, as execuções que estavam em andamento são reexecutadas
+    uma de cada vez, e só a que derruba o processo sozinha gasta tentativas.
+
+    Os identificadores de execução combinam data/hora, um sufixo aleatório da
+    varredura e o índice da execução, e não colidem mesmo quando várias
+    execuções ou varreduras começam no mesmo segundo.
+    """
+
+    CONFIG_FIELDS = frozenset(f.name for f in fields(SimulationConfig))
+    RUN_KEYS = CONFIG_FIELDS | {'intensities', 'initial_conditions'}
+
+    def __init__(self, runs: Iterable[Dict[str, object]],
+                 base_config: Optional[Dict[str, object]] = None,
+                 store_path: Optional[str] = None,
+                 max_workers: Optional[int] = None,
+                 max_pending: Optional[int] = None,
+                 max_retries: int = 2,
+                 max_tasks_per_child: Optional[int] = None,
+                 store_trajectories: bool = False,
+                 worker_log_level: int = logging.WARNING):
+        """
+        Parameters:
+        -----------
+        runs : Iterable[Dict[str, object]]
+            Sobrescritas de cada execução (ver ParameterSweep.grid)
+        base_config : Dict[str, object], optional
+            Sobrescritas comuns a todas as execuções
+        store_path : str, optional
+            Arquivo JSON Lines de saída. Se None, usa
+            resultados/sweep_<sweep_id>.jsonl
+        max_workers : int, optional
+            Número de processos (padrão do ProcessPoolExecutor)
+        max_pending : int, optional
+            Máximo de execuções em andamento (padrão: 2 por processo)
+        max_retries : int
+            Repetições de uma execução que falhou com exceção
+        max_tasks_per_child : int, optional
+            Reinicia cada processo após este número de execuções (requer
+            Python 3.11+)
+        store_trajectories : bool
+            Gravar também t e y da integração em cada registro
+        worker_log_level : int
+            Nível de log do sistema nos processos de trabalho
+        """
+        self.runs = runs
+        self.base_config = dict(base_config or {})
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending or 2 * self.max_workers
+        self.max_retries = max_retries
+        self.max_tasks_per_child = max_tasks_per_child
+        self.store_trajectories = store_trajectories
+        self.worker_log_level = worker_log_level
+
+        self.sweep_id = f"{datetime.now():%Y%m%d_%H%M%S}_{uuid.uuid4().hex[:8]}"
+        self.store_path = store_path or os.path.join('resultados', f"sweep_{self.sweep_id}.jsonl")
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self._check_overrides(self.base_config)
+        if max_tasks_per_child is not None and sys.version_info < (3, 11):
+            raise ValueError("max_tasks_per_child requer Python 3.11 ou superior "
+                             "(ProcessPoolExecutor)")
+
+    @staticmethod
+    def grid(**axes: Iterable[object]) -> Iterator[Dict[str, object]]:
+        """
+        Produto cartesiano de eixos de sobrescritas
+
+        Exemplo: grid(max_variation=[0.1, 0.3], rtol=[1e-8, 1e-10]) gera as
+        quatro combinações, sob demanda.
+        """
+        names = list(axes)
+        for values in product(*(axes[name] for name in names)):
+            yield dict(zip(names, values))
+
+    def _check_overrides(self, overrides: Dict[str, object]) -> None:
+        unknown = set(overrides) - self.RUN_KEYS
+        if unknown:
+            raise ValueError(f"Sobrescritas desconhecidas: {sorted(unknown)}")
+        unknown = set(overrides.get('intensities') or {}) - set(DYNAMIC_CONSTANT_NAMES)
+        if unknown:
+            raise ValueError(f"Constantes desconhecidas nas intensidades: {sorted(unknown)}")
+
+    def _make_task(self, index: int, overrides: Dict[str, object]) -> Dict[str, object]:
+        """Tarefa serializável de uma execução (sobrescritas já combinadas)"""
+        self._check_overrides(overrides)
+        merged = {**self.base_config, **overrides}
+
+        config = {k: v for k, v in merged.items() if k in self.CONFIG_FIELDS}
+        if 'time_range' in config:
+            config['time_range'] = tuple(float(v) for v in config['time_range'])
+
+        intensities = {**(self.base_config.get('intensities') or {}),
+                       **(overrides.get('intensities') or {})}
+        initial_conditions = merged.get('initial_conditions')
+
+        return {
+            'run_id': f"{self.sweep_id}_{index:05d}",
+            'index': index,
+            'attempt': 0,
+            'overrides': overrides,
+            'config': config,
+            'intensities': intensities,
+            'initial_conditions': (None if initial_conditions is None
+                                   else [float(v) for v in initial_conditions]),
+            'store_trajectories': self.store_trajectories,
+            'log_level': self.worker_log_level
+        }
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        if self.max_tasks_per_child is None:
+            return ProcessPoolExecutor(max_workers=self.max_workers)
+        return ProcessPoolExecutor(max_workers=self.max_workers,
+                                   max_tasks_per_child=self.max_tasks_per_child)
+
+    @staticmethod
+    def _shutdown(executor: ProcessPoolExecutor, wait: bool, pending: Iterable = ()) -> None:
+        """Encerra o pool cancelando o que não começou (cancel_futures requer Python 3.9+)"""
+        if sys.version_info >= (3, 9):
+            executor.shutdown(wait=wait, cancel_futures=True)
+            return
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=wait)
+
+    @staticmethod
+    def new_summary() -> Dict[str, object]:
+        """Contadores agregados vazios (ver update_summary)"""
+        return {
+            'total_runs': 0,
+            'successful_runs': 0,
+            'failed_integrations': 0,
+            'failed_runs': 0,
+            'retries': 0,
+            'all_valid_runs': 0,
+            'validation': {},
+            'total_nfev': 0,
+            'elapsed_s': 0.0
+        }
+
+    @staticmethod
+    def update_summary(summary: Dict[str, object], record: Dict[str, object]) -> None:
+        """Acumula um registro da varredura nos contadores agregados"""
+        summary['total_runs'] += 1
+        summary['retries'] += record.get('attempts', 1) - 1
+
+        if 'error' in record:
+            summary['failed_runs'] += 1
+            return
+        if not record['success']:
+            summary['failed_integrations'] += 1
+            return
+
+        summary['successful_runs'] += 1
+        summary['total_nfev'] += record['convergence_metrics'].get('nfev', 0)
+        summary['elapsed_s'] += record['elapsed_s']
+
+        validation = record['validation_results']
+        if validation and all(validation.values()):
+            summary['all_valid_runs'] += 1
+        for criterion, passed in validation.items():
+            counts = summary['validation'].setdefault(criterion, {'passed': 0, 'failed': 0})
+            counts['passed' if passed else 'failed'] += 1
+
+    @staticmethod
+    def load_store(store_path: str) -> Iterator[Dict[str, object]]:
+        """Lê os registros de uma varredura, um por vez"""
+        with open(store_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    @classmethod
+    def summarize_store(cls, store_path: str) -> Dict[str, object]:
+        """Recalcula o resumo de uma varredura a partir do arquivo gravado"""
+        summary = cls.new_summary()
+        for record in cls.load_store(store_path):
+            cls.update_summary(summary, record)
+        return summary
+
+    @staticmethod
+    def format_summary(summary: Dict[str, object]) -> str:
+        """Tabela de texto com os resultados de validação da varredura"""
+        lines = [
+            f"Execuções: {summary['total_runs']} | Sucesso: {summary['successful_runs']} | "
+            f"Integração falhou: {summary['failed_integrations']} | "
+            f"Erro: {summary['failed_runs']} | Repetições: {summary['retries']}",
+            f"Todas as validações aprovadas: {summary['all_valid_runs']}/{summary['successful_runs']}",
+            "",
+            f"{'Critério':<24}{'Aprovadas':>11}{'Reprovadas':>12}{'Taxa':>9}",
+            "-" * 56
+        ]
+        for criterion, counts in summary['validation'].items():
+            total = counts['passed'] + counts['failed']
+            lines.append(f"{criterion:<24}{counts['passed']:>11}{counts['failed']:>12}"
+                         f"{counts['passed'] / total:>9.1%}")
+        return "\n".join(lines)
+
+    def _record_failure(self, task: Dict[str, object], error: BaseException,
+                        retry_queue: deque, store, summary: Dict[str, object]) -> None:
+        """Reagenda uma execução que falhou ou grava a falha definitiva"""
+        if task['attempt'] < self.max_retries:
+            task['attempt'] += 1
+            self.logger.warning(f"Execução {task['run_id']} falhou ({error!r}); "
+                                f"repetindo ({task['attempt']}/{self.max_retries})")
+            retry_queue.append(task)
+            return
+
+        self.logger.error(f"Execução {task['run_id']} descartada após "
+                          f"{task['attempt'] + 1} tentativas: {error!r}")
+        self._write(store, summary, {
+            'run_id': task['run_id'],
+            'index': task['index'],
+            'attempts': task['attempt'] + 1,
+            'overrides': task['overrides'],
+            'success': False,
+            'error': repr(error)
+        })
+
+    def _collect(self, future, task: Dict[str, object], retry_queue: deque, suspects: deque,
+                 store, summary: Dict[str, object], alone: bool) -> bool:
+        """
+        Grava o resultado de uma execução concluída; True se o pool foi interrompido
+
+        Quando o pool é interrompido, todas as execuções em andamento falham
+        juntas. Só uma execução que rodava sozinha (`alone`) é responsável e
+        gasta uma tentativa; as demais vão para `suspects`, sem custo, e são
+        reexecutadas uma de cada vez para encontrar a culpada.
+        """
+        try:
+            record = future.result()
+        except BrokenProcessPool as e:
+            if alone:
+                self._record_failure(task, e, suspects, store, summary)
+            else:
+                suspects.append(task)
+            return True
+        except Exception as e:
+            self._record_failure(task, e, retry_queue, store, summary)
+        else:
+            record['attempts'] = task['attempt'] + 1
+            self._write(store, summary, record)
+        return False
+
+    def _write(self, store, summary: Dict[str, object], record: Dict[str, object]) -> None:
+        store.write(json.dumps(record, default=_json_default, ensure_ascii=False) + "\n")
+        store.flush()
+        self.update_summary(summary, record)
+
+    def run(self) -> Dict[str, object]:
+        """
+        Executa a varredura
+
+        Returns:
+        --------
+        Dict[str, object]
+            Resumo agregado (também gravado em <store_path>.summary.json)
+        """
+        summary = self.new_summary()
+        tasks = (self._make_task(i, overrides) for i, overrides in enumerate(self.runs))
+        retry_queue: deque = deque()
+        suspects: deque = deque()  # em andamento quando um processo morreu
+        in_flight = {}
+        start = perf_counter()
+
+        directory = os.path.dirname(self.store_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.logger.info(f"Iniciando varredura {self.sweep_id} com {self.max_workers} processos")
+
+        executor = self._new_executor()
+        try:
+            with open(self.store_path, 'a', encoding='utf-8') as store:
+                while True:
+                    if suspects:
+                        # Isolamento: as suspeitas rodam uma de cada vez
+                        if not in_flight:
+                            task = suspects.popleft()
+                            in_flight[executor.submit(_execute_sweep_run, task)] = task
+                    else:
+                        while len(in_flight) < self.max_pending:
+                            task = retry_queue.popleft() if retry_queue else next(tasks, None)
+                            if task is None:
+                                break
+                            in_flight[executor.submit(_execute_sweep_run, task)] = task
+
+                    if not in_flight:
+                        break
+
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    alone = len(in_flight) == 1
+                    pool_broken = False
+                    for future in done:
+                        pool_broken |= self._collect(future, in_flight.pop(future), retry_queue,
+                                                     suspects, store, summary, alone)
+
+                    if pool_broken:
+                        # Um processo de trabalho morreu: as demais execuções do
+                        # pool antigo também falham e voltam como suspeitas
+                        self.logger.warning("Pool de processos interrompido; recriando")
+                        done, _ = wait(in_flight)
+                        for future in done:
+                            self._collect(future, in_flight.pop(future), retry_queue,
+                                          suspects, store, summary, alone=False)
+                        self._shutdown(executor, wait=False, pending=in_flight)
+                        executor = self._new_executor()
+        finally:
+            self._shutdown(executor, wait=True, pending=in_flight)
+
+        summary.update({
+            'sweep_id': self.sweep_id,
+            'store_path': self.store_path,
+            'wall_time_s': perf_counter() - start
+        })
+
+        summary_path = os.path.splitext(self.store_path)[0] + '.summary.json'
+        with open(summary_path, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+
+        self.logger.info(f"Varredura {self.sweep_id} concluída em {summary['wall_time_s']:.1f} s\n"
+                         + self.format_summary(summary))
+        return summary
+
 if __name__ == "__main__":
     system = PhysicsTestSystemV2()
     results = system.run_complete_simulation()
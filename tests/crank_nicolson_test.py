@@ -0,0 +1,68 @@
+"""
+Propagador de Crank-Nicolson (CrankNicolsonPropagator) contra a solução
+densa do mesmo sistema, com contorno de Dirichlet e periódico
+"""
+
+import os
+import sys
+
+import numpy as np
+from scipy.linalg import solve
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from main_physics_test_v2 import CrankNicolsonPropagator
+
+BOUNDARIES = ('dirichlet', 'periodic')
+
+
+def _setup(n=64):
+    x = np.linspace(-10.0, 10.0, n)
+    dx = x[1] - x[0]
+    V = 0.05 * x**2 + 0.3 * np.sin(x)
+    # Estado aleatório, não nulo nas bordas (exercita os cantos periódicos)
+    rng = np.random.default_rng(12)
+    psi = rng.standard_normal(n) + 1j * rng.standard_normal(n)
+    return x, dx, V, psi / np.linalg.norm(psi)
+
+
+def _dense_step(V, dx, dt, boundary):
+    """Matrizes densas (1 ± iHΔt/2) com ħ = m = 1"""
+    n = V.size
+    kinetic = 1.0 / (2 * dx**2)
+    H = np.diag(2 * kinetic + V) - kinetic * (np.eye(n, k=1) + np.eye(n, k=-1))
+    if boundary == 'periodic':
+        H[0, -1] = H[-1, 0] = -kinetic
+    A = np.eye(n) + 0.5j * dt * H
+    B = np.eye(n) - 0.5j * dt * H
+    return A, B
+
+
+def test_matches_dense_solve():
+    x, dx, V, psi = _setup()
+    dt = 0.05
+    for boundary in BOUNDARIES:
+        propagator = CrankNicolsonPropagator(V, dx, dt, hbar=1.0, mass=1.0, boundary=boundary)
+        A, B = _dense_step(V, dx, dt, boundary)
+
+        expected = psi
+        for _ in range(5):
+            expected = solve(A, B @ expected)
+        np.testing.assert_allclose(propagator.step(psi, 5), expected, rtol=0, atol=1e-12,
+                                   err_msg=boundary)
+
+
+def test_conserves_norm():
+    x, dx, V, psi = _setup()
+    for boundary in BOUNDARIES:
+        propagator = CrankNicolsonPropagator(V, dx, 0.05, hbar=1.0, mass=1.0, boundary=boundary)
+        evolved = propagator.step(psi, 2000)
+        assert abs(np.linalg.norm(evolved) - 1.0) < 1e-10, boundary
+
+
+def test_batched_columns_match_single():
+    x, dx, V, psi = _setup()
+    propagator = CrankNicolsonPropagator(V, dx, 0.05, hbar=1.0, mass=1.0, boundary='periodic')
+    batch = np.stack([psi, np.roll(psi, 7)], axis=1)
+    evolved = propagator.step(batch, 10)
+    np.testing.assert_allclose(evolved[:, 1], propagator.step(np.roll(psi, 7), 10), atol=1e-13)
@@ -0,0 +1,222 @@
+"""
+Monte Carlo: energia incremental das varreduras em tabuleiro com lista de
+células (AdvancedNumericalMethods.pairwise_metropolis_sweeps) e para
+potenciais separáveis (metropolis_sweeps), cadeias
+paralelas reproduzíveis (PhysicsTestSystemV3.run_monte_carlo_chains),
+estatísticas da amostragem (RunningStatistics, tempo de autocorrelação,
+ajuste da proposta) e as peças determinísticas do parallel tempering
+(escada, trocas, idas e voltas)
+"""
+
+import os
+import sys
+from functools import partial
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from main_physics_test_v2 import (AdvancedNumericalMethods, PhysicsTestSystemV3,
+                                  RunningStatistics, _harmonic_potential,
+                                  _lennard_jones_pair)
+
+K_B = 1.380649e-23
+
+
+def _brute_force_energy(positions, pair_potential, cutoff, box_size):
+    """Soma sobre todos os pares com imagem mínima e potencial deslocado em r = cutoff"""
+    separation = positions[:, np.newaxis, :] - positions[np.newaxis, :, :]
+    separation -= box_size * np.round(separation / box_size)
+    r = np.sqrt(np.einsum('ijk,ijk->ij', separation, separation))
+    i, j = np.triu_indices(len(positions), k=1)
+    r = r[i, j]
+    r = r[r < cutoff]
+    return np.sum(pair_potential(r) - pair_potential(np.array([cutoff]))[0])
+
+
+def test_pairwise_incremental_energy_matches_brute_force():
+    n_particles, density, cutoff = 600, 0.5, 2.5
+    box_size = (n_particles / density) ** (1 / 3)
+    pair_potential = partial(_lennard_jones_pair, epsilon=K_B, sigma=1.0)
+    rng = np.random.default_rng(5)
+
+    # Rede cúbica simples perturbada: sem sobreposições no início
+    side = int(np.ceil(n_particles ** (1 / 3)))
+    lattice = np.stack(np.meshgrid(*[np.arange(side)] * 3, indexing='ij'), axis=-1).reshape(-1, 3)
+    positions = (lattice[:n_particles] + 0.5) * box_size / side - box_size / 2
+    positions += 0.05 * rng.standard_normal(positions.shape)
+
+    final, energies, acceptance = AdvancedNumericalMethods.pairwise_metropolis_sweeps(
+        positions, pair_potential, cutoff, box_size, temperature=2.0, n_sweeps=10,
+        step_size=0.2, rng=rng
+    )
+
+    assert 0 < acceptance < 1
+    assert np.all((final >= -box_size / 2) & (final < box_size / 2))
+    expected = _brute_force_energy(final, pair_potential, cutoff, box_size)
+    np.testing.assert_allclose(energies[-1], expected, rtol=1e-9)
+
+
+def _chains(system, **kwargs):
+    arguments = dict(n_chains=2, n_particles=50, temperature=1 / K_B, step_size=0.5, seed=11)
+    return system.run_monte_carlo_chains(**{**arguments, **kwargs})
+
+
+def test_chains_do_not_depend_on_worker_count():
+    system = PhysicsTestSystemV3()
+    for mode in ('sweep', 'single'):
+        serial = _chains(system, n_steps=20, mode=mode, max_workers=1)
+        parallel = _chains(system, n_steps=20, mode=mode, max_workers=2)
+        for a, b in zip(serial['chains'], parallel['chains']):
+            np.testing.assert_array_equal(a['energy_history'], b['energy_history'])
+            np.testing.assert_array_equal(a['final_positions'], b['final_positions'])
+
+
+def test_resumed_chain_matches_uninterrupted_run(tmp_path):
+    system = PhysicsTestSystemV3()
+    for mode in ('sweep', 'single'):
+        full = _chains(system, n_steps=20, mode=mode)
+        _chains(system, n_steps=10, mode=mode, checkpoint_dir=str(tmp_path / mode))
+
+        for chain in full['chains']:
+            checkpoint = tmp_path / mode / f"chain_{chain['chain']:03d}.json"
+            resumed = system.resume_monte_carlo_chain(str(checkpoint), 10)
+            assert resumed['steps_done'] == 20
+            np.testing.assert_allclose(resumed['final_positions'], chain['final_positions'],
+                                       rtol=0, atol=1e-12)
+            np.testing.assert_allclose(resumed['energy_history'], chain['energy_history'][10:],
+                                       rtol=1e-12)
+
+
+def test_equal_swap_rates_keep_geometric_ladder():
+    ladder = np.geomspace(1.0, 10.0, 6)
+    new = AdvancedNumericalMethods.equalize_temperature_ladder(ladder, np.full(5, 0.3))
+    np.testing.assert_allclose(new, ladder, rtol=1e-12)
+
+
+def test_ladder_equalizes_model_swap_rates():
+    # Modelo: A = exp[-(Δ ln T / w)²], com w pequeno em baixa temperatura
+    def rates(ladder):
+        width = 0.2 + 0.3 * np.log(ladder[:-1] * ladder[1:]) / 2
+        return np.exp(-(np.diff(np.log(ladder)) / width) ** 2)
+
+    ladder = np.geomspace(1.0, 10.0, 8)
+    assert np.ptp(rates(ladder)) > 0.3
+    for _ in range(40):
+        ladder = AdvancedNumericalMethods.equalize_temperature_ladder(ladder, rates(ladder))
+
+    np.testing.assert_allclose(ladder[[0, -1]], [1.0, 10.0], rtol=1e-12)
+    assert np.all(np.diff(ladder) > 0)
+    assert np.ptp(rates(ladder)) < 0.02
+
+
+def test_round_trips_follow_bottom_top_bottom():
+    trip_stage = np.zeros(3, dtype=int)
+    round_trips = np.zeros(3, dtype=int)
+    # replica_at por bloco: a réplica 0 sobe e volta; a réplica 2 começa no
+    # topo, desce e sobe de novo, e só conta depois de voltar à base
+    script = [
+        [0, 1, 2],
+        [1, 0, 2],
+        [1, 2, 0],   # 0 chega ao topo
+        [2, 1, 0],   # 2 passa pela base
+        [0, 1, 2],   # 0 volta à base (1 ida e volta); 2 chega ao topo
+        [0, 2, 1],
+        [2, 0, 1],   # 2 volta à base (1 ida e volta)
+    ]
+    for replica_at in script:
+        AdvancedNumericalMethods.update_round_trips(trip_stage, round_trips,
+                                                    np.array(replica_at))
+    np.testing.assert_array_equal(round_trips, [1, 0, 1])
+
+    # Sem contar (fase de adaptação) o estado avança, mas nada é somado
+    AdvancedNumericalMethods.update_round_trips(trip_stage, round_trips, np.array([1, 0, 2]),
+                                                count=False)
+    np.testing.assert_array_equal(round_trips, [1, 0, 1])
+
+
+def test_replica_swaps_use_metropolis_rule():
+    rng = np.random.default_rng(3)
+    temperatures = np.array([1.0, 2.0, 4.0]) / K_B
+    # Réplica fria com energia maior: troca sempre aceita
+    accepted = AdvancedNumericalMethods.replica_swaps(np.array([5.0, 1.0, 0.0]), temperatures,
+                                                      0, rng)
+    np.testing.assert_array_equal(accepted, [True, False])
+
+    # (β_1 - β_2)(E_1 - E_2) = 0.25·(-4) = -1: aceitação exp(-1)
+    energies = np.array([0.0, 1.0, 5.0])
+    hits = np.mean([AdvancedNumericalMethods.replica_swaps(energies, temperatures, 1, rng)[1]
+                    for _ in range(20000)])
+    np.testing.assert_allclose(hits, np.exp(-1.0), atol=0.015)
+
+
+def test_running_statistics_match_numpy_over_uneven_blocks():
+    rng = np.random.default_rng(7)
+    values = 1e6 + rng.standard_normal(400)  # média grande: testa a estabilidade
+    statistics = RunningStatistics()
+    assert np.isnan(statistics.variance)
+
+    edges = [0, 0, 1, 8, 8, 9, 309, 311, 400]  # blocos vazios, de uma amostra e longos
+    for a, b in zip(edges[:-1], edges[1:]):
+        statistics.update(values[a:b])
+        if b == 1:
+            assert statistics.count == 1 and np.isnan(statistics.variance)
+
+    assert statistics.count == len(values)
+    np.testing.assert_allclose(statistics.mean, values.mean(), rtol=1e-15)
+    np.testing.assert_allclose(statistics.variance, np.var(values, ddof=1), rtol=1e-10)
+
+
+def test_autocorrelation_time_of_ar1_process():
+    phi, n = 0.8, 100000
+    rng = np.random.default_rng(9)
+    noise = rng.standard_normal((4, n))
+    samples = np.empty_like(noise)
+    samples[:, 0] = noise[:, 0] / np.sqrt(1 - phi**2)  # já estacionário
+    for t in range(1, n):
+        samples[:, t] = phi * samples[:, t - 1] + noise[:, t]
+
+    tau = AdvancedNumericalMethods.integrated_autocorrelation_time(samples)
+    np.testing.assert_allclose(tau, (1 + phi) / (1 - phi), rtol=0.05)
+    # Ruído branco: τ = 1 (nunca abaixo de 1)
+    assert AdvancedNumericalMethods.integrated_autocorrelation_time(noise) >= 1.0
+
+
+def test_step_size_tuning_reaches_target_acceptance():
+    rng = np.random.default_rng(4)
+    positions = rng.standard_normal((200, 3))
+    # Passo inicial errado por seis ordens de grandeza
+    result = AdvancedNumericalMethods.adaptive_metropolis(
+        positions, _harmonic_potential, 1 / K_B, box_size=50.0, n_steps=200,
+        mode='sweep', step_size=1e-6, rng=rng, n_tune=2000, target_acceptance=0.3,
+        tune_interval=20
+    )
+    np.testing.assert_allclose(result['acceptance_rate'], 0.3, atol=0.02)
+
+    # Modelo determinístico de aceitação: a = exp(-passo)
+    step_size, settled = 1e-4, 0
+    for _ in range(200):
+        step_size, settled = AdvancedNumericalMethods.tune_step_size(
+            step_size, np.exp(-step_size), 0.3, settled
+        )
+    np.testing.assert_allclose(np.exp(-step_size), 0.3, atol=1e-3)
+
+
+def test_sweeps_incremental_total_matches_resum():
+    rng = np.random.default_rng(8)
+    positions = rng.standard_normal((500, 3))
+    final, energies, acceptance = AdvancedNumericalMethods.metropolis_sweeps(
+        positions, _harmonic_potential, 1 / K_B, n_sweeps=300, step_size=1.0, rng=rng
+    )
+    assert 0 < acceptance < 1
+    np.testing.assert_allclose(energies[-1], _harmonic_potential(final).sum(), rtol=1e-13)
+
+
+def test_sweeps_harmonic_equipartition():
+    # E = ½|x|² em 3D com kT = 1: ⟨E⟩/N = 3/2 kT
+    rng = np.random.default_rng(6)
+    positions = rng.standard_normal((2000, 3))
+    _, energies, _ = AdvancedNumericalMethods.metropolis_sweeps(
+        positions, _harmonic_potential, 1 / K_B, n_sweeps=600, step_size=1.5, rng=rng
+    )
+    np.testing.assert_allclose(energies[100:].mean() / len(positions), 1.5, rtol=0.01)
@@ -0,0 +1,42 @@
+"""
+Avaliação do potencial nas grades (PhysicsTestSystemV3._evaluate_potential)
+"""
+
+import math
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from main_physics_test_v2 import PhysicsTestSystemV3
+
+
+def test_vectorized_potential():
+    x = np.linspace(-1.0, 1.0, 5)
+    V = PhysicsTestSystemV3._evaluate_potential(lambda x: 0.5 * x**2, x)
+    np.testing.assert_array_equal(V, 0.5 * x**2)
+
+
+def test_scalar_only_potential():
+    x = np.linspace(-1.0, 1.0, 5)
+    V = PhysicsTestSystemV3._evaluate_potential(lambda x: math.cosh(x) if x > 0 else 1.0, x)
+    np.testing.assert_allclose(V, np.where(x > 0, np.cosh(x), 1.0))
+
+
+def test_reducing_potential_is_evaluated_point_by_point():
+    """Uma redução da grade inteira não pode virar um potencial constante"""
+    x = np.linspace(-1.0, 1.0, 5)
+    V = PhysicsTestSystemV3._evaluate_potential(lambda x: np.mean(x**2), x)
+    np.testing.assert_allclose(V, x**2)
+
+    X, Y = np.meshgrid(x, x, indexing='ij')
+    V = PhysicsTestSystemV3._evaluate_potential(lambda x, y: np.dot([x, y], [x, y]), X, Y)
+    np.testing.assert_allclose(V, X**2 + Y**2)
+
+
+def test_constant_potential():
+    x = np.linspace(-1.0, 1.0, 5)
+    np.testing.assert_array_equal(PhysicsTestSystemV3._evaluate_potential(lambda x: 2.0, x),
+                                  np.full(5, 2.0))
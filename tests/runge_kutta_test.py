@@ -0,0 +1,99 @@
+"""
+Runge-Kutta: Dormand-Prince adaptativo (AdvancedNumericalMethods.adaptive_runge_kutta)
+contra soluções analíticas e RK4 de passo fixo (runge_kutta_4) em bloco e
+com saída densa
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from main_physics_test_v2 import AdvancedNumericalMethods
+
+
+def _oscillator(t, y):
+    return np.array([y[1], -y[0]])
+
+
+def test_adaptive_matches_analytic_solutions():
+    t, y = AdvancedNumericalMethods.adaptive_runge_kutta(lambda t, y: -y, np.array([1.0]),
+                                                         0.0, 5.0, tol=1e-10)
+    assert t[0] == 0.0 and t[-1] == 5.0
+    np.testing.assert_allclose(y[:, 0], np.exp(-t), rtol=1e-8)
+
+    t, y = AdvancedNumericalMethods.adaptive_runge_kutta(_oscillator, np.array([1.0, 0.0]),
+                                                         0.0, 10.0, tol=1e-10)
+    np.testing.assert_allclose(y, np.column_stack([np.cos(t), -np.sin(t)]), atol=1e-8)
+
+    # Para trás: t decrescente
+    t, y = AdvancedNumericalMethods.adaptive_runge_kutta(lambda t, y: -y, np.array([1.0]),
+                                                         2.0, 0.0, tol=1e-10)
+    assert np.all(np.diff(t) < 0)
+    np.testing.assert_allclose(y[-1, 0], np.exp(2.0), rtol=1e-8)
+
+
+def test_adaptive_error_follows_tolerance():
+    tolerances = np.array([1e-4, 1e-6, 1e-8, 1e-10])
+    errors, steps = [], []
+    for tol in tolerances:
+        t, y, stats = AdvancedNumericalMethods.adaptive_runge_kutta(
+            _oscillator, np.array([1.0, 0.0]), 0.0, 10.0, tol=tol, return_stats=True
+        )
+        assert stats['success']
+        errors.append(np.max(np.abs(y[-1] - [np.cos(10.0), -np.sin(10.0)])))
+        steps.append(stats['n_accepted'])
+
+    # Erro global proporcional à tolerância e passos ~ tol^(-1/5) (ordem 5)
+    assert np.all(np.array(errors) < 10 * tolerances)
+    error_slope = np.polyfit(np.log(tolerances), np.log(errors), 1)[0]
+    step_slope = np.polyfit(np.log(tolerances), np.log(steps), 1)[0]
+    np.testing.assert_allclose(error_slope, 1.0, atol=0.1)
+    np.testing.assert_allclose(step_slope, -0.2, atol=0.03)
+
+def test_adaptive_empty_interval_returns_initial_state():
+    y0 = np.array([1.0, 2.0])
+    t, y, stats = AdvancedNumericalMethods.adaptive_runge_kutta(
+        _oscillator, y0, 3.0, 3.0, return_stats=True
+    )
+    np.testing.assert_array_equal(t, [3.0])
+    np.testing.assert_array_equal(y, [y0])
+    assert stats['success'] and stats['nfev'] == 0
+
+
+def _pendulum(t, y):
+    """Pêndulo amortecido, vetorizado sobre as linhas de y (forma (..., 2))"""
+    return np.stack([y[..., 1], -np.sin(y[..., 0]) - 0.1 * y[..., 1]], axis=-1)
+
+
+def test_rk4_batch_matches_single_systems():
+    rng = np.random.default_rng(2)
+    y0 = rng.uniform(-2.0, 2.0, size=(5, 2))
+    t, y = AdvancedNumericalMethods.runge_kutta_4(_pendulum, y0, 0.0, 3.0, 0.01, stride=10)
+    assert y.shape == (len(t), 5, 2)
+    for row in range(len(y0)):
+        t_row, y_row = AdvancedNumericalMethods.runge_kutta_4(_pendulum, y0[row], 0.0, 3.0,
+                                                              0.01, stride=10)
+        np.testing.assert_array_equal(t_row, t)
+        np.testing.assert_allclose(y[:, row], y_row, rtol=1e-14, atol=1e-14)
+
+
+def test_rk4_dense_output_at_nodes_matches_strided_output():
+    y0 = np.array([[1.0, 0.0], [0.5, -1.0]])
+    # h não divide o intervalo: o último passo é encurtado
+    t, y = AdvancedNumericalMethods.runge_kutta_4(_pendulum, y0, 0.0, 2.05, 0.1, stride=4)
+    assert t[-1] == 2.05
+    t_dense, y_dense = AdvancedNumericalMethods.runge_kutta_4(_pendulum, y0, 0.0, 2.05, 0.1,
+                                                              t_eval=t)
+    np.testing.assert_array_equal(t_dense, t)
+    np.testing.assert_allclose(y_dense, y, rtol=0, atol=1e-14)
+
+    # Entre os nós, o interpolante de Hermite tem erro O(h⁴)
+    t_mid = (t[:-1] + t[1:]) / 2
+    _, y_mid = AdvancedNumericalMethods.runge_kutta_4(_pendulum, y0, 0.0, 2.05, 0.1,
+                                                      t_eval=t_mid)
+    _, y_fine = AdvancedNumericalMethods.runge_kutta_4(_pendulum, y0, 0.0, 2.05, 0.001,
+                                                       t_eval=t_mid)
+    np.testing.assert_allclose(y_mid, y_fine, atol=1e-5)
@@ -0,0 +1,88 @@
+"""
+Propagador split-operator (SplitOperatorPropagator): conservação da norma,
+espalhamento do pacote livre contra a solução analítica e absorção nas bordas
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from main_physics_test_v2 import SplitOperatorPropagator
+
+
+def _grid(n=1024, length=100.0):
+    x = np.linspace(-length / 2, length / 2, n, endpoint=False)
+    return x, x[1] - x[0]
+
+
+def _packet(x, dx, sigma=1.0, x0=0.0, k0=0.0):
+    """Gaussiana com desvio padrão `sigma` em |ψ|², normalizada em Σ|ψ|²dx = 1"""
+    psi = np.exp(-(x - x0)**2 / (4 * sigma**2) + 1j * k0 * x)
+    return psi / np.sqrt(np.sum(np.abs(psi)**2) * dx)
+
+
+def _moments(x, dx, psi):
+    density = np.abs(psi)**2 * dx
+    norm = density.sum()
+    mean = np.sum(x * density) / norm
+    return norm, mean, np.sqrt(np.sum((x - mean)**2 * density) / norm)
+
+
+def test_conserves_norm():
+    x, dx = _grid(256, 20.0)
+    V = 0.05 * x**2 + 0.3 * np.sin(x)
+    rng = np.random.default_rng(12)
+    psi = rng.standard_normal(x.size) + 1j * rng.standard_normal(x.size)
+    psi /= np.linalg.norm(psi)
+    propagator = SplitOperatorPropagator(V, dx, 0.01, hbar=1.0, mass=1.0)
+    assert abs(np.linalg.norm(propagator.step(psi, 2000)) - 1.0) < 1e-12
+
+
+def test_free_packet_spreads_as_analytic():
+    # σ(t)² = σ0² + (ħt / 2mσ0)², centro em x0 + ħk0t/m (ħ = m = 1)
+    x, dx = _grid()
+    sigma0, k0, t = 1.0, 2.0, 5.0
+    propagator = SplitOperatorPropagator(np.zeros_like(x), dx, 0.01, hbar=1.0, mass=1.0)
+    psi = propagator.step(_packet(x, dx, sigma0, k0=k0), 500)
+
+    norm, mean, width = _moments(x, dx, psi)
+    np.testing.assert_allclose(norm, 1.0, atol=1e-12)
+    np.testing.assert_allclose(mean, k0 * t, atol=1e-8)
+    np.testing.assert_allclose(width, np.sqrt(sigma0**2 + (t / (2 * sigma0))**2), rtol=1e-8)
+
+
+def test_absorbing_boundary_removes_outgoing_packet():
+    x, dx = _grid()
+    V = np.zeros_like(x)
+    psi0 = _packet(x, dx, 2.0, k0=3.0)
+    absorbing = SplitOperatorPropagator(V, dx, 0.01, hbar=1.0, mass=1.0, boundary='absorbing')
+    periodic = SplitOperatorPropagator(V, dx, 0.01, hbar=1.0, mass=1.0)
+
+    # Longe das bordas a máscara é 1: mesma evolução do contorno periódico
+    np.testing.assert_allclose(absorbing.step(psi0, 100), periodic.step(psi0, 100), atol=1e-12)
+
+    # O pacote atravessa a borda direita: absorvido em vez de reaparecer à esquerda
+    norms = []
+    psi = psi0
+    for _ in range(30):
+        psi = absorbing.step(psi, 100)
+        norms.append(_moments(x, dx, psi)[0])
+    assert np.all(np.diff(norms) <= 1e-12)
+    assert norms[-1] < 1e-3
+    np.testing.assert_allclose(_moments(x, dx, periodic.step(psi0, 3000))[0], 1.0, atol=1e-12)
+
+
+def test_batched_columns_match_single():
+    x, dx = _grid(256, 20.0)
+    V = 0.05 * x**2
+    psi = _packet(x, dx, 1.0, k0=1.0)
+    propagator = SplitOperatorPropagator(V, dx, 0.01, hbar=1.0, mass=1.0, boundary='absorbing')
+    assert np.all(np.isfinite(propagator.mask)) and propagator.mask.min() >= 0
+    batch = np.stack([psi, np.roll(psi, 7)], axis=1)
+    evolved = propagator.step(batch, 10)
+    assert evolved.shape == batch.shape
+    np.testing.assert_allclose(evolved[:, 1], propagator.step(np.roll(psi, 7), 10), atol=1e-13)
+    np.testing.assert_array_equal(propagator.step(psi, 0), psi)
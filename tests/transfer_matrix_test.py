@@ -0,0 +1,58 @@
+"""
+Transmissão pelo método da matriz de transferência
+(AdvancedNumericalMethods.transfer_matrix_transmission)
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from main_physics_test_v2 import AdvancedNumericalMethods
+
+
+def _rectangular_barrier_transmission(E, V0, width):
+    """T analítico da barreira retangular com ħ = m = 1"""
+    k_squared = 2 * (E - V0)
+    kd = np.sqrt(np.abs(k_squared)) * width
+    oscillation = np.where(k_squared > 0, np.sin(kd)**2, np.sinh(kd)**2)
+    return 1.0 / (1.0 + V0**2 * oscillation / (4 * E * np.abs(E - V0)))
+
+
+def test_rectangular_barrier_matches_analytic():
+    x = np.linspace(-5.0, 5.0, 1001)
+    dx = x[1] - x[0]
+    V0 = 2.0
+    V = np.where(np.abs(x) < 1.0, V0, 0.0)
+    width = np.count_nonzero(V) * dx
+
+    energies = np.concatenate([np.linspace(0.05, 1.95, 40), np.linspace(2.05, 10.0, 40)])
+    T, R = AdvancedNumericalMethods.transfer_matrix_transmission(V, x, energies, hbar=1.0, mass=1.0)
+
+    np.testing.assert_allclose(T, _rectangular_barrier_transmission(energies, V0, width),
+                               rtol=1e-9, atol=1e-14)
+    np.testing.assert_allclose(T + R, 1.0, atol=1e-10)
+
+
+def test_flux_conservation_for_rough_potential():
+    """T + R = 1 também com terminais em potenciais diferentes"""
+    x = np.linspace(0.0, 10.0, 400)
+    rng = np.random.default_rng(3)
+    V = 0.5 * rng.random(x.size)
+    V[:50] = 0.0
+    V[-50:] = -0.7
+
+    energies = np.linspace(0.01, 5.0, 300)
+    T, R = AdvancedNumericalMethods.transfer_matrix_transmission(V, x, energies, hbar=1.0, mass=1.0)
+    assert np.all((T >= 0) & (T <= 1))
+    np.testing.assert_allclose(T + R, 1.0, atol=1e-9)
+
+
+def test_no_incident_wave_below_left_lead():
+    x = np.linspace(0.0, 1.0, 20)
+    V = np.full(x.size, 1.0)
+    T, R = AdvancedNumericalMethods.transfer_matrix_transmission(V, x, [0.5, 2.0], hbar=1.0, mass=1.0)
+    assert np.isnan(T[0]) and np.isnan(R[0])
+    np.testing.assert_allclose([T[1], R[1]], [1.0, 0.0], atol=1e-12)